@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Curso, Aula
+from .models import Curso, Aula, DocenteCurso
 
 @admin.register(Curso)
 class CursoAdmin(admin.ModelAdmin):
@@ -14,4 +14,11 @@ class AulaAdmin(admin.ModelAdmin):
     list_display = ['nombre', 'edificio', 'capacidad', 'tipo', 'tiene_proyector', 'activa']
     list_filter = ['tipo', 'edificio', 'activa', 'tiene_proyector', 'tiene_computadoras']
     search_fields = ['nombre', 'edificio']
-    list_editable = ['activa']
\ No newline at end of file
+    list_editable = ['activa']
+
+@admin.register(DocenteCurso)
+class DocenteCursoAdmin(admin.ModelAdmin):
+    list_display = ['curso', 'docente', 'preferencia']
+    list_filter = ['curso']
+    search_fields = ['curso__codigo', 'curso__nombre', 'docente__username']
+    list_editable = ['preferencia']
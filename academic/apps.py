@@ -3,4 +3,7 @@ from django.apps import AppConfig
 class AcademicConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'academic'
-    verbose_name = 'Gestión Académica'
\ No newline at end of file
+    verbose_name = 'Gestión Académica'
+
+    def ready(self):
+        from . import signals  # noqa: F401
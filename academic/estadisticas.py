@@ -0,0 +1,39 @@
+# academic/estadisticas.py
+"""
+Indicadores de los catálogos con agregados condicionales: una consulta por
+tabla, sin importar cuántos indicadores se pidan, y el resultado se guarda
+en la caché versionada de cada catálogo (ver horunap_api/catalogos.py).
+"""
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+from horunap_api.catalogos import obtener
+from users.models import User
+from .models import Curso, Aula
+
+
+def estadisticas_cursos():
+    return obtener(('cursos',), 'estadisticas:cursos', lambda: Curso.objects.aggregate(
+        total_cursos=Count('id'),
+        cursos_activos=Count('id', filter=Q(activo=True)),
+        cursos_obligatorios=Count('id', filter=Q(tipo='OBLIGATORIO')),
+        cursos_electivos=Count('id', filter=Q(tipo='ELECTIVO')),
+        cursos_con_laboratorio=Count('id', filter=Q(activo=True, requiere_laboratorio=True)),
+        sesiones_semanales=Coalesce(Sum('sesiones_semana', filter=Q(activo=True)), 0),
+    ))
+
+
+def estadisticas_aulas():
+    return obtener(('aulas',), 'estadisticas:aulas', lambda: Aula.objects.aggregate(
+        total_aulas=Count('id'),
+        aulas_activas=Count('id', filter=Q(activa=True)),
+        laboratorios_activos=Count('id', filter=Q(activa=True, tipo='LABORATORIO')),
+        capacidad_total=Coalesce(Sum('capacidad', filter=Q(activa=True)), 0),
+    ))
+
+
+def estadisticas_docentes():
+    return obtener(('docentes',), 'estadisticas:docentes', lambda: User.objects.filter(rol='DOCENTE').aggregate(
+        total_docentes=Count('id'),
+        docentes_activos=Count('id', filter=Q(is_active=True)),
+    ))
@@ -0,0 +1,218 @@
+# academic/grafo.py
+"""
+Grafo de prerrequisitos (Curso.requisitos) precalculado.
+
+Se carga con dos consultas (cursos y tabla intermedia) y se calculan una sola
+vez los requisitos/dependientes directos, los ciclos, el nivel topológico de
+cada curso y el cierre transitivo en ambos sentidos. Las preguntas del tipo
+"¿qué cursos dependen de X?" pasan a ser búsquedas en diccionarios.
+
+El grafo se guarda en la caché de Django bajo una versión que se incrementa
+cuando cambian los cursos o sus prerrequisitos (ver academic/signals.py). Las
+escrituras directas sobre la tabla intermedia deben llamar a invalidar_grafo().
+"""
+from collections import deque
+
+from django.core.cache import cache
+from django.db import transaction
+
+from horunap_api.versiones import obtener_version, incrementar_version
+from .models import Curso
+
+VERSION_GRAFO = 'academic:requisitos'
+
+CACHE_TIMEOUT = 60 * 60
+
+# Copia en memoria del proceso para no deserializar el grafo en cada petición
+_grafo_local = (None, None)
+
+
+class GrafoRequisitos:
+    def __init__(self, cursos, aristas):
+        """
+        cursos: iterable de (id, codigo, nombre)
+        aristas: iterable de (curso_id, requisito_id)
+        """
+        self.etiquetas = {}
+        self.codigos = {}
+        for curso_id, codigo, nombre in cursos:
+            self.etiquetas[curso_id] = f"{codigo} - {nombre}"
+            self.codigos[curso_id] = codigo
+
+        requisitos = {curso_id: [] for curso_id in self.etiquetas}
+        dependientes = {curso_id: [] for curso_id in self.etiquetas}
+        for curso_id, requisito_id in aristas:
+            requisitos[curso_id].append(requisito_id)
+            dependientes[requisito_id].append(curso_id)
+
+        orden = lambda ids: tuple(sorted(ids, key=self.codigos.__getitem__))
+        self.requisitos = {c: orden(ids) for c, ids in requisitos.items()}
+        self.dependientes = {c: orden(ids) for c, ids in dependientes.items()}
+
+        self._calcular_niveles()
+        self.ciclos = self._detectar_ciclos()
+        self.cierre = self._cierre(self.requisitos)
+        self.cierre_inverso = self._cierre(self.dependientes)
+
+    # --- Cálculo ---
+
+    def _calcular_niveles(self):
+        """
+        Orden topológico (Kahn). Nivel 0: cursos sin prerrequisitos; cada curso
+        queda un nivel por encima de su prerrequisito más alto. Los cursos en
+        un ciclo, o que dependen de uno, no tienen nivel (None).
+        """
+        pendientes = {c: len(ids) for c, ids in self.requisitos.items()}
+        cola = deque(c for c, n in pendientes.items() if n == 0)
+        self.niveles = {c: None for c in self.requisitos}
+        self.orden_topologico = []
+
+        while cola:
+            curso_id = cola.popleft()
+            self.orden_topologico.append(curso_id)
+            self.niveles[curso_id] = max(
+                (self.niveles[r] + 1 for r in self.requisitos[curso_id]), default=0
+            )
+            for dependiente in self.dependientes[curso_id]:
+                pendientes[dependiente] -= 1
+                if pendientes[dependiente] == 0:
+                    cola.append(dependiente)
+
+    def _detectar_ciclos(self):
+        """Componentes fuertemente conexas con ciclo (Tarjan iterativo) entre los cursos sin nivel"""
+        restantes = [c for c, nivel in self.niveles.items() if nivel is None]
+        if not restantes:
+            return []
+
+        indice, bajo, en_pila = {}, {}, set()
+        pila, ciclos = [], []
+        contador = 0
+        for inicio in restantes:
+            if inicio in indice:
+                continue
+            trabajo = [(inicio, iter(self.requisitos[inicio]))]
+            indice[inicio] = bajo[inicio] = contador
+            contador += 1
+            pila.append(inicio)
+            en_pila.add(inicio)
+            while trabajo:
+                nodo, vecinos = trabajo[-1]
+                avanzo = False
+                for vecino in vecinos:
+                    if vecino not in indice:
+                        indice[vecino] = bajo[vecino] = contador
+                        contador += 1
+                        pila.append(vecino)
+                        en_pila.add(vecino)
+                        trabajo.append((vecino, iter(self.requisitos[vecino])))
+                        avanzo = True
+                        break
+                    if vecino in en_pila:
+                        bajo[nodo] = min(bajo[nodo], indice[vecino])
+                if avanzo:
+                    continue
+                trabajo.pop()
+                if trabajo:
+                    padre = trabajo[-1][0]
+                    bajo[padre] = min(bajo[padre], bajo[nodo])
+                if bajo[nodo] == indice[nodo]:
+                    componente = []
+                    while True:
+                        miembro = pila.pop()
+                        en_pila.discard(miembro)
+                        componente.append(miembro)
+                        if miembro == nodo:
+                            break
+                    if len(componente) > 1 or nodo in self.requisitos[nodo]:
+                        ciclos.append(sorted(componente, key=self.codigos.__getitem__))
+        return ciclos
+
+    def _cierre(self, adyacencia):
+        """
+        Cierre transitivo. En orden topológico basta unir los cierres ya
+        calculados de los vecinos; los cursos afectados por ciclos se
+        recorren por separado (BFS).
+        """
+        cierre, completos = {}, set()
+        orden = self.orden_topologico if adyacencia is self.requisitos else reversed(self.orden_topologico)
+        for curso_id in orden:
+            vecinos = adyacencia[curso_id]
+            if all(v in completos for v in vecinos):
+                alcanzables = set(vecinos)
+                for vecino in vecinos:
+                    alcanzables |= cierre[vecino]
+                cierre[curso_id] = alcanzables
+                completos.add(curso_id)
+
+        for curso_id in adyacencia:
+            if curso_id in completos:
+                continue
+            alcanzables, cola = set(), deque(adyacencia[curso_id])
+            while cola:
+                vecino = cola.popleft()
+                if vecino in alcanzables:
+                    continue
+                alcanzables.add(vecino)
+                cola.extend(adyacencia[vecino])
+            cierre[curso_id] = alcanzables
+
+        return {curso_id: frozenset(ids) for curso_id, ids in cierre.items()}
+
+    # --- Consultas ---
+
+    def requisitos_de(self, curso_id, transitivos=False):
+        if transitivos:
+            return sorted(self.cierre.get(curso_id, ()), key=self.codigos.__getitem__)
+        return list(self.requisitos.get(curso_id, ()))
+
+    def dependientes_de(self, curso_id, transitivos=False):
+        if transitivos:
+            return sorted(self.cierre_inverso.get(curso_id, ()), key=self.codigos.__getitem__)
+        return list(self.dependientes.get(curso_id, ()))
+
+    def es_requisito(self, requisito_id, curso_id):
+        """True si requisito_id es prerrequisito (directo o indirecto) de curso_id"""
+        return requisito_id in self.cierre.get(curso_id, ())
+
+    def nivel(self, curso_id):
+        return self.niveles.get(curso_id)
+
+    def etiqueta(self, curso_id):
+        return self.etiquetas.get(curso_id, str(curso_id))
+
+    def crearia_ciclo(self, curso_id, requisito_id):
+        """True si agregar requisito_id como prerrequisito de curso_id cerraría un ciclo"""
+        return curso_id == requisito_id or curso_id in self.cierre.get(requisito_id, ())
+
+
+def construir_grafo():
+    cursos = Curso.objects.values_list('id', 'codigo', 'nombre')
+    aristas = Curso.requisitos.through.objects.values_list('from_curso_id', 'to_curso_id')
+    return GrafoRequisitos(cursos, aristas)
+
+
+def obtener_grafo(forzar=False):
+    """
+    Grafo vigente: memoria del proceso, luego caché compartida, luego base de
+    datos. `forzar` lo reconstruye sin cachearlo, p. ej. si falta un curso
+    creado en la transacción en curso (la versión sube recién al confirmarse).
+    """
+    global _grafo_local
+    if forzar:
+        return construir_grafo()
+    version = obtener_version(VERSION_GRAFO)
+    if _grafo_local[0] == version:
+        return _grafo_local[1]
+
+    clave = f'grafo_requisitos:{version}'
+    grafo = cache.get(clave)
+    if grafo is None:
+        grafo = construir_grafo()
+        cache.set(clave, grafo, CACHE_TIMEOUT)
+    _grafo_local = (version, grafo)
+    return grafo
+
+
+def invalidar_grafo():
+    """Invalida el grafo cacheado tras confirmarse la transacción en curso"""
+    transaction.on_commit(lambda: incrementar_version(VERSION_GRAFO))
@@ -0,0 +1,434 @@
+# academic/importacion.py
+"""
+Importación masiva de catálogos: cursos (con prerrequisitos), aulas,
+docentes y su disponibilidad (HorarioPersonalizadoDocente).
+
+El proceso tiene dos etapas:
+
+1. Validación por lotes en memoria: conversión y validación de campos sin
+   consultas por fila, detección de claves duplicadas y resolución de
+   referencias (prerrequisitos por código, docentes por username) contra lo
+   que ya existe en la base de datos (una consulta por entidad) y lo que
+   trae el propio archivo. Los prerrequisitos resultantes (los del archivo
+   reemplazan a los de cada curso importado) se revisan con el grafo de
+   requisitos para rechazar ciclos.
+2. Escritura con bulk_create / bulk_update dentro de una transacción. Si hay
+   errores no se escribe nada; con `dry_run` solo se devuelve el reporte.
+
+`requiere_laboratorio` se deriva sobre todo el lote con la misma expresión
+que usa `Curso.save()`, y los grupos de los docentes se sincronizan en bloque.
+"""
+import csv
+import io
+import json
+import os
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from users.models import User
+from horunap_api.catalogos import invalidar_catalogos
+from .grafo import GrafoRequisitos, invalidar_grafo
+from .models import Curso, Aula
+
+ENTIDADES = ('aulas', 'cursos', 'docentes', 'disponibilidad')
+
+TAMANO_LOTE = 500
+
+CAMPOS = {
+    'cursos': [
+        'codigo', 'nombre', 'creditos', 'tipo', 'sesiones_semana', 'duracion_sesion',
+        'capacidad_estimada', 'equipamiento_requerido', 'activo', 'requiere_laboratorio',
+    ],
+    'aulas': [
+        'nombre', 'capacidad', 'tipo', 'edificio', 'piso', 'tiene_proyector',
+        'tiene_computadoras', 'tiene_pizarra_digital', 'equipamiento_adicional', 'activa',
+    ],
+    'docentes': ['username', 'first_name', 'last_name', 'email', 'rol', 'is_active'],
+    'disponibilidad': ['dia_semana', 'hora_inicio', 'hora_fin', 'tipo', 'descripcion'],
+}
+
+OBLIGATORIOS = {
+    'cursos': ['codigo', 'nombre', 'creditos'],
+    'aulas': ['nombre', 'capacidad'],
+    'docentes': ['username'],
+    'disponibilidad': ['docente', 'dia_semana', 'hora_inicio', 'hora_fin'],
+}
+
+VALORES_BOOLEANOS = {
+    'si': True, 'sí': True, 'true': True, '1': True, 'x': True,
+    'no': False, 'false': False, '0': False,
+}
+
+
+class ErrorImportacion(Exception):
+    pass
+
+
+def leer_archivo(nombre, contenido):
+    """Convierte un archivo CSV o JSON (bytes o texto) en una lista de dicts"""
+    if isinstance(contenido, bytes):
+        contenido = contenido.decode('utf-8-sig')
+    extension = os.path.splitext(nombre)[1].lower()
+    if extension == '.json' or contenido.lstrip().startswith('['):
+        filas = json.loads(contenido)
+        if not isinstance(filas, list):
+            raise ErrorImportacion(f"{nombre}: se esperaba una lista de objetos JSON")
+        return filas
+    return list(csv.DictReader(io.StringIO(contenido)))
+
+
+def _vacio(valor):
+    return valor is None or (isinstance(valor, str) and valor.strip() == '')
+
+
+class ImportadorCatalogo:
+    """
+    Uso:
+        reporte = ImportadorCatalogo({'cursos': [...], 'aulas': [...]}).ejecutar(dry_run=True)
+    """
+
+    def __init__(self, datos):
+        self.datos = {entidad: list(datos.get(entidad) or []) for entidad in ENTIDADES}
+        self.errores = {entidad: [] for entidad in ENTIDADES}
+        self.plan = {entidad: {'crear': [], 'actualizar': []} for entidad in ENTIDADES}
+        self.campos_actualizados = {entidad: set() for entidad in ENTIDADES}
+        self.requisitos = {}
+        self.fila_curso = {}
+        self.contrasenas = {}
+        self.docente_de_disponibilidad = {}
+
+    # --- API pública ---
+
+    def ejecutar(self, dry_run=False):
+        self.validar()
+        if self.hay_errores() or dry_run:
+            return self.reporte(aplicado=False, dry_run=dry_run)
+        self.escribir()
+        return self.reporte(aplicado=True, dry_run=False)
+
+    def hay_errores(self):
+        return any(self.errores.values())
+
+    def reporte(self, aplicado, dry_run):
+        return {
+            'dry_run': dry_run,
+            'aplicado': aplicado,
+            'entidades': {
+                entidad: {
+                    'filas': len(self.datos[entidad]),
+                    'crear': len(self.plan[entidad]['crear']),
+                    'actualizar': len(self.plan[entidad]['actualizar']),
+                    'errores': self.errores[entidad],
+                }
+                for entidad in ENTIDADES if self.datos[entidad]
+            },
+        }
+
+    # --- Validación ---
+
+    def validar(self):
+        self._validar_aulas()
+        self._validar_cursos()
+        self._validar_docentes()
+        self._validar_disponibilidad()
+
+    def _construir(self, entidad, modelo, numero, fila, existente=None):
+        """
+        Convierte y valida los campos presentes en la fila. Devuelve la
+        instancia (nueva o la existente con los campos aplicados) o None si
+        hay errores, que quedan registrados con el número de fila.
+        """
+        faltantes = [campo for campo in OBLIGATORIOS[entidad] if _vacio(fila.get(campo))]
+        errores = {campo: ['Este campo es obligatorio.'] for campo in faltantes}
+
+        valores = {}
+        for nombre in CAMPOS[entidad]:
+            valor = fila.get(nombre)
+            if _vacio(valor):
+                continue
+            campo = modelo._meta.get_field(nombre)
+            if isinstance(valor, str):
+                valor = valor.strip()
+                if campo.get_internal_type() == 'BooleanField':
+                    valor = VALORES_BOOLEANOS.get(valor.lower(), valor)
+            try:
+                valores[nombre] = campo.to_python(valor)
+            except ValidationError as error:
+                errores[nombre] = error.messages
+
+        instancia = existente if existente is not None else modelo()
+        for nombre, valor in valores.items():
+            setattr(instancia, nombre, valor)
+
+        if not errores:
+            # Validadores de campo (longitudes, choices) sin consultas: la unicidad
+            # se resuelve en memoria contra los registros existentes
+            excluir = [
+                campo.name for campo in modelo._meta.concrete_fields
+                if campo.name not in valores or campo.is_relation
+            ]
+            try:
+                instancia.clean_fields(exclude=excluir)
+            except ValidationError as error:
+                errores.update(error.message_dict)
+
+        if errores:
+            self.errores[entidad].append({'fila': numero, 'errores': errores})
+            return None
+
+        self.campos_actualizados[entidad].update(valores)
+        return instancia
+
+    def _duplicado(self, entidad, numero, clave, vistas):
+        if clave in vistas:
+            self.errores[entidad].append({
+                'fila': numero,
+                'errores': {'__all__': [f"Clave duplicada en el archivo: {clave} (fila {vistas[clave]})"]},
+            })
+            return True
+        vistas[clave] = numero
+        return False
+
+    def _agregar_al_plan(self, entidad, instancia, existente):
+        self.plan[entidad]['actualizar' if existente is not None else 'crear'].append(instancia)
+
+    def _validar_aulas(self):
+        filas = self.datos['aulas']
+        if not filas:
+            return
+        # Nombres comparados sin distinguir mayúsculas en ambos lados
+        nombres = {str(f.get('nombre') or '').strip().lower() for f in filas}
+        existentes = {
+            ((aula.edificio or '').lower(), aula.nombre.lower()): aula
+            for aula in Aula.objects.annotate(nombre_minusculas=Lower('nombre')).filter(
+                nombre_minusculas__in=nombres
+            )
+        }
+        vistas = {}
+        for numero, fila in enumerate(filas, start=1):
+            clave = (str(fila.get('edificio') or '').strip().lower(), str(fila.get('nombre') or '').strip().lower())
+            if self._duplicado('aulas', numero, clave, vistas):
+                continue
+            existente = existentes.get(clave)
+            instancia = self._construir('aulas', Aula, numero, fila, existente)
+            if instancia is not None:
+                self._agregar_al_plan('aulas', instancia, existente)
+
+    def _validar_cursos(self):
+        filas = self.datos['cursos']
+        if not filas:
+            return
+        codigos_archivo = {str(f.get('codigo') or '').strip() for f in filas}
+        existentes = Curso.objects.in_bulk(codigos_archivo, field_name='codigo')
+
+        referenciados = set()
+        for fila in filas:
+            referenciados.update(self._codigos_requisitos(fila.get('requisitos')))
+        codigos_en_bd = set(
+            Curso.objects.filter(codigo__in=referenciados - codigos_archivo).values_list('codigo', flat=True)
+        )
+        codigos_validos = codigos_archivo | codigos_en_bd
+
+        vistas = {}
+        for numero, fila in enumerate(filas, start=1):
+            codigo = str(fila.get('codigo') or '').strip()
+            if self._duplicado('cursos', numero, codigo, vistas):
+                continue
+            existente = existentes.get(codigo)
+            instancia = self._construir('cursos', Curso, numero, fila, existente)
+            if instancia is None:
+                continue
+
+            if 'requisitos' in fila and fila['requisitos'] is not None:
+                requisitos = self._codigos_requisitos(fila['requisitos'])
+                desconocidos = sorted(requisitos - codigos_validos)
+                if desconocidos or codigo in requisitos:
+                    mensaje = (f"Prerrequisitos desconocidos: {', '.join(desconocidos)}"
+                               if desconocidos else "Un curso no puede ser su propio prerrequisito")
+                    self.errores['cursos'].append({'fila': numero, 'errores': {'requisitos': [mensaje]}})
+                    continue
+                self.requisitos[codigo] = requisitos
+                self.fila_curso[codigo] = numero
+            self._agregar_al_plan('cursos', instancia, existente)
+
+        self._validar_ciclos()
+
+        # Derivación de requiere_laboratorio sobre todo el lote (misma regla que Curso.save)
+        for instancia in self.plan['cursos']['crear'] + self.plan['cursos']['actualizar']:
+            if not instancia.requiere_laboratorio and Curso.equipamiento_requiere_laboratorio(
+                    instancia.equipamiento_requerido):
+                instancia.requiere_laboratorio = True
+                self.campos_actualizados['cursos'].add('requiere_laboratorio')
+
+    def _validar_ciclos(self):
+        """Rechaza los prerrequisitos que cerrarían un ciclo con la malla actual"""
+        if not self.requisitos:
+            return
+        aristas = [
+            (curso, requisito) for curso, requisito in Curso.requisitos.through.objects.values_list(
+                'from_curso__codigo', 'to_curso__codigo'
+            )
+            if curso not in self.requisitos
+        ]
+        aristas += [(curso, requisito) for curso, requisitos in self.requisitos.items() for requisito in requisitos]
+        codigos = {codigo for arista in aristas for codigo in arista}
+        grafo = GrafoRequisitos([(codigo, codigo, codigo) for codigo in codigos], aristas)
+        for ciclo in grafo.ciclos:
+            mensaje = f"Los prerrequisitos forman un ciclo: {', '.join(ciclo)}"
+            for codigo in ciclo:
+                if codigo in self.fila_curso:
+                    self.errores['cursos'].append({
+                        'fila': self.fila_curso[codigo], 'errores': {'requisitos': [mensaje]},
+                    })
+
+    @staticmethod
+    def _codigos_requisitos(valor):
+        if _vacio(valor):
+            return set()
+        if isinstance(valor, (list, tuple)):
+            return {str(codigo).strip() for codigo in valor if str(codigo).strip()}
+        return {codigo.strip() for codigo in str(valor).replace(',', ';').split(';') if codigo.strip()}
+
+    def _validar_docentes(self):
+        filas = self.datos['docentes']
+        if not filas:
+            return
+        existentes = User.objects.in_bulk(
+            {str(f.get('username') or '').strip() for f in filas}, field_name='username'
+        )
+        vistas = {}
+        for numero, fila in enumerate(filas, start=1):
+            username = str(fila.get('username') or '').strip()
+            if self._duplicado('docentes', numero, username, vistas):
+                continue
+            existente = existentes.get(username)
+            instancia = self._construir('docentes', User, numero, fila, existente)
+            if instancia is None:
+                continue
+            if existente is None and _vacio(fila.get('rol')):
+                instancia.rol = 'DOCENTE'
+            if not _vacio(fila.get('password')):
+                self.contrasenas[username] = str(fila['password'])
+            self._agregar_al_plan('docentes', instancia, existente)
+
+    def _validar_disponibilidad(self):
+        from schedule.models import HorarioPersonalizadoDocente
+
+        filas = self.datos['disponibilidad']
+        if not filas:
+            return
+
+        usernames = {str(f.get('docente') or '').strip() for f in filas}
+        docentes = {u.username: u for u in self.plan['docentes']['crear'] + self.plan['docentes']['actualizar']}
+        docentes_bd = User.objects.in_bulk(usernames - set(docentes), field_name='username')
+        docentes.update(docentes_bd)
+
+        existentes = {
+            (h.docente_id, h.dia_semana, h.hora_inicio, h.hora_fin): h
+            for h in HorarioPersonalizadoDocente.objects.filter(
+                docente_id__in=[d.pk for d in docentes.values() if d.pk is not None]
+            )
+        }
+
+        vistas = {}
+        for numero, fila in enumerate(filas, start=1):
+            username = str(fila.get('docente') or '').strip()
+            docente = docentes.get(username)
+            if docente is None and username:
+                self.errores['disponibilidad'].append({
+                    'fila': numero, 'errores': {'docente': [f"Docente desconocido: {username}"]},
+                })
+                continue
+
+            instancia = self._construir('disponibilidad', HorarioPersonalizadoDocente, numero, fila)
+            if instancia is None:
+                continue
+            if instancia.hora_inicio >= instancia.hora_fin:
+                self.errores['disponibilidad'].append({
+                    'fila': numero,
+                    'errores': {'hora_fin': ['La hora de inicio debe ser anterior a la hora de fin']},
+                })
+                continue
+            clave = (username, instancia.dia_semana, instancia.hora_inicio, instancia.hora_fin)
+            if self._duplicado('disponibilidad', numero, clave, vistas):
+                continue
+
+            existente = existentes.get((docente.pk, *clave[1:])) if docente.pk else None
+            if existente is not None:
+                existente.tipo = instancia.tipo
+                existente.descripcion = instancia.descripcion
+                instancia = existente
+            self.docente_de_disponibilidad[id(instancia)] = docente
+            self._agregar_al_plan('disponibilidad', instancia, existente)
+
+    # --- Escritura ---
+
+    @transaction.atomic
+    def escribir(self):
+        self._escribir_simple('aulas', Aula)
+        self._escribir_cursos()
+        self._escribir_docentes()
+        self._escribir_disponibilidad()
+        # bulk_create/bulk_update no emiten señales
+        invalidar_catalogos(*(e for e in ('aulas', 'cursos', 'docentes') if self.datos[e]))
+
+    def _escribir_simple(self, entidad, modelo):
+        plan = self.plan[entidad]
+        if plan['crear']:
+            modelo.objects.bulk_create(plan['crear'], batch_size=TAMANO_LOTE)
+        campos = sorted(self.campos_actualizados[entidad])
+        if plan['actualizar'] and campos:
+            modelo.objects.bulk_update(plan['actualizar'], campos, batch_size=TAMANO_LOTE)
+
+    def _escribir_cursos(self):
+        self._escribir_simple('cursos', Curso)
+        if self.datos['cursos']:
+            # bulk_create y la tabla intermedia no emiten señales
+            invalidar_grafo()
+        if not self.requisitos:
+            return
+
+        todos = set(self.requisitos)
+        for codigos in self.requisitos.values():
+            todos |= codigos
+        ids = dict(Curso.objects.filter(codigo__in=todos).values_list('codigo', 'id'))
+
+        Requisito = Curso.requisitos.through
+        origen = Requisito._meta.get_field('from_curso').attname
+        destino = Requisito._meta.get_field('to_curso').attname
+        # Los prerrequisitos indicados reemplazan a los anteriores
+        Requisito.objects.filter(**{f'{origen}__in': [ids[c] for c in self.requisitos]}).delete()
+        Requisito.objects.bulk_create([
+            Requisito(**{origen: ids[codigo], destino: ids[requisito]})
+            for codigo, requisitos in self.requisitos.items()
+            for requisito in requisitos
+        ], batch_size=TAMANO_LOTE)
+
+    def _escribir_docentes(self):
+        plan = self.plan['docentes']
+        for usuario in plan['crear'] + plan['actualizar']:
+            contrasena = self.contrasenas.get(usuario.username)
+            if contrasena is not None:
+                usuario.password = make_password(contrasena)
+                self.campos_actualizados['docentes'].add('password')
+            elif usuario.pk is None:
+                usuario.set_unusable_password()
+        self._escribir_simple('docentes', User)
+        # bulk_create no llama a User.save(): grupos por rol en una sola pasada
+        User.sincronizar_grupos_por_rol(plan['crear'] + plan['actualizar'])
+
+    def _escribir_disponibilidad(self):
+        from schedule.models import HorarioPersonalizadoDocente
+
+        plan = self.plan['disponibilidad']
+        for instancia in plan['crear']:
+            instancia.docente = self.docente_de_disponibilidad[id(instancia)]
+        if plan['crear']:
+            HorarioPersonalizadoDocente.objects.bulk_create(plan['crear'], batch_size=TAMANO_LOTE)
+        if plan['actualizar']:
+            HorarioPersonalizadoDocente.objects.bulk_update(
+                plan['actualizar'], ['tipo', 'descripcion'], batch_size=TAMANO_LOTE
+            )
@@ -0,0 +1,47 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from academic.importacion import ENTIDADES, ErrorImportacion, ImportadorCatalogo, leer_archivo
+
+
+class Command(BaseCommand):
+    help = 'Importa cursos, aulas, docentes y disponibilidad desde archivos CSV o JSON'
+
+    def add_arguments(self, parser):
+        for entidad in ENTIDADES:
+            parser.add_argument(f'--{entidad}', metavar='ARCHIVO', help=f'Archivo CSV/JSON de {entidad}')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Valida y muestra el reporte sin escribir en la base de datos')
+
+    def handle(self, *args, **options):
+        datos = {}
+        for entidad in ENTIDADES:
+            ruta = options.get(entidad)
+            if not ruta:
+                continue
+            try:
+                with open(ruta, 'rb') as archivo:
+                    datos[entidad] = leer_archivo(ruta, archivo.read())
+            except (OSError, ValueError, ErrorImportacion) as error:
+                raise CommandError(f'No se pudo leer {ruta}: {error}')
+
+        if not datos:
+            raise CommandError('Indique al menos un archivo (--cursos, --aulas, --docentes, --disponibilidad)')
+
+        reporte = ImportadorCatalogo(datos).ejecutar(dry_run=options['dry_run'])
+
+        for entidad, resumen in reporte['entidades'].items():
+            self.stdout.write(
+                f"{entidad}: {resumen['filas']} filas, {resumen['crear']} a crear, "
+                f"{resumen['actualizar']} a actualizar, {len(resumen['errores'])} con errores"
+            )
+            for error in resumen['errores']:
+                self.stdout.write(f"  fila {error['fila']}: {json.dumps(error['errores'], ensure_ascii=False)}")
+
+        if reporte['aplicado']:
+            self.stdout.write(self.style.SUCCESS('Importación completada'))
+        elif reporte['dry_run'] and not any(r['errores'] for r in reporte['entidades'].values()):
+            self.stdout.write(self.style.SUCCESS('Validación correcta (dry-run): no se escribió nada'))
+        else:
+            raise CommandError('La importación tiene errores: no se escribió nada')
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic', '0002_curso_requiere_laboratorio'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocenteCurso',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('preferencia', models.PositiveSmallIntegerField(default=1, verbose_name='Preferencia')),
+                ('curso', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='docentes_habilitados', to='academic.curso', verbose_name='Curso')),
+                ('docente', models.ForeignKey(limit_choices_to={'rol': 'DOCENTE'}, on_delete=django.db.models.deletion.CASCADE, related_name='cursos_habilitados', to=settings.AUTH_USER_MODEL, verbose_name='Docente')),
+            ],
+            options={
+                'verbose_name': 'Habilitación de Docente',
+                'verbose_name_plural': 'Habilitaciones de Docentes',
+                'ordering': ['curso', '-preferencia', 'docente'],
+                'unique_together': {('docente', 'curso')},
+            },
+        ),
+    ]
@@ -1,4 +1,8 @@
-from django.db import models
+import re
+from django.conf import settings
+from django.db import models, transaction
+
+from horunap_api.catalogos import invalidar_catalogos
 
 class Curso(models.Model):
     TIPO_CURSO = [
@@ -29,13 +33,18 @@ class Curso(models.Model):
     def __str__(self):
         return f"{self.codigo} - {self.nombre}"
     
+    # Términos del equipamiento que indican que el curso requiere laboratorio
+    TERMINOS_LABORATORIO = re.compile('laboratorio|lab|computadora|software|equipo', re.IGNORECASE)
+
+    @classmethod
+    def equipamiento_requiere_laboratorio(cls, equipamiento):
+        return bool(equipamiento) and cls.TERMINOS_LABORATORIO.search(equipamiento) is not None
+
     # MÉTODO PARA DETERMINAR SI REQUIERE LABORATORIO BASADO EN EQUIPAMIENTO
     def save(self, *args, **kwargs):
         # Si no se ha especificado requiere_laboratorio, determinarlo automáticamente
-        if not self.requiere_laboratorio and self.equipamiento_requerido:
-            equipamiento_lower = self.equipamiento_requerido.lower()
-            if any(term in equipamiento_lower for term in ['laboratorio', 'lab', 'computadora', 'software', 'equipo']):
-                self.requiere_laboratorio = True
+        if not self.requiere_laboratorio and self.equipamiento_requiere_laboratorio(self.equipamiento_requerido):
+            self.requiere_laboratorio = True
         super().save(*args, **kwargs)
 
 class Aula(models.Model):
@@ -91,4 +100,51 @@ class Aula(models.Model):
     @property
     def es_laboratorio(self):
         """Compatibilidad con el algoritmo"""
-        return self.tipo == 'LABORATORIO'
\ No newline at end of file
+        return self.tipo == 'LABORATORIO'
+
+class DocenteCurso(models.Model):
+    """
+    Cursos que cada docente está habilitado a dictar. Un curso sin
+    habilitaciones puede asignarse a cualquier docente.
+    """
+    docente = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        limit_choices_to={'rol': 'DOCENTE'},
+        related_name='cursos_habilitados',
+        verbose_name="Docente"
+    )
+    curso = models.ForeignKey(
+        Curso, on_delete=models.CASCADE, related_name='docentes_habilitados', verbose_name="Curso"
+    )
+    # Mayor es mejor; desempata las sugerencias entre docentes habilitados
+    preferencia = models.PositiveSmallIntegerField(default=1, verbose_name="Preferencia")
+
+    class Meta:
+        verbose_name = "Habilitación de Docente"
+        verbose_name_plural = "Habilitaciones de Docentes"
+        ordering = ['curso', '-preferencia', 'docente']
+        unique_together = ['docente', 'curso']
+
+    def __str__(self):
+        return f"{self.docente.username} - {self.curso.codigo} ({self.preferencia})"
+
+    @classmethod
+    def guardar_lote(cls, filas, curso=None):
+        """
+        Crea o actualiza en bloque las habilitaciones [{docente, curso, preferencia}].
+        Con `curso` el lote reemplaza todas las habilitaciones de ese curso.
+        """
+        with transaction.atomic():
+            if curso is not None:
+                cls.objects.filter(curso=curso).exclude(
+                    docente_id__in=[fila['docente'] for fila in filas]
+                ).delete()
+            # bulk_create no emite señales: se invalida el catálogo a mano
+            cls.objects.bulk_create(
+                [cls(docente_id=fila['docente'], curso_id=fila['curso'], preferencia=fila['preferencia'])
+                 for fila in filas],
+                update_conflicts=True, unique_fields=['docente', 'curso'], update_fields=['preferencia']
+            )
+            invalidar_catalogos('habilitaciones')
+        return len(filas)
@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from .models import Curso, Aula
+from users.models import User
+from .models import Curso, Aula, DocenteCurso
+from .grafo import obtener_grafo
 
 class CursoSerializer(serializers.ModelSerializer):
     requisitos_list = serializers.SerializerMethodField()
@@ -16,7 +18,9 @@ class CursoSerializer(serializers.ModelSerializer):
         depth = 1
     
     def get_requisitos_list(self, obj):
-        return [f"{curso.codigo} - {curso.nombre}" for curso in obj.requisitos.all()]
+        # Lectura del grafo cacheado: sin consultas por curso
+        grafo = obtener_grafo()
+        return [grafo.etiqueta(requisito_id) for requisito_id in grafo.requisitos_de(obj.id)]
     
     def get_estado(self, obj):
         return "Activo" if obj.activo else "Inactivo"
@@ -30,6 +34,17 @@ class CursoCreateSerializer(serializers.ModelSerializer):
             'capacidad_estimada', 'equipamiento_requerido', 'activo'
         ]
 
+    def validate_requisitos(self, requisitos):
+        if self.instance is None:
+            return requisitos
+        grafo = obtener_grafo()
+        ciclicos = [r.codigo for r in requisitos if grafo.crearia_ciclo(self.instance.id, r.id)]
+        if ciclicos:
+            raise serializers.ValidationError(
+                f"Estos prerrequisitos formarían un ciclo: {', '.join(ciclicos)}"
+            )
+        return requisitos
+
 class AulaSerializer(serializers.ModelSerializer):
     equipamiento_completo = serializers.SerializerMethodField()
     estado = serializers.SerializerMethodField()
@@ -61,4 +76,52 @@ class AulaCreateSerializer(serializers.ModelSerializer):
             'nombre', 'capacidad', 'tipo', 'edificio', 'piso',
             'tiene_proyector', 'tiene_computadoras', 'tiene_pizarra_digital',
             'equipamiento_adicional', 'activa'
-        ]
\ No newline at end of file
+        ]
+
+class DocenteCursoSerializer(serializers.ModelSerializer):
+    docente_nombre = serializers.CharField(source='docente.username', read_only=True)
+    curso_codigo = serializers.CharField(source='curso.codigo', read_only=True)
+
+    class Meta:
+        model = DocenteCurso
+        fields = ['id', 'docente', 'docente_nombre', 'curso', 'curso_codigo', 'preferencia']
+
+class HabilitacionSerializer(serializers.Serializer):
+    docente = serializers.IntegerField()
+    curso = serializers.IntegerField(required=False)
+    preferencia = serializers.IntegerField(min_value=0, max_value=100, default=1)
+
+class HabilitacionesMasivasSerializer(serializers.Serializer):
+    """
+    Lote de habilitaciones docente-curso. Los ids se validan con una consulta
+    por entidad, no por fila. Sin `curso` en el contexto cada fila debe traer
+    el suyo.
+    """
+    habilitaciones = HabilitacionSerializer(many=True)
+
+    def validate_habilitaciones(self, filas):
+        curso = self.context.get('curso')
+        if curso is not None:
+            for fila in filas:
+                fila['curso'] = curso.id
+        elif any('curso' not in fila for fila in filas):
+            raise serializers.ValidationError("Cada habilitación debe indicar el curso")
+
+        pares = [(fila['docente'], fila['curso']) for fila in filas]
+        if len(pares) != len(set(pares)):
+            raise serializers.ValidationError("Hay habilitaciones repetidas")
+
+        docentes = {fila['docente'] for fila in filas}
+        validos = set(User.objects.filter(id__in=docentes, rol='DOCENTE').values_list('id', flat=True))
+        if docentes - validos:
+            raise serializers.ValidationError(
+                f"Docentes no encontrados: {', '.join(map(str, sorted(docentes - validos)))}"
+            )
+        if curso is None:
+            cursos = {fila['curso'] for fila in filas}
+            existentes = set(Curso.objects.filter(id__in=cursos).order_by().values_list('id', flat=True))
+            if cursos - existentes:
+                raise serializers.ValidationError(
+                    f"Cursos no encontrados: {', '.join(map(str, sorted(cursos - existentes)))}"
+                )
+        return filas
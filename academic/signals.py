@@ -0,0 +1,29 @@
+# academic/signals.py
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from horunap_api.catalogos import invalidar_catalogos
+from .grafo import invalidar_grafo
+from .models import Curso, Aula, DocenteCurso
+
+
+@receiver(post_save, sender=Curso)
+@receiver(post_delete, sender=Curso)
+@receiver(m2m_changed, sender=Curso.requisitos.through)
+def requisitos_modificados(sender, **kwargs):
+    """Cambios en cursos o prerrequisitos invalidan el grafo y el catálogo de cursos"""
+    if kwargs.get('action', 'post_').startswith('post_'):
+        invalidar_grafo()
+        invalidar_catalogos('cursos')
+
+
+@receiver(post_save, sender=Aula)
+@receiver(post_delete, sender=Aula)
+def aula_modificada(sender, **kwargs):
+    invalidar_catalogos('aulas')
+
+
+@receiver(post_save, sender=DocenteCurso)
+@receiver(post_delete, sender=DocenteCurso)
+def habilitacion_modificada(sender, **kwargs):
+    invalidar_catalogos('habilitaciones')
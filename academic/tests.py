@@ -2,7 +2,12 @@ from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
-from .models import Curso, Aula
+from django.core.files.uploadedfile import SimpleUploadedFile
+from users.models import User
+from schedule.models import HorarioPersonalizadoDocente
+from .models import Curso, Aula, DocenteCurso
+from .grafo import GrafoRequisitos, obtener_grafo
+from .importacion import ImportadorCatalogo
 
 class CursoModelTest(TestCase):
     def setUp(self):
@@ -79,4 +84,201 @@ class AulaAPITest(APITestCase):
     def test_filter_aulas_by_capacity(self):
         url = reverse('aula-list') + '?capacidad_min=20'
         response = self.client.get(url)
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+class ImportacionCatalogoTest(APITestCase):
+    def setUp(self):
+        Curso.objects.create(nombre="Matemática I", codigo="MAT1", creditos=4)
+        self.datos = {
+            'cursos': [
+                {'codigo': 'PRG1', 'nombre': 'Programación I', 'creditos': '4',
+                 'equipamiento_requerido': 'Computadoras con software', 'requisitos': 'MAT1'},
+                {'codigo': 'PRG2', 'nombre': 'Programación II', 'creditos': '4', 'requisitos': 'PRG1;MAT1'},
+            ],
+            'aulas': [{'nombre': 'LAB-1', 'capacidad': '30', 'tipo': 'LABORATORIO', 'tiene_computadoras': 'si'}],
+            'docentes': [{'username': 'jperez', 'first_name': 'Juan', 'last_name': 'Pérez'}],
+            'disponibilidad': [
+                {'docente': 'jperez', 'dia_semana': 'LUNES', 'hora_inicio': '08:00', 'hora_fin': '12:00'},
+            ],
+        }
+
+    def test_dry_run_no_escribe(self):
+        reporte = ImportadorCatalogo(self.datos).ejecutar(dry_run=True)
+        self.assertFalse(reporte['aplicado'])
+        self.assertEqual(reporte['entidades']['cursos']['crear'], 2)
+        self.assertEqual(Curso.objects.count(), 1)
+        self.assertFalse(User.objects.filter(username='jperez').exists())
+
+    def test_importacion_crea_y_enlaza(self):
+        reporte = ImportadorCatalogo(self.datos).ejecutar()
+        self.assertTrue(reporte['aplicado'])
+        prg2 = Curso.objects.get(codigo='PRG2')
+        self.assertEqual(set(prg2.requisitos.values_list('codigo', flat=True)), {'PRG1', 'MAT1'})
+        self.assertTrue(Curso.objects.get(codigo='PRG1').requiere_laboratorio)
+        self.assertFalse(prg2.requiere_laboratorio)
+        self.assertTrue(Aula.objects.get(nombre='LAB-1').tiene_computadoras)
+        docente = User.objects.get(username='jperez')
+        self.assertEqual(docente.rol, 'DOCENTE')
+        self.assertTrue(docente.groups.filter(name='Docentes').exists())
+        self.assertEqual(HorarioPersonalizadoDocente.objects.filter(docente=docente).count(), 1)
+
+        # Reimportar actualiza en lugar de duplicar
+        self.datos['cursos'][1]['nombre'] = 'Programación Avanzada'
+        reporte = ImportadorCatalogo(self.datos).ejecutar()
+        self.assertEqual(reporte['entidades']['cursos']['actualizar'], 2)
+        self.assertEqual(Curso.objects.get(codigo='PRG2').nombre, 'Programación Avanzada')
+        self.assertEqual(HorarioPersonalizadoDocente.objects.filter(docente=docente).count(), 1)
+
+    def test_errores_abortan_la_importacion(self):
+        self.datos['cursos'].append({'codigo': 'X1', 'nombre': 'Sin créditos', 'creditos': 'cuatro',
+                                     'requisitos': 'NOEXISTE'})
+        self.datos['cursos'].append({'codigo': 'PRG1', 'nombre': 'Duplicado', 'creditos': '3'})
+        reporte = ImportadorCatalogo(self.datos).ejecutar()
+        self.assertFalse(reporte['aplicado'])
+        filas = [e['fila'] for e in reporte['entidades']['cursos']['errores']]
+        self.assertEqual(filas, [3, 4])
+        self.assertEqual(Curso.objects.count(), 1)
+        self.assertEqual(Aula.objects.count(), 0)
+
+    def test_aulas_se_emparejan_sin_distinguir_mayusculas(self):
+        aula = Aula.objects.create(nombre="Lab 101", capacidad=20)
+        reporte = ImportadorCatalogo({'aulas': [{'nombre': 'lab 101', 'capacidad': '35'}]}).ejecutar()
+        self.assertEqual(reporte['entidades']['aulas']['actualizar'], 1)
+        self.assertEqual(Aula.objects.count(), 1)
+        aula.refresh_from_db()
+        self.assertEqual(aula.capacidad, 35)
+
+    def test_rechaza_ciclos_de_prerrequisitos(self):
+        # MAT1 -> PRG1 -> PRG2 -> MAT1, cerrado con un curso ya existente
+        self.datos['cursos'].append({'codigo': 'MAT1', 'nombre': 'Matemática I', 'creditos': '4',
+                                     'requisitos': 'PRG2'})
+        reporte = ImportadorCatalogo(self.datos).ejecutar()
+        self.assertFalse(reporte['aplicado'])
+        errores = reporte['entidades']['cursos']['errores']
+        self.assertEqual(sorted(e['fila'] for e in errores), [1, 2, 3])
+        self.assertIn('ciclo', errores[0]['errores']['requisitos'][0])
+        self.assertFalse(Curso.objects.filter(codigo='PRG1').exists())
+
+        # Contra prerrequisitos ya guardados
+        del self.datos['cursos'][2]
+        ImportadorCatalogo(self.datos).ejecutar()
+        reporte = ImportadorCatalogo({'cursos': [
+            {'codigo': 'MAT1', 'nombre': 'Matemática I', 'creditos': '4', 'requisitos': 'PRG2'},
+        ]}).ejecutar()
+        self.assertEqual([e['fila'] for e in reporte['entidades']['cursos']['errores']], [1])
+
+    def test_endpoint_importar(self):
+        url = reverse('importar-catalogo')
+        docente = User.objects.create_user(username='doc', password='x', rol='DOCENTE')
+        self.client.force_authenticate(docente)
+        self.assertEqual(self.client.post(url, self.datos, format='json').status_code, status.HTTP_403_FORBIDDEN)
+
+        admin = User.objects.create_user(username='admin', password='x', rol='ADMIN')
+        self.client.force_authenticate(admin)
+        csv_cursos = SimpleUploadedFile('cursos.csv', 'codigo,nombre,creditos\nFIS1,Física I,3\n'.encode('utf-8'))
+        response = self.client.post(url + '?dry_run=true', {'cursos': csv_cursos}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(Curso.objects.filter(codigo='FIS1').exists())
+
+        response = self.client.post(url, self.datos, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Curso.objects.filter(codigo='PRG2').exists())
+
+class GrafoRequisitosTest(APITestCase):
+    def setUp(self):
+        self.mat1 = Curso.objects.create(nombre="Matemática I", codigo="MAT1", creditos=4)
+        self.mat2 = Curso.objects.create(nombre="Matemática II", codigo="MAT2", creditos=4)
+        self.fis1 = Curso.objects.create(nombre="Física I", codigo="FIS1", creditos=4)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mat2.requisitos.add(self.mat1)
+            self.fis1.requisitos.add(self.mat2)
+
+    def test_niveles_y_cierre(self):
+        grafo = obtener_grafo()
+        self.assertEqual([grafo.nivel(c.id) for c in (self.mat1, self.mat2, self.fis1)], [0, 1, 2])
+        self.assertTrue(grafo.es_requisito(self.mat1.id, self.fis1.id))
+        self.assertEqual(grafo.dependientes_de(self.mat1.id, transitivos=True), [self.fis1.id, self.mat2.id])
+        self.assertTrue(grafo.crearia_ciclo(self.mat1.id, self.fis1.id))
+        self.assertEqual(grafo.ciclos, [])
+
+    def test_detecta_ciclos(self):
+        grafo = GrafoRequisitos(
+            [(1, 'A', 'A'), (2, 'B', 'B'), (3, 'C', 'C'), (4, 'D', 'D')],
+            [(1, 2), (2, 3), (3, 1), (4, 1)],
+        )
+        self.assertEqual(grafo.ciclos, [[1, 2, 3]])
+        self.assertIsNone(grafo.nivel(4))
+        self.assertEqual(set(grafo.requisitos_de(4, transitivos=True)), {1, 2, 3})
+        self.assertEqual(set(grafo.dependientes_de(3, transitivos=True)), {1, 2, 3, 4})
+
+    def test_cache_se_invalida_con_cambios_m2m(self):
+        obtener_grafo()
+        with self.assertNumQueries(0):
+            self.assertEqual(obtener_grafo().requisitos_de(self.fis1.id), [self.mat2.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fis1.requisitos.add(self.mat1)
+        self.assertEqual(obtener_grafo().requisitos_de(self.fis1.id), [self.mat1.id, self.mat2.id])
+
+    def test_api_dependencias_y_ciclos(self):
+        response = self.client.get(reverse('curso-dependencias', args=[self.mat1.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['dependientes_transitivos']), 2)
+
+        response = self.client.patch(reverse('curso-detail', args=[self.mat1.id]),
+                                     {'requisitos': [self.fis1.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_dependencias_de_curso_recien_creado(self):
+        obtener_grafo()
+        # Sin confirmar la transacción: el grafo cacheado aún no lo conoce
+        quim = Curso.objects.create(nombre="Química", codigo="QUI1", creditos=3)
+        quim.requisitos.add(self.mat2)
+        response = self.client.get(reverse('curso-dependencias', args=[quim.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['curso'], "QUI1 - Química")
+        self.assertEqual([r['id'] for r in response.data['requisitos']], [self.mat2.id])
+
+class HabilitacionesDocenteTest(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='password123', rol='ADMIN')
+        self.docente1 = User.objects.create_user(username='d1', password='password123', rol='DOCENTE')
+        self.docente2 = User.objects.create_user(username='d2', password='password123', rol='DOCENTE')
+        self.curso1 = Curso.objects.create(nombre="Curso 1", codigo="H1", creditos=3)
+        self.curso2 = Curso.objects.create(nombre="Curso 2", codigo="H2", creditos=3)
+        self.client.force_authenticate(user=self.admin)
+
+    def test_lote_y_reemplazo_por_curso(self):
+        from horunap_api.catalogos import docentes_por_curso
+
+        url = reverse('curso-habilitaciones')
+        filas = [
+            {'docente': self.docente1.id, 'curso': self.curso1.id, 'preferencia': 3},
+            {'docente': self.docente2.id, 'curso': self.curso1.id},
+            {'docente': self.docente2.id, 'curso': self.curso2.id},
+        ]
+        # Validación (docentes y cursos) e inserción en bloque, sin consultas por fila
+        with self.assertNumQueries(6):
+            response = self.client.post(url, {'habilitaciones': filas}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(docentes_por_curso()[self.curso1.id], {self.docente1.id: 3, self.docente2.id: 1})
+
+        # PUT reemplaza la lista del curso y actualiza las preferencias
+        url = reverse('curso-docentes', args=[self.curso1.id])
+        response = self.client.put(url, {'habilitaciones': [{'docente': self.docente2.id, 'preferencia': 5}]},
+                                   format='json')
+        self.assertEqual([(h['docente'], h['preferencia']) for h in response.data], [(self.docente2.id, 5)])
+        self.assertEqual(docentes_por_curso()[self.curso1.id], {self.docente2.id: 5})
+        self.assertEqual(DocenteCurso.objects.filter(curso=self.curso2).count(), 1)
+
+    def test_validacion(self):
+        url = reverse('curso-habilitaciones')
+        response = self.client.post(url, {'habilitaciones': [
+            {'docente': self.admin.id, 'curso': self.curso1.id},
+            {'docente': self.docente1.id},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=self.docente1)
+        response = self.client.put(reverse('curso-docentes', args=[self.curso1.id]),
+                                   {'habilitaciones': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
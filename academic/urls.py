@@ -7,5 +7,6 @@ router.register(r'cursos', views.CursoViewSet, basename='curso')
 router.register(r'aulas', views.AulaViewSet, basename='aula')
 
 urlpatterns = [
+    path('importar/', views.ImportarCatalogoView.as_view(), name='importar-catalogo'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,15 +1,39 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q
-from .models import Curso, Aula
+from horunap_api.catalogos import obtener as obtener_catalogo
+from .models import Curso, Aula, DocenteCurso
+from .estadisticas import estadisticas_cursos, estadisticas_aulas
+from .grafo import obtener_grafo
+from .importacion import ENTIDADES, ErrorImportacion, ImportadorCatalogo, leer_archivo
 from .serializers import (
     CursoSerializer, CursoCreateSerializer, 
-    AulaSerializer, AulaCreateSerializer
+    AulaSerializer, AulaCreateSerializer,
+    DocenteCursoSerializer, HabilitacionesMasivasSerializer
 )
 
-class CursoViewSet(viewsets.ModelViewSet):
+class CatalogoCacheadoMixin:
+    """
+    El listado completo (sin filtros) se sirve ya serializado desde la caché
+    del catálogo; se invalida al guardar o borrar cualquier elemento
+    """
+    catalogo = None
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params:
+            return super().list(request, *args, **kwargs)
+        return Response(obtener_catalogo((self.catalogo,), f'{self.catalogo}:lista', self._serializar))
+
+    def _serializar(self, queryset=None):
+        queryset = self.get_queryset() if queryset is None else queryset
+        return list(self.get_serializer(queryset, many=True).data)
+
+class CursoViewSet(CatalogoCacheadoMixin, viewsets.ModelViewSet):
     queryset = Curso.objects.all()
+    catalogo = 'cursos'
     
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -17,7 +41,8 @@ class CursoViewSet(viewsets.ModelViewSet):
         return CursoSerializer
     
     def get_queryset(self):
-        queryset = Curso.objects.all()
+        # CursoSerializer anida los prerrequisitos (depth=1)
+        queryset = Curso.objects.prefetch_related('requisitos')
         
         # Filtros
         tipo = self.request.query_params.get('tipo', None)
@@ -36,22 +61,85 @@ class CursoViewSet(viewsets.ModelViewSet):
         
         return queryset
     
+    @action(detail=True, methods=['get'])
+    def dependencias(self, request, pk=None):
+        """Prerrequisitos y cursos dependientes, directos y transitivos"""
+        curso = self.get_object()
+        grafo = obtener_grafo()
+        if curso.id not in grafo.etiquetas:
+            # Curso creado después de la última versión del grafo
+            grafo = obtener_grafo(forzar=True)
+        etiquetas = lambda ids: [{'id': i, 'curso': grafo.etiqueta(i)} for i in ids]
+        return Response({
+            'curso': str(curso),
+            'nivel': grafo.nivel(curso.id),
+            'requisitos': etiquetas(grafo.requisitos_de(curso.id)),
+            'requisitos_transitivos': etiquetas(grafo.requisitos_de(curso.id, transitivos=True)),
+            'dependientes': etiquetas(grafo.dependientes_de(curso.id)),
+            'dependientes_transitivos': etiquetas(grafo.dependientes_de(curso.id, transitivos=True)),
+        })
+
     @action(detail=False, methods=['get'])
-    def estadisticas(self, request):
-        total_cursos = Curso.objects.count()
-        cursos_activos = Curso.objects.filter(activo=True).count()
-        cursos_obligatorios = Curso.objects.filter(tipo='OBLIGATORIO').count()
-        cursos_electivos = Curso.objects.filter(tipo='ELECTIVO').count()
-        
+    def grafo(self, request):
+        """Niveles topológicos de la malla y ciclos de prerrequisitos detectados"""
+        grafo = obtener_grafo()
+        niveles = {}
+        for curso_id in grafo.orden_topologico:
+            niveles.setdefault(grafo.niveles[curso_id], []).append(grafo.etiqueta(curso_id))
         return Response({
-            'total_cursos': total_cursos,
-            'cursos_activos': cursos_activos,
-            'cursos_obligatorios': cursos_obligatorios,
-            'cursos_electivos': cursos_electivos,
+            'niveles': [{'nivel': nivel, 'cursos': cursos} for nivel, cursos in sorted(niveles.items())],
+            'ciclos': [[grafo.etiqueta(c) for c in ciclo] for ciclo in grafo.ciclos],
+            'sin_nivel': [grafo.etiqueta(c) for c, nivel in grafo.niveles.items() if nivel is None],
         })
 
-class AulaViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def estadisticas(self, request):
+        return Response(estadisticas_cursos())
+
+    @action(detail=True, methods=['get', 'put'])
+    def docentes(self, request, pk=None):
+        """
+        Docentes habilitados para dictar el curso. PUT reemplaza la lista
+        completa: {"habilitaciones": [{"docente": id, "preferencia": n}, ...]}
+        """
+        curso = self.get_object()
+        if request.method == 'PUT':
+            respuesta = self._guardar_habilitaciones(request, curso)
+            if respuesta is not None:
+                return respuesta
+        habilitaciones = DocenteCurso.objects.filter(curso=curso).select_related('docente', 'curso')
+        return Response(DocenteCursoSerializer(habilitaciones, many=True).data)
+
+    @action(detail=False, methods=['get', 'post'])
+    def habilitaciones(self, request):
+        """
+        Habilitaciones docente-curso. POST crea o actualiza en bloque:
+        {"habilitaciones": [{"docente": id, "curso": id, "preferencia": n}, ...]}
+        """
+        if request.method == 'POST':
+            respuesta = self._guardar_habilitaciones(request)
+            if respuesta is not None:
+                return respuesta
+        habilitaciones = DocenteCurso.objects.select_related('docente', 'curso')
+        docente = request.query_params.get('docente', None)
+        if docente:
+            habilitaciones = habilitaciones.filter(docente_id=docente)
+        return Response(DocenteCursoSerializer(habilitaciones, many=True).data)
+
+    def _guardar_habilitaciones(self, request, curso=None):
+        """Valida y guarda el lote; devuelve la respuesta de error, si la hay"""
+        if not (request.user.is_authenticated and (request.user.is_superuser or request.user.rol == 'ADMIN')):
+            return Response({'error': 'Solo los administradores pueden editar habilitaciones'},
+                            status=status.HTTP_403_FORBIDDEN)
+        serializer = HabilitacionesMasivasSerializer(data=request.data, context={'curso': curso})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        DocenteCurso.guardar_lote(serializer.validated_data['habilitaciones'], curso=curso)
+        return None
+
+class AulaViewSet(CatalogoCacheadoMixin, viewsets.ModelViewSet):
     queryset = Aula.objects.all()
+    catalogo = 'aulas'
     
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -84,18 +172,47 @@ class AulaViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def disponibles(self, request):
         """Aulas disponibles para asignación"""
-        aulas = Aula.objects.filter(activa=True)
-        serializer = self.get_serializer(aulas, many=True)
-        return Response(serializer.data)
+        return Response(obtener_catalogo(
+            ('aulas',), 'aulas:disponibles', lambda: self._serializar(Aula.objects.filter(activa=True))
+        ))
     
     @action(detail=False, methods=['get'])
     def estadisticas(self, request):
-        total_aulas = Aula.objects.count()
-        aulas_activas = Aula.objects.filter(activa=True).count()
-        capacidad_total = sum(aula.capacidad for aula in Aula.objects.filter(activa=True))
-        
-        return Response({
-            'total_aulas': total_aulas,
-            'aulas_activas': aulas_activas,
-            'capacidad_total': capacidad_total,
-        })
\ No newline at end of file
+        return Response(estadisticas_aulas())
+
+
+class ImportarCatalogoView(APIView):
+    """
+    Importación masiva de catálogos. Acepta archivos CSV/JSON (multipart,
+    un campo por entidad) o un cuerpo JSON {"cursos": [...], "aulas": [...]}.
+    Con dry_run=true solo devuelve el reporte de validación.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not (request.user.is_superuser or request.user.rol == 'ADMIN'):
+            return Response({'error': 'Solo los administradores pueden importar catálogos'},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        datos = {}
+        try:
+            for entidad in ENTIDADES:
+                if entidad in request.FILES:
+                    archivo = request.FILES[entidad]
+                    datos[entidad] = leer_archivo(archivo.name, archivo.read())
+                elif isinstance(request.data.get(entidad), list):
+                    datos[entidad] = request.data[entidad]
+        except (ValueError, ErrorImportacion) as error:
+            return Response({'error': f'No se pudo leer el archivo: {error}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        if not datos:
+            return Response({'error': f"Envíe al menos una de las entidades: {', '.join(ENTIDADES)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        dry_run = str(request.query_params.get('dry_run', request.data.get('dry_run', ''))).lower() in ('1', 'true', 'si')
+        reporte = ImportadorCatalogo(datos).ejecutar(dry_run=dry_run)
+
+        if not reporte['aplicado'] and not dry_run:
+            return Response(reporte, status=status.HTTP_400_BAD_REQUEST)
+        return Response(reporte, status=status.HTTP_201_CREATED if reporte['aplicado'] else status.HTTP_200_OK)
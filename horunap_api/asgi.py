@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+El flujo de progreso /api/horarios/<id>/progreso/ (Server-Sent Events) es una
+vista asíncrona: servido con un servidor ASGI (p. ej. `uvicorn horunap_api.asgi:application`)
+los clientes conectados no ocupan un hilo mientras esperan.
 """
 
 import os
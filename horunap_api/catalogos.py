@@ -0,0 +1,109 @@
+"""
+Caché versionada de los catálogos de referencia: cursos, aulas, docentes y
+habilitaciones docente-curso.
+
+Cambian pocas veces por semestre pero se leen en casi todas las peticiones y
+en cada generación. Cada catálogo tiene su contador de versión (ver
+versiones.py) que las señales de los modelos incrementan al guardar o borrar;
+las claves incluyen la versión de los catálogos de los que dependen, así que
+una entrada nunca se sirve obsoleta y no hace falta borrarla.
+
+Se leen en dos niveles: la caché `local` del proceso (locmem acotada) y la
+caché `default`, compartida entre procesos si se configura Redis
+(HORUNAP_CACHE_REDIS). Se guardan tanto respuestas ya serializadas como las
+estructuras que usa el motor (listas de instancias).
+
+Las escrituras masivas (bulk_create, update()) no emiten señales y deben
+llamar a invalidar_catalogos().
+"""
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import transaction
+
+from .versiones import obtener_version, incrementar_version
+
+CATALOGOS = {
+    'cursos': 'catalogo:cursos',
+    'aulas': 'catalogo:aulas',
+    'docentes': 'catalogo:docentes',
+    'habilitaciones': 'catalogo:habilitaciones',
+    # No es de referencia, pero sus indicadores se cachean igual
+    'conflictos': 'catalogo:conflictos',
+}
+
+CACHE_TIMEOUT = 60 * 60
+
+# Campos de los docentes que se guardan en caché (sin contraseña)
+CAMPOS_DOCENTE = ('id', 'username', 'first_name', 'last_name', 'email', 'rol', 'is_active')
+
+
+def _cache_local():
+    return caches['local'] if 'local' in settings.CACHES else None
+
+
+def obtener(catalogos, nombre, construir):
+    """
+    Valor cacheado `nombre`, que depende de los catálogos indicados; si no
+    existe para sus versiones actuales se construye con `construir()`
+    """
+    versiones = '.'.join(str(obtener_version(CATALOGOS[catalogo])) for catalogo in catalogos)
+    clave = f'catalogo:{nombre}:{versiones}'
+
+    local = _cache_local()
+    valor = local.get(clave) if local is not None else None
+    if valor is None:
+        valor = cache.get(clave)
+        if valor is None:
+            valor = construir()
+            cache.set(clave, valor, CACHE_TIMEOUT)
+        if local is not None:
+            local.set(clave, valor, CACHE_TIMEOUT)
+    return valor
+
+
+def invalidar_catalogos(*catalogos):
+    """
+    Invalida los catálogos indicados ahora y otra vez al confirmarse la
+    transacción en curso: la segunda descarta lo que otro proceso haya
+    cacheado leyendo los datos previos al commit
+    """
+    def incrementar():
+        for catalogo in catalogos:
+            incrementar_version(CATALOGOS[catalogo])
+    incrementar()
+    transaction.on_commit(incrementar)
+
+
+# --- Estructuras del motor ---
+
+def cursos_activos():
+    from academic.models import Curso
+
+    return obtener(('cursos',), 'cursos_activos', lambda: list(Curso.objects.filter(activo=True)))
+
+
+def aulas_activas():
+    from academic.models import Aula
+
+    return obtener(('aulas',), 'aulas_activas', lambda: list(Aula.objects.filter(activa=True)))
+
+
+def docentes_activos():
+    from users.models import User
+
+    return obtener(('docentes',), 'docentes_activos', lambda: list(
+        User.objects.filter(rol='DOCENTE', is_active=True).only(*CAMPOS_DOCENTE)
+    ))
+
+
+def docentes_por_curso():
+    """{curso_id: {docente_id: preferencia}} de los cursos con habilitaciones"""
+    from academic.models import DocenteCurso
+
+    def construir():
+        indice = {}
+        for curso_id, docente_id, preferencia in DocenteCurso.objects.order_by().values_list(
+                'curso_id', 'docente_id', 'preferencia'):
+            indice.setdefault(curso_id, {})[docente_id] = preferencia
+        return indice
+    return obtener(('cursos', 'docentes', 'habilitaciones'), 'docentes_por_curso', construir)
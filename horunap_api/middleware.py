@@ -1,3 +1,12 @@
+import contextvars
+import json
+import logging
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
 from django.shortcuts import redirect
 from django.urls import reverse
 
@@ -15,4 +24,227 @@ class RedireccionAutenticacionMiddleware:
             elif request.user.rol == 'DOCENTE':
                 return redirect('dashboard_docente')
         
-        return response
\ No newline at end of file
+        return response
+
+# --- PERFILAMIENTO POR PETICIÓN ---
+
+logger = logging.getLogger(__name__)
+
+# Perfil de la petición en curso (None si el perfilamiento está apagado)
+_perfil_actual = contextvars.ContextVar('horunap_perfil', default=None)
+
+
+class PerfilPeticion:
+    """Acumula los tiempos de una petición perfilada"""
+
+    def __init__(self, modo):
+        self.modo = modo
+        self.inicio = time.perf_counter()
+        self.consultas = Counter()
+        self.num_consultas = 0
+        self.tiempo_sql = 0.0
+        self.tiempo_serializacion = 0.0
+        self.tiempo_templates = 0.0
+        self.tiempo_render = 0.0
+        self._profundidad = {'ser': 0, 'tpl': 0}
+
+    def registrar_consulta(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tiempo_sql += time.perf_counter() - inicio
+            self.num_consultas += 1
+            # El SQL llega con marcadores (%s): la misma forma repetida es la firma N+1
+            self.consultas[sql] += 1
+
+    def medir(self, clave, atributo, funcion, *args, **kwargs):
+        # Solo se mide el nivel exterior (serializers anidados, includes de templates)
+        if self._profundidad[clave]:
+            return funcion(*args, **kwargs)
+        self._profundidad[clave] += 1
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            setattr(self, atributo, getattr(self, atributo) + time.perf_counter() - inicio)
+            self._profundidad[clave] -= 1
+
+    def duplicadas(self, limite=5):
+        repetidas = [(sql, veces) for sql, veces in self.consultas.most_common() if veces > 1]
+        return repetidas[:limite], sum(veces - 1 for _, veces in self.consultas.items() if veces > 1)
+
+    def server_timing(self):
+        total = (time.perf_counter() - self.inicio) * 1000
+        _, num_duplicadas = self.duplicadas()
+        partes = [
+            f'db;dur={self.tiempo_sql * 1000:.2f};desc="{self.num_consultas} consultas"',
+            f'dup;desc="{num_duplicadas} duplicadas"',
+            f'ser;dur={self.tiempo_serializacion * 1000:.2f};desc="serializacion"',
+            f'tpl;dur={self.tiempo_templates * 1000:.2f};desc="templates"',
+            f'render;dur={self.tiempo_render * 1000:.2f};desc="render respuesta"',
+            f'total;dur={total:.2f}',
+        ]
+        return ', '.join(partes)
+
+    def como_dict(self):
+        repetidas, num_duplicadas = self.duplicadas()
+        return {
+            'consultas': self.num_consultas,
+            'tiempo_sql_ms': round(self.tiempo_sql * 1000, 2),
+            'consultas_duplicadas': num_duplicadas,
+            'top_duplicadas': [{'sql': sql[:200], 'veces': veces} for sql, veces in repetidas],
+            'serializacion_ms': round(self.tiempo_serializacion * 1000, 2),
+            'templates_ms': round(self.tiempo_templates * 1000, 2),
+            'render_ms': round(self.tiempo_render * 1000, 2),
+            'total_ms': round((time.perf_counter() - self.inicio) * 1000, 2),
+        }
+
+
+def _instrumentar_render_templates():
+    from django.template.base import Template
+
+    if getattr(Template.render, '_horunap_perfil', False):
+        return
+    original = Template.render
+
+    def render(self, context):
+        perfil = _perfil_actual.get()
+        if perfil is None:
+            return original(self, context)
+        return perfil.medir('tpl', 'tiempo_templates', original, self, context)
+
+    render._horunap_perfil = True
+    Template.render = render
+
+
+def _instrumentar_serializers():
+    try:
+        from rest_framework.serializers import BaseSerializer
+    except ImportError:
+        return
+
+    propiedad = BaseSerializer.data
+    if getattr(propiedad.fget, '_horunap_perfil', False):
+        return
+    original = propiedad.fget
+
+    def data(self):
+        perfil = _perfil_actual.get()
+        if perfil is None:
+            return original(self)
+        return perfil.medir('ser', 'tiempo_serializacion', original, self)
+
+    data._horunap_perfil = True
+    BaseSerializer.data = property(data)
+
+
+class PerfilamientoMiddleware:
+    """
+    Perfilamiento opcional por petición.
+
+    Se activa con la cabecera `X-Horunap-Perfil` (o `?_perfil=`) para usuarios
+    staff, o para cualquiera si DEBUG está activo; con
+    HORUNAP_PERFILAMIENTO_STAFF = True se activa en todas las peticiones de staff.
+    Mide consultas SQL (número, tiempo y repetidas: la firma N+1), tiempo de
+    serialización DRF, de render de templates y de render de la respuesta, y
+    los emite en la cabecera `Server-Timing`. Con el valor `json` agrega el
+    detalle en la cabecera `X-Horunap-Perfil-Detalle`.
+
+    Apagado, el costo es leer una cabecera y una ContextVar.
+
+    Soporta los dos modos de Django: bajo ASGI no obliga a las vistas
+    asíncronas a ejecutarse en un hilo.
+    """
+
+    HEADER = 'X-Horunap-Perfil'
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.staff_siempre = getattr(settings, 'HORUNAP_PERFILAMIENTO_STAFF', False)
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+        _instrumentar_render_templates()
+        _instrumentar_serializers()
+
+    def _solicitado(self, request):
+        return request.headers.get(self.HEADER) or request.GET.get('_perfil')
+
+    def _modo(self, request, user):
+        modo = self._solicitado(request)
+        es_staff = user is not None and user.is_authenticated and user.is_staff
+        if modo and (settings.DEBUG or es_staff):
+            return modo
+        if self.staff_siempre and es_staff:
+            return 'timing'
+        return None
+
+    def __call__(self, request):
+        if self.es_async:
+            return self.__acall__(request)
+
+        if not self._solicitado(request) and not self.staff_siempre:
+            return self.get_response(request)
+        modo = self._modo(request, getattr(request, 'user', None))
+        if modo is None:
+            return self.get_response(request)
+
+        perfil = PerfilPeticion(modo)
+        token = _perfil_actual.set(perfil)
+        try:
+            with connection.execute_wrapper(perfil.registrar_consulta):
+                response = self.get_response(request)
+        finally:
+            _perfil_actual.reset(token)
+        return self._anotar(request, response, perfil)
+
+    async def __acall__(self, request):
+        if not self._solicitado(request) and not self.staff_siempre:
+            return await self.get_response(request)
+        modo = self._modo(request, await request.auser())
+        if modo is None:
+            return await self.get_response(request)
+
+        perfil = PerfilPeticion(modo)
+        token = _perfil_actual.set(perfil)
+        # El ORM de las vistas asíncronas consulta desde el hilo de sync_to_async
+        # (uno por petición): el contador se instala en la conexión de ese hilo
+        def instalar():
+            envoltura = connection.execute_wrapper(perfil.registrar_consulta)
+            envoltura.__enter__()
+            return envoltura
+        envoltura = await sync_to_async(instalar)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(envoltura.__exit__)(None, None, None)
+            _perfil_actual.reset(token)
+        return self._anotar(request, response, perfil)
+
+    def _anotar(self, request, response, perfil):
+        response['Server-Timing'] = perfil.server_timing()
+        if perfil.modo == 'json':
+            detalle = perfil.como_dict()
+            response[f'{self.HEADER}-Detalle'] = json.dumps(detalle, ensure_ascii=True)
+            logger.debug("Perfil %s %s: %s", request.method, request.path, detalle)
+        return response
+
+    def process_template_response(self, request, response):
+        # Las respuestas DRF (y TemplateResponse) se renderizan después de la vista
+        perfil = _perfil_actual.get()
+        if perfil is not None:
+            render_original = response.render
+
+            def render():
+                inicio = time.perf_counter()
+                try:
+                    return render_original()
+                finally:
+                    perfil.tiempo_render += time.perf_counter() - inicio
+
+            response.render = render
+        return response
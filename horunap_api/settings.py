@@ -52,6 +52,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'horunap_api.middleware.PerfilamientoMiddleware', # Server-Timing bajo demanda (cabecera X-Horunap-Perfil)
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     # 'horunap_api.middleware.RedireccionAutenticacionMiddleware', # Comentado para probar el login
@@ -90,6 +91,30 @@ DATABASES = {
     }
 }
 
+# --- Caché ---
+# `default` es la caché compartida (contadores de versión, bloqueos, progreso,
+# feeds, catálogos): locmem acotada en desarrollo, Redis entre procesos si se
+# define HORUNAP_CACHE_REDIS (p. ej. redis://localhost:6379/1, requiere el
+# paquete redis). `local` es siempre de este proceso: primer nivel de los
+# catálogos de referencia (horunap_api/catalogos.py).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'horunap-default',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'horunap-local',
+        'OPTIONS': {'MAX_ENTRIES': 500},
+    },
+}
+if os.environ.get('HORUNAP_CACHE_REDIS'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['HORUNAP_CACHE_REDIS'],
+    }
+
 # --- CAMBIAR CÓMO SE GUARDAN LAS SESIONES (PRUEBA) ---
 SESSION_ENGINE = 'django.contrib.sessions.backends.file'
 # SESSION_ENGINE = 'django.contrib.sessions.backends.db' # Opción por defecto
@@ -124,6 +149,53 @@ LOGIN_URL = '/login/' # URL de tu vista de login
 LOGIN_REDIRECT_URL = '/users/' # URL a la que redirigir DESPUÉS del login (tu vista de redirección por rol)
 LOGOUT_REDIRECT_URL = '/login/' # URL a la que redirigir DESPUÉS del logout
 
+# --- Logging ---
+# El motor de horarios registra su progreso con `logging` en lugar de print().
+# Nivel configurable con la variable de entorno HORUNAP_LOG_LEVEL (DEBUG muestra
+# cada asignación y cada sesión fallida).
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {'format': '[{asctime}] {levelname} {name}: {message}', 'style': '{'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'simple'},
+    },
+    'loggers': {
+        'schedule': {
+            'handlers': ['console'],
+            'level': os.environ.get('HORUNAP_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Medir el pico de memoria del motor con tracemalloc (más preciso pero más lento).
+# Si está desactivado se informa el pico de memoria del proceso.
+HORUNAP_METRICAS_MEMORIA = os.environ.get('HORUNAP_METRICAS_MEMORIA', '0') == '1'
+
+# Límites de la caché de soluciones del generador (memoización por huella de entradas).
+# Al superarlos se desalojan las soluciones usadas hace más tiempo.
+HORUNAP_CACHE_SOLUCIONES = {
+    'MAX_ENTRADAS': 50,
+    'MAX_BYTES': 20 * 1024 * 1024,
+    'MAX_BYTES_ENTRADA': 2 * 1024 * 1024,
+}
+
+# Vigencia máxima del bloqueo por horario durante la generación/resolución:
+# si el proceso muere sin liberarlo, expira solo. Con varios procesos la caché
+# por defecto debe ser compartida (Redis/Memcached) para que el bloqueo sea global.
+HORUNAP_BLOQUEO_GENERACION_SEGUNDOS = 15 * 60
+
+# Intervalo mínimo (segundos) entre instantáneas de progreso publicadas por el
+# motor; también es el intervalo de sondeo del flujo SSE /api/horarios/<id>/progreso/
+HORUNAP_PROGRESO_INTERVALO = 0.5
+
+# Perfilar automáticamente todas las peticiones de usuarios staff
+# (si no, solo las que envían la cabecera X-Horunap-Perfil)
+HORUNAP_PERFILAMIENTO_STAFF = False
+
 # --- Internationalization ---
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -152,4 +224,6 @@ CORS_ALLOWED_ORIGINS = [
 # Opcional: Para desarrollo, puedes permitir todos los orígenes (NO USAR EN PRODUCCIÓN)
 # CORS_ALLOW_ALL_ORIGINS = True
 
-AUTHENTICATION_BACKENDS = ['users.backends.DebugModelBackend']
\ No newline at end of file
+# Backend sin trazas de depuración y con permisos cacheados.
+# Para depurar el login se puede usar 'users.backends.DebugModelBackend'.
+AUTHENTICATION_BACKENDS = ['users.backends.RolModelBackend']
\ No newline at end of file
@@ -0,0 +1,112 @@
+import json
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from users.models import User
+from academic.models import Curso
+from schedule.models import Horario
+
+class PerfilamientoMiddlewareTest(APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='staff',
+            password='password123',
+            rol='ADMIN',
+            is_staff=True
+        )
+        self.docente = User.objects.create_user(
+            username='docente',
+            password='password123',
+            rol='DOCENTE'
+        )
+        for i in range(3):
+            Curso.objects.create(nombre=f"Curso {i}", codigo=f"C-{i}", creditos=3)
+            Horario.objects.create(nombre=f"Horario {i}", semestre="2025-I", creado_por=self.staff)
+
+    def test_sin_cabecera_no_perfila(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('curso-list'))
+        self.assertNotIn('Server-Timing', response)
+
+    def test_staff_con_cabecera(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('curso-list'), HTTP_X_HORUNAP_PERFIL='1')
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('ser;dur=', response['Server-Timing'])
+
+    def test_usuario_no_staff_ignorado(self):
+        self.client.force_login(self.docente)
+        response = self.client.get(reverse('curso-list'), HTTP_X_HORUNAP_PERFIL='1')
+        self.assertNotIn('Server-Timing', response)
+
+    def test_detalle_json_detecta_consultas_duplicadas(self):
+        self.client.force_login(self.staff)
+        # HorarioSerializer cuenta asignaciones y conflictos de cada horario (N+1)
+        response = self.client.get(reverse('horario-list'), HTTP_X_HORUNAP_PERFIL='json')
+        detalle = json.loads(response['X-Horunap-Perfil-Detalle'])
+        self.assertGreaterEqual(detalle['consultas_duplicadas'], 2)
+        self.assertTrue(detalle['top_duplicadas'])
+
+class PerfilamientoTemplatesTest(TestCase):
+    def setUp(self):
+        self.docente = User.objects.create_user(
+            username='docente',
+            password='password123',
+            rol='DOCENTE'
+        )
+
+    @override_settings(DEBUG=True)
+    def test_tiempo_de_templates(self):
+        self.client.force_login(self.docente)
+        response = self.client.get(reverse('dashboard_docente'), HTTP_X_HORUNAP_PERFIL='json')
+        detalle = json.loads(response['X-Horunap-Perfil-Detalle'])
+        self.assertGreater(detalle['templates_ms'], 0)
+
+    @override_settings(DEBUG=True)
+    async def test_vista_asincrona_bajo_asgi(self):
+        # AsyncClient recorre la cadena de middlewares en modo asíncrono
+        await self.async_client.aforce_login(self.docente)
+        response = await self.async_client.get(reverse('mi_horario'), headers={'X-Horunap-Perfil': 'json'})
+        self.assertEqual(response.status_code, 200)
+        detalle = json.loads(response['X-Horunap-Perfil-Detalle'])
+        self.assertGreaterEqual(detalle['consultas'], 1)
+
+class CatalogosTest(APITestCase):
+    def setUp(self):
+        from academic.models import Aula
+
+        self.admin = User.objects.create_user(username='admin_cat', password='password123', rol='ADMIN')
+        self.client.force_authenticate(user=self.admin)
+        Aula.objects.create(nombre="Aula A", capacidad=30)
+
+    def test_aulas_disponibles_cacheadas_e_invalidadas(self):
+        from academic.models import Aula
+
+        url = reverse('aula-disponibles')
+        self.assertEqual(len(self.client.get(url).data), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.client.get(url).data), 1)
+
+        Aula.objects.create(nombre="Aula B", capacidad=40)
+        self.assertEqual([a['nombre'] for a in self.client.get(url).data], ['Aula A', 'Aula B'])
+        # Los listados con filtros no se cachean
+        self.assertEqual(len(self.client.get(reverse('aula-list'), {'capacidad_min': 35}).data), 1)
+
+    def test_docentes_activos(self):
+        from .catalogos import docentes_activos
+
+        docente = User.objects.create_user(username='docente_cat', password='password123', rol='DOCENTE')
+        self.assertEqual([d.username for d in docentes_activos()], ['docente_cat'])
+        # Sin contraseña en la caché
+        self.assertNotIn('password', docentes_activos()[0].__dict__)
+
+        with self.assertNumQueries(0):
+            docentes_activos()
+        # Registrar el login no invalida el catálogo
+        docente.save(update_fields=['last_login'])
+        with self.assertNumQueries(0):
+            docentes_activos()
+
+        docente.is_active = False
+        docente.save()
+        self.assertEqual(docentes_activos(), [])
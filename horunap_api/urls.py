@@ -6,6 +6,10 @@ from django.contrib.auth import views as auth_views
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('users/', include('users.urls')),
+
+    # API REST
+    path('api/', include('academic.urls')),
+    path('api/', include('schedule.urls')),
     
     # Login
     path('login/', auth_views.LoginView.as_view(
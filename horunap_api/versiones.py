@@ -0,0 +1,34 @@
+"""
+Contadores de versión en la caché de Django para invalidar grupos de
+entradas cacheadas: las claves incluyen la versión y basta con incrementarla
+para que todas las anteriores queden obsoletas (y expiren solas).
+
+La versión inicial se toma del reloj, de modo que si el contador se pierde
+(desalojo, reinicio de la caché) nunca vuelve a un valor ya usado.
+"""
+import time
+
+from django.core.cache import cache
+
+PREFIJO = 'version'
+
+
+def _clave(nombre):
+    return f'{PREFIJO}:{nombre}'
+
+
+def obtener_version(nombre):
+    return cache.get_or_set(_clave(nombre), lambda: time.time_ns() // 1000, None)
+
+
+async def aobtener_version(nombre):
+    return await cache.aget_or_set(_clave(nombre), lambda: time.time_ns() // 1000, None)
+
+
+def incrementar_version(nombre):
+    try:
+        return cache.incr(_clave(nombre))
+    except ValueError:
+        version = time.time_ns() // 1000
+        cache.set(_clave(nombre), version, None)
+        return version
@@ -1,9 +1,9 @@
 from django.contrib import admin
-from .models import Horario, Asignacion, ConflictoHorario, DisponibilidadDocente, HorarioPersonalizadoDocente
+from .models import Horario, Asignacion, ConflictoHorario, DisponibilidadDocente, HorarioPersonalizadoDocente, EjecucionGeneracion, SolucionCacheada, FechaExcepcion
 
 @admin.register(Horario)
 class HorarioAdmin(admin.ModelAdmin):
-    list_display = ['nombre', 'semestre', 'estado', 'fecha_creacion', 'creado_por']
+    list_display = ['nombre', 'semestre', 'estado', 'fecha_inicio', 'fecha_fin', 'fecha_creacion', 'creado_por']
     list_filter = ['estado', 'semestre']
     search_fields = ['nombre', 'semestre']
     readonly_fields = ['fecha_creacion', 'fecha_actualizacion']
@@ -48,4 +48,24 @@ class HorarioPersonalizadoDocenteAdmin(admin.ModelAdmin):
             'fields': ('fecha_creacion', 'fecha_actualizacion'),
             'classes': ('collapse',)
         }),
-    )
\ No newline at end of file
+    )
+
+@admin.register(EjecucionGeneracion)
+class EjecucionGeneracionAdmin(admin.ModelAdmin):
+    list_display = ['horario', 'tipo', 'estado', 'fecha_inicio', 'duracion_total', 'sesiones_asignadas', 'sesiones_fallidas', 'total_consultas']
+    list_filter = ['tipo', 'estado', 'horario']
+    readonly_fields = ['fecha_inicio', 'metricas']
+
+
+@admin.register(SolucionCacheada)
+class SolucionCacheadaAdmin(admin.ModelAdmin):
+    list_display = ['huella', 'num_asignaciones', 'tamano_bytes', 'usos', 'fecha_creacion', 'fecha_ultimo_uso']
+    readonly_fields = ['huella', 'asignaciones', 'num_asignaciones', 'tamano_bytes', 'usos', 'fecha_creacion', 'fecha_ultimo_uso']
+
+
+@admin.register(FechaExcepcion)
+class FechaExcepcionAdmin(admin.ModelAdmin):
+    list_display = ['fecha', 'descripcion', 'horario']
+    list_filter = ['horario']
+    search_fields = ['descripcion']
+    date_hierarchy = 'fecha'
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 class ScheduleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'schedule'
-    verbose_name = 'Generador de Horarios'
\ No newline at end of file
+    verbose_name = 'Generador de Horarios'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,182 @@
+# schedule/calendario.py
+"""
+Feeds iCalendar (RFC 5545) de las asignaciones de un docente o de un aula.
+
+Cada asignación semanal se expande perezosamente (generadores) en
+ocurrencias fechadas entre el inicio y el fin de clases, omitiendo los
+feriados/fechas de excepción. El feed se renderiza una sola vez por versión
+de los horarios y se sirve desde la caché; la versión forma parte del ETag,
+así que los clientes de calendario que sondean cada pocos minutos reciben un
+304 sin tocar la base de datos. Las vistas de los feeds son asíncronas: el
+camino cacheado no ocupa un hilo del servidor.
+"""
+import datetime
+import hashlib
+from zoneinfo import ZoneInfo
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from horunap_api.versiones import obtener_version, aobtener_version, incrementar_version
+from .models import Asignacion, FechaExcepcion
+
+VERSION_HORARIOS = 'schedule:horarios'
+CACHE_TIMEOUT = 60 * 60 * 24
+
+# Horarios publicados: son los que aparecen en los calendarios
+ESTADOS_PUBLICADOS = ['APROBADO', 'ACTIVO']
+
+# Semanas a expandir cuando el horario no define fechas de clases
+SEMANAS_POR_DEFECTO = 16
+
+DIAS_ISO = {'LUNES': 0, 'MARTES': 1, 'MIERCOLES': 2, 'JUEVES': 3, 'VIERNES': 4, 'SABADO': 5}
+
+
+def version_horarios():
+    return obtener_version(VERSION_HORARIOS)
+
+
+async def aversion_horarios():
+    return await aobtener_version(VERSION_HORARIOS)
+
+
+def invalidar_horarios():
+    """
+    Invalida los feeds cacheados tras confirmarse la transacción en curso.
+    Las operaciones masivas (bulk_create, update(), INSERT ... SELECT) no
+    emiten señales y deben llamarla explícitamente.
+    """
+    transaction.on_commit(lambda: incrementar_version(VERSION_HORARIOS))
+
+
+def _firma(tipo, objeto_id, horario_id):
+    return hashlib.sha1(f'{tipo}:{objeto_id}:{horario_id}'.encode()).hexdigest()[:12]
+
+
+async def aetag_feed(tipo, objeto_id, horario_id=None):
+    """ETag del feed: depende solo de la versión, se calcula sin consultas"""
+    return f'"{await aversion_horarios()}-{_firma(tipo, objeto_id, horario_id)}"'
+
+
+def _renderizar_feed(tipo, objeto_id, horario_id):
+    asignaciones = Asignacion.objects.filter(**{f'{tipo}_id': objeto_id}, activa=True)
+    if horario_id:
+        asignaciones = asignaciones.filter(horario_id=horario_id)
+    else:
+        asignaciones = asignaciones.filter(horario__estado__in=ESTADOS_PUBLICADOS)
+    asignaciones = asignaciones.select_related('curso', 'docente', 'aula', 'horario')
+    return ''.join(renderizar_calendario(asignaciones, nombre=f'HORUNAP - {tipo} {objeto_id}'))
+
+
+async def afeed_cacheado(tipo, objeto_id, horario_id=None):
+    """Texto del feed desde la caché, renderizándolo si esta versión no existe"""
+    clave = f'ical:{await aversion_horarios()}:{tipo}:{objeto_id}:{horario_id}'
+    contenido = await cache.aget(clave)
+    if contenido is None:
+        # Solo al cambiar de versión: el render (consultas y expansión) va a un hilo
+        contenido = await sync_to_async(_renderizar_feed)(tipo, objeto_id, horario_id)
+        await cache.aset(clave, contenido, CACHE_TIMEOUT)
+    return contenido
+
+
+def rango_horario(horario):
+    """Fechas de clases del horario (o las próximas semanas si no están definidas)"""
+    if horario.fecha_inicio and horario.fecha_fin:
+        return horario.fecha_inicio, horario.fecha_fin
+    hoy = timezone.localdate()
+    inicio = horario.fecha_inicio or hoy - datetime.timedelta(days=hoy.weekday())
+    return inicio, horario.fecha_fin or inicio + datetime.timedelta(weeks=SEMANAS_POR_DEFECTO)
+
+
+def fechas_excluidas(horario_ids):
+    excluidas = {}
+    for horario_id, fecha in FechaExcepcion.objects.filter(
+        horario_id__in=list(horario_ids)
+    ).values_list('horario_id', 'fecha'):
+        excluidas.setdefault(horario_id, set()).add(fecha)
+    globales = set(FechaExcepcion.objects.filter(horario__isnull=True).values_list('fecha', flat=True))
+    return globales, excluidas
+
+
+def expandir_ocurrencias(asignaciones):
+    """
+    Genera (asignacion, inicio, fin) para cada semana de clases de cada
+    asignación, con datetimes conscientes de zona horaria
+    """
+    asignaciones = list(asignaciones)
+    globales, por_horario = fechas_excluidas({a.horario_id for a in asignaciones})
+    zona = ZoneInfo(settings.TIME_ZONE)
+
+    for asignacion in asignaciones:
+        inicio_rango, fin_rango = rango_horario(asignacion.horario)
+        excluidas = globales | por_horario.get(asignacion.horario_id, set())
+        hora_inicio, hora_fin = (
+            datetime.time.fromisoformat(hora) for hora in asignacion.bloque_horario.split('-')
+        )
+
+        fecha = inicio_rango + datetime.timedelta(
+            days=(DIAS_ISO[asignacion.dia_semana] - inicio_rango.weekday()) % 7
+        )
+        while fecha <= fin_rango:
+            if fecha not in excluidas:
+                yield (
+                    asignacion,
+                    datetime.datetime.combine(fecha, hora_inicio, tzinfo=zona),
+                    datetime.datetime.combine(fecha, hora_fin, tzinfo=zona),
+                )
+            fecha += datetime.timedelta(weeks=1)
+
+
+def _texto(valor):
+    return (
+        str(valor).replace('\\', '\\\\').replace(';', '\\;')
+        .replace(',', '\\,').replace('\n', '\\n')
+    )
+
+
+def _plegar(linea):
+    """Pliega líneas de más de 75 octetos (RFC 5545, sección 3.1)"""
+    codificada = linea.encode('utf-8')
+    if len(codificada) <= 75:
+        return linea + '\r\n'
+    partes = []
+    actual = ''
+    limite = 75
+    for caracter in linea:
+        if len((actual + caracter).encode('utf-8')) > limite:
+            partes.append(actual)
+            actual = ''
+            limite = 74  # las continuaciones empiezan con un espacio
+        actual += caracter
+    partes.append(actual)
+    return '\r\n '.join(partes) + '\r\n'
+
+
+def _utc(momento):
+    return momento.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def renderizar_calendario(asignaciones, nombre):
+    """Genera las líneas del VCALENDAR con un VEVENT por ocurrencia"""
+    sello = _utc(timezone.now())
+    yield _plegar('BEGIN:VCALENDAR')
+    yield _plegar('VERSION:2.0')
+    yield _plegar('PRODID:-//UNAP//HORUNAP//ES')
+    yield _plegar('CALSCALE:GREGORIAN')
+    yield _plegar(f'X-WR-CALNAME:{_texto(nombre)}')
+    for asignacion, inicio, fin in expandir_ocurrencias(asignaciones):
+        curso = asignacion.curso
+        docente = asignacion.docente
+        yield _plegar('BEGIN:VEVENT')
+        yield _plegar(f'UID:asignacion-{asignacion.id}-{inicio:%Y%m%d}@horunap')
+        yield _plegar(f'DTSTAMP:{sello}')
+        yield _plegar(f'DTSTART:{_utc(inicio)}')
+        yield _plegar(f'DTEND:{_utc(fin)}')
+        yield _plegar(f'SUMMARY:{_texto(f"{curso.codigo} - {curso.nombre}")}')
+        yield _plegar(f'LOCATION:{_texto(asignacion.aula)}')
+        yield _plegar(f'DESCRIPTION:{_texto(f"Docente: {docente.get_full_name() or docente.username}")}')
+        yield _plegar('END:VEVENT')
+    yield _plegar('END:VCALENDAR')
@@ -1,184 +1,384 @@
 # schedule/core/algorithm.py
+import logging
 import random
+import time
 from datetime import datetime
 from django.db.models import Q
-from academic.models import Curso, Aula
-from users.models import User
-from ..models import Horario, Asignacion, ConflictoHorario, DisponibilidadDocente
+from horunap_api.catalogos import cursos_activos, aulas_activas, docentes_activos
+from ..models import Horario, Asignacion, ConflictoHorario, DisponibilidadDocente, EjecucionGeneracion
+from .carga_docente import ColaDocentes
+from .indice_aulas import IndiceAulas
+from .metricas import MetricasEjecucion
+from .ocupacion import aulas_ocupadas_por_otros
+from .disponibilidad import franjas_disponibles
+from .operaciones import publicar_asignaciones
+from .progreso import ProgresoNulo
+from .restricciones import ConjuntoRestricciones
+from . import memoizacion
+
+logger = logging.getLogger(__name__)
 
 class GeneradorHorarios:
     """
-    Motor inteligente para la generación automática de horarios
+    Motor inteligente para la generación automática de horarios.
+
+    La búsqueda se hace en memoria (ocupación de docentes, aulas y cursos en
+    conjuntos) y el resultado se persiste al final con una inserción masiva.
+    Con un límite de tiempo (`tiempo_limite_segundos`) el motor es "anytime":
+    repite pasadas aleatorizadas mientras quede tiempo, conserva la mejor
+    solución parcial encontrada y la devuelve al vencer el plazo.
+
+    El avance se informa a `progreso` (ver core/progreso.py), que decide cuándo
+    publicarlo.
+
+    Cada sesión se asigna al docente disponible con menos horas en la pasada
+    (ver core/carga_docente.py); los topes de horas semanales y de sesiones
+    por día son restricciones configurables (`max_horas_docente_semana`,
+    `max_sesiones_docente_dia`). El aula sale de un índice por capacidad con
+    las aulas intercambiables agrupadas (ver core/indice_aulas.py). Las aulas
+    que ocupan otros horarios publicados del semestre cuentan como ocupadas
+    (ver core/ocupacion.py).
     """
 
-    def __init__(self, horario_id):
+    # Parámetros de configuración por defecto
+    DIAS_SEMANA = ['LUNES', 'MARTES', 'MIERCOLES', 'JUEVES', 'VIERNES']
+    BLOQUES_HORARIOS = ['08:00-10:00', '10:00-12:00', '14:00-16:00', '16:00-18:00']
+    MAX_INTENTOS = 1000
+    # Intentos adicionales para buscar una opción sin penalizaciones blandas
+    # antes de aceptar la mejor opción penalizada encontrada
+    TOLERANCIA_BLANDA = 20
+
+    def __init__(self, horario_id, configuracion=None, progreso=None):
         self.horario = Horario.objects.get(id=horario_id)
         self.conflictos = []
-
-    def generar_horario(self):
+        self.metricas = MetricasEjecucion(self.horario, tipo='GENERACION')
+        self.progreso = progreso or ProgresoNulo()
+        self.random = random.Random()
+        self.desde_cache = False
+
+        configuracion = configuracion or {}
+        self.dias_semana = list(configuracion.get('dias_semana') or self.DIAS_SEMANA)
+        self.bloques_horarios = list(configuracion.get('bloques_horarios') or self.BLOQUES_HORARIOS)
+        self.max_intentos = int(configuracion.get('max_intentos_por_curso') or self.MAX_INTENTOS)
+        self.tiempo_limite = configuracion.get('tiempo_limite_segundos')
+        self.config_restricciones = dict(configuracion.get('restricciones') or {})
+
+        # Resultado de la última generación
+        self.sesiones_totales = 0
+        self.completitud = 0.0
+        self.interrumpido_por_tiempo = False
+
+        # Estado de búsqueda en memoria
+        self._disponibilidad = set()
+        self._ocupacion_docente = set()
+        self._ocupacion_aula = set()
+        self._ocupacion_curso = set()
+        self._cola_docentes = None
+        self._indice_aulas = None
+        self._aulas_externas = set()
+        self._plazo = None
+        self.restricciones = None
+
+    @staticmethod
+    def configuracion_guardada(horario):
+        """Configuración de la última generación completada del horario ({} si nunca se generó)"""
+        metricas = EjecucionGeneracion.objects.filter(
+            horario=horario, tipo='GENERACION', estado='COMPLETADA'
+        ).order_by('-fecha_inicio').values_list('metricas', flat=True).first()
+        return (metricas or {}).get('configuracion') or {}
+
+    def configuracion(self):
+        """Parámetros efectivos de la generación (forman parte de la huella)"""
+        return {
+            'dias_semana': self.dias_semana,
+            'bloques_horarios': self.bloques_horarios,
+            'max_intentos_por_curso': self.max_intentos,
+            'tiempo_limite_segundos': self.tiempo_limite,
+            'restricciones': self.config_restricciones,
+        }
+
+    def generar_horario(self, semilla=None, usar_cache=True):
         """
-        Genera un horario completo basado en restricciones y disponibilidades
-        """
-        print(f"Iniciando generación de horario: {self.horario.nombre}")
-
-        # Limpiar asignaciones previas
-        Asignacion.objects.filter(horario=self.horario).delete()
-        ConflictoHorario.objects.filter(horario=self.horario).delete()
+        Genera un horario completo basado en restricciones y disponibilidades.
 
-        # Obtener datos necesarios
-        cursos = Curso.objects.filter(activo=True)
-        aulas = Aula.objects.filter(activa=True)
-        docentes = User.objects.filter(rol='DOCENTE', is_active=True)
+        Si una generación anterior tuvo exactamente las mismas entradas
+        (catálogos, disponibilidad, configuración y semilla) se restaura su
+        resultado en lugar de volver a resolver; `usar_cache=False` lo evita.
+        Devuelve el número de asignaciones creadas; la completitud queda en
+        `self.completitud` (fracción de sesiones asignadas).
+        """
+        logger.info("Iniciando generación de horario: %s", self.horario.nombre)
 
-        # Parámetros de configuración
-        dias_semana = ['LUNES', 'MARTES', 'MIERCOLES', 'JUEVES', 'VIERNES']
-        bloques_horarios = ['08:00-10:00', '10:00-12:00', '14:00-16:00', '16:00-18:00']
+        self.random.seed(semilla)
+        self.metricas.iniciar()
+        if self.tiempo_limite:
+            self._plazo = time.perf_counter() + float(self.tiempo_limite)
+        try:
+            asignaciones_generadas = self._generar_con_cache(semilla, usar_cache)
+        except Exception:
+            self.metricas.persistir(estado='ERROR')
+            raise
+        self.metricas.extra.update({
+            'sesiones_totales': self.sesiones_totales,
+            'completitud': round(self.completitud, 4),
+            'interrumpido_por_tiempo': self.interrumpido_por_tiempo,
+            'configuracion': self.configuracion(),
+        })
+        self.metricas.persistir()
+
+        logger.info(
+            "Generación completada. %d asignaciones creadas (%.0f%% de las sesiones).",
+            asignaciones_generadas, self.completitud * 100
+        )
+        return asignaciones_generadas
 
-        asignaciones_generadas = 0
-        max_intentos = 1000
+    def _generar_con_cache(self, semilla, usar_cache):
+        metricas = self.metricas
+
+        with metricas.fase('carga'):
+            self._aulas_externas = aulas_ocupadas_por_otros(self.horario)
+            huella = memoizacion.calcular_huella(self.configuracion(), semilla, self._aulas_externas)
+            solucion = memoizacion.buscar_solucion(huella) if usar_cache else None
+        metricas.extra['huella'] = huella
+
+        if solucion is not None:
+            self.sesiones_totales = sum(curso.sesiones_semana for curso in cursos_activos())
+            self.progreso.fase('persistencia', desde_cache=True, sesiones_totales=self.sesiones_totales)
+            with metricas.fase('persistencia'):
+                asignaciones_generadas = memoizacion.restaurar_solucion(self.horario, solucion)
+            self.desde_cache = True
+            self.completitud = asignaciones_generadas / self.sesiones_totales if self.sesiones_totales else 1.0
+            metricas.sesiones_asignadas = asignaciones_generadas
+            metricas.extra['cache'] = 'HIT'
+            logger.info("Solución restaurada desde caché (%s)", huella[:12])
+            return asignaciones_generadas
+
+        asignaciones_generadas = self._generar()
+        metricas.extra['cache'] = 'MISS'
+        # Una solución cortada por el plazo no es el resultado de esas entradas:
+        # la siguiente corrida debe volver a buscar
+        if not self.interrumpido_por_tiempo:
+            with metricas.fase('persistencia'):
+                memoizacion.guardar_solucion(huella, self.horario)
+        return asignaciones_generadas
 
-        for curso in cursos:
-            for sesion in range(curso.sesiones_semana):
-                intentos = 0
-                asignado = False
+    def _generar(self):
+        metricas = self.metricas
+
+        with metricas.fase('carga'):
+            # Obtener datos necesarios
+            # Catálogos desde la caché versionada (sin consultas si no cambiaron)
+            cursos = cursos_activos()
+            aulas = aulas_activas()
+            docentes = docentes_activos()
+            self._cargar_disponibilidad(docentes)
+            self._cola_docentes = ColaDocentes(docentes, self._disponibilidad)
+            self.restricciones = ConjuntoRestricciones.desde_configuracion(
+                self.config_restricciones, cursos, aulas, docentes
+            )
+            self._indice_aulas = IndiceAulas(aulas, self.restricciones)
+
+        sesiones = [(curso, numero) for curso in cursos for numero in range(1, curso.sesiones_semana + 1)]
+        self.sesiones_totales = len(sesiones)
+        self.progreso.fase('busqueda', sesiones_totales=self.sesiones_totales)
+
+        with metricas.fase('busqueda'):
+            mejor = None
+            pasadas = 0
+            while True:
+                # La primera pasada sigue el orden de los cursos; las siguientes lo aleatorizan
+                orden = sesiones if pasadas == 0 else self.random.sample(sesiones, len(sesiones))
+                resultado = self._pasada(orden)
+                pasadas += 1
+                if mejor is None or (
+                        (len(resultado['asignaciones']), -resultado['penalizacion']) >
+                        (len(mejor['asignaciones']), -mejor['penalizacion'])):
+                    mejor = resultado
+                self.progreso.actualizar(
+                    pasadas=pasadas,
+                    mejor_asignadas=len(mejor['asignaciones']),
+                    mejor_penalizacion=mejor['penalizacion']
+                )
+                if (len(mejor['asignaciones']) == len(sesiones) or
+                        self._plazo is None or self._tiempo_agotado()):
+                    break
+
+            completo = len(mejor['asignaciones']) == len(sesiones)
+            self.interrumpido_por_tiempo = not completo and self._tiempo_agotado()
+            metricas.extra['pasadas'] = pasadas
+            metricas.extra['penalizacion_blanda'] = mejor['penalizacion']
+
+        for curso, intentos in mejor['asignadas']:
+            metricas.sesion_asignada(curso, intentos)
+        for curso, numero, intentos, motivo in mejor['fallidas']:
+            metricas.sesion_fallida(curso, numero, intentos, motivo)
+
+        self.progreso.fase('persistencia', sesiones_asignadas=len(mejor['asignaciones']))
+        with metricas.fase('persistencia'):
+            # La solución se construyó en memoria: se publica de una vez,
+            # reemplazando las asignaciones previas en una sola transacción
+            publicar_asignaciones(self.horario, [
+                Asignacion(
+                    horario=self.horario,
+                    curso=curso,
+                    docente=docente,
+                    aula=aula,
+                    dia_semana=dia,
+                    bloque_horario=bloque
+                )
+                for curso, docente, aula, dia, bloque in mejor['asignaciones']
+            ])
 
-                while not asignado and intentos < max_intentos:
-                    # Seleccionar aleatoriamente día y bloque
-                    dia = random.choice(dias_semana)
-                    bloque = random.choice(bloques_horarios)
+        asignaciones_generadas = len(mejor['asignaciones'])
+        self.completitud = asignaciones_generadas / len(sesiones) if sesiones else 1.0
+        return asignaciones_generadas
 
-                    # Seleccionar docente disponible (MEJORADO)
-                    docente = self._seleccionar_docente_disponible(docentes, dia, bloque, curso)
+    def _pasada(self, sesiones):
+        """
+        Una pasada voraz aleatorizada sobre las sesiones. Se detiene al vencer
+        el plazo y devuelve lo asignado hasta ese momento.
+        """
+        self._ocupacion_docente = set()
+        self._ocupacion_aula = set(self._aulas_externas)
+        self._ocupacion_curso = set()
+        self._cola_docentes.reiniciar(self.random)
+        self._indice_aulas.reiniciar(self._aulas_externas)
+        self.restricciones.reiniciar()
+        resultado = {'asignaciones': [], 'asignadas': [], 'fallidas': [], 'penalizacion': 0}
+
+        for curso, numero in sesiones:
+            if self._tiempo_agotado():
+                resultado['fallidas'].append((curso, numero, 0, 'tiempo_agotado'))
+                continue
+
+            intentos = 0
+            asignado = False
+            motivos = {}
+            # Mejor opción que solo viola restricciones blandas: (penalización, intento, opción)
+            penalizada = None
+
+            while not asignado and intentos < self.max_intentos:
+                # Seleccionar aleatoriamente día y bloque
+                dia = self.random.choice(self.dias_semana)
+                bloque = self.random.choice(self.bloques_horarios)
+
+                violada = self.restricciones.franja_violada(curso, dia, bloque)
+                if violada:
+                    docente = aula = None
+                else:
+                    # Seleccionar el docente disponible menos cargado
+                    docente = self._seleccionar_docente_disponible(dia, bloque, curso)
 
                     # Seleccionar aula disponible
-                    aula = self._seleccionar_aula_disponible(aulas, dia, bloque, curso)
-
-                    if docente and aula:
-                        # Verificar si no hay conflictos
-                        if not self._tiene_conflictos(curso, docente, aula, dia, bloque):
-                            # Crear asignación
-                            asignacion = Asignacion.objects.create(
-                                horario=self.horario,
-                                curso=curso,
-                                docente=docente,
-                                aula=aula,
-                                dia_semana=dia,
-                                bloque_horario=bloque
-                            )
-                            asignaciones_generadas += 1
-                            asignado = True
-                            print(f"Asignación creada: {curso.codigo} - {dia} {bloque}")
-
-                    intentos += 1
-
-                if not asignado:
-                    print(f"⚠️ No se pudo asignar sesión {sesion + 1} del curso {curso.codigo}")
-
-        # Actualizar estado del horario
-        self.horario.estado = 'GENERADO'
-        self.horario.save()
-
-        print(f"✅ Generación completada. {asignaciones_generadas} asignaciones creadas.")
-        return asignaciones_generadas
-
-    def _seleccionar_docente_disponible(self, docentes, dia, bloque, curso):
+                    aula = self._seleccionar_aula_disponible(dia, bloque, curso)
+
+                if violada:
+                    motivo = violada.codigo
+                elif not docente:
+                    motivo = 'sin_docente_disponible'
+                elif not aula:
+                    motivo = 'sin_aula_compatible'
+                elif self._tiene_conflictos(curso, docente, aula, dia, bloque):
+                    motivo = 'conflicto'
+                else:
+                    penalizacion = self.restricciones.penalizacion(curso, docente, aula, dia, bloque)
+                    opcion = (curso, docente, aula, dia, bloque)
+                    if penalizacion and (penalizada is None or penalizacion < penalizada[0]):
+                        penalizada = (penalizacion, intentos, opcion)
+                    if not penalizacion or intentos - penalizada[1] >= self.TOLERANCIA_BLANDA:
+                        self._asignar(resultado, *(opcion if not penalizacion else penalizada[2]),
+                                      penalizacion=0 if not penalizacion else penalizada[0])
+                        asignado = True
+                    motivo = None if asignado else 'restriccion_blanda'
+
+                if motivo:
+                    motivos[motivo] = motivos.get(motivo, 0) + 1
+                intentos += 1
+
+                if not asignado and self._tiempo_agotado():
+                    motivos = {'tiempo_agotado': 1}
+                    break
+
+            if not asignado and penalizada is not None:
+                # Sin opción libre de penalizaciones: se acepta la menos penalizada
+                self._asignar(resultado, *penalizada[2], penalizacion=penalizada[0])
+                asignado = True
+
+            if asignado:
+                resultado['asignadas'].append((curso, intentos))
+            else:
+                # El motivo de la falla es el más frecuente entre los intentos
+                motivo = max(motivos, key=motivos.get) if motivos else 'sin_intentos'
+                resultado['fallidas'].append((curso, numero, intentos, motivo))
+            self.progreso.actualizar(sesiones_colocadas=len(resultado['asignaciones']))
+
+        return resultado
+
+    def _asignar(self, resultado, curso, docente, aula, dia, bloque, penalizacion=0):
+        self._ocupar(curso, docente, aula, dia, bloque)
+        resultado['asignaciones'].append((curso, docente, aula, dia, bloque))
+        resultado['penalizacion'] += penalizacion
+        logger.debug("Asignación creada: %s - %s %s", curso.codigo, dia, bloque)
+
+    def _tiempo_agotado(self):
+        return self._plazo is not None and time.perf_counter() >= self._plazo
+
+    def _cargar_disponibilidad(self, docentes):
         """
-        MEJORADO: Selecciona un docente disponible considerando disponibilidad registrada
+        Precalcula en una sola consulta los (docente, día, bloque) en los que
+        cada docente tiene un horario DISPONIBLE que cubre el bloque completo
         """
-        docentes_disponibles = []
-        for docente in docentes:
-            # Verificar disponibilidad registrada (NUEVA LÓGICA)
-            if self._docente_tiene_disponibilidad(docente, dia, bloque):
-                if not self._docente_ocupado(docente, dia, bloque):
-                    docentes_disponibles.append(docente)
+        self._disponibilidad = franjas_disponibles(
+            [docente.id for docente in docentes], self.dias_semana, self.bloques_horarios
+        )
 
-        return random.choice(docentes_disponibles) if docentes_disponibles else None
+    def _ocupar(self, curso, docente, aula, dia, bloque):
+        self._ocupacion_docente.add((docente.id, dia, bloque))
+        self._ocupacion_aula.add((aula.id, dia, bloque))
+        self._ocupacion_curso.add((curso.id, dia, bloque))
+        self._cola_docentes.asignar(docente, dia, bloque, curso.duracion_sesion)
+        self._indice_aulas.ocupar(aula, dia, bloque)
+        self.restricciones.ocupar(curso, docente, aula, dia, bloque)
 
-    def _docente_tiene_disponibilidad(self, docente, dia, bloque):
+    def _seleccionar_docente_disponible(self, dia, bloque, curso):
         """
-        MEJORADO: Verifica si el docente tiene disponibilidad en horarios personalizados
+        Selecciona, entre los docentes con disponibilidad registrada en la
+        franja, el de menor carga que esté libre y cumpla las restricciones.
+        Si el curso tiene docentes habilitados solo se consideran esos.
         """
-        try:
-            from ..models import HorarioPersonalizadoDocente
-            
-            # Convertir bloque a horas (ej: "08:00-10:00" -> "08:00" y "10:00")
-            hora_inicio_bloque, hora_fin_bloque = bloque.split('-')
-            
-            # Buscar horarios disponibles que se superpongan con el bloque
-            horarios_disponibles = HorarioPersonalizadoDocente.objects.filter(
-                docente=docente,
-                dia_semana=dia,
-                tipo='DISPONIBLE'
-            )
-            
-            for horario in horarios_disponibles:
-                horario_inicio_str = horario.hora_inicio.strftime('%H:%M')
-                horario_fin_str = horario.hora_fin.strftime('%H:%M')
-                
-                # Verificar si el bloque está dentro del horario disponible
-                if (horario_inicio_str <= hora_inicio_bloque and 
-                    horario_fin_str >= hora_fin_bloque):
-                    return True
-            
-            return False
-            
-        except Exception as e:
-            print(f"Error verificando disponibilidad personalizada: {e}")
-            return False
-
-    def _seleccionar_aula_disponible(self, aulas, dia, bloque, curso):
-        """
-        MEJORADO: Selecciona un aula disponible que cumpla con los requisitos del curso
-        """
-        aulas_disponibles = []
-        for aula in aulas:
-            if (aula.capacidad >= curso.capacidad_estimada and
-                not self._aula_ocupada(aula, dia, bloque) and
-                self._aula_cumple_requisitos(aula, curso)):
-                aulas_disponibles.append(aula)
-
-        # Priorizar aulas con capacidad similar a la requerida
-        if aulas_disponibles:
-            aulas_disponibles.sort(key=lambda a: abs(a.capacidad - curso.capacidad_estimada))
-            return aulas_disponibles[0]
-
-        return None
-
-    def _aula_cumple_requisitos(self, aula, curso):
-        """
-        NUEVO MÉTODO: Verifica si el aula cumple con los requisitos del curso
-        """
-        # Verificar requisito de laboratorio
-        if curso.requiere_laboratorio and aula.tipo_aula != 'LABORATORIO':
-            return False
-            
-        # Verificar equipamiento adicional si es necesario
-        if curso.requiere_laboratorio and not aula.tiene_proyector:
-            return False
-            
-        return True
+        return self._cola_docentes.elegir(
+            dia, bloque,
+            lambda docente: (not self._docente_ocupado(docente, dia, bloque) and
+                             self.restricciones.admite_docente(curso, docente, dia, bloque)),
+            candidatos=self.restricciones.docentes_para(curso)
+        )
+
+    def _seleccionar_aula_disponible(self, dia, bloque, curso):
+        """
+        Selecciona el aula libre de mejor ajuste entre las que cumplen las
+        restricciones del curso (búsqueda binaria sobre las clases de aulas
+        equivalentes, ver core/indice_aulas.py)
+        """
+        return self._indice_aulas.mejor_ajuste(curso, dia, bloque)
 
     def _docente_ocupado(self, docente, dia, bloque):
         """
         Verifica si el docente ya tiene una asignación en el mismo día y bloque
         """
-        return Asignacion.objects.filter(
-            horario=self.horario,
-            docente=docente,
-            dia_semana=dia,
-            bloque_horario=bloque
-        ).exists()
+        return (docente.id, dia, bloque) in self._ocupacion_docente
 
     def _aula_ocupada(self, aula, dia, bloque):
         """
-        Verifica si el aula ya está ocupada en el mismo día y bloque
+        Verifica si el aula ya está ocupada en el mismo día y bloque, en este
+        horario o en otro publicado del mismo semestre
         """
-        return Asignacion.objects.filter(
-            horario=self.horario,
-            aula=aula,
-            dia_semana=dia,
-            bloque_horario=bloque
-        ).exists()
+        return (aula.id, dia, bloque) in self._ocupacion_aula
+
+    def _curso_ocupado(self, curso, dia, bloque):
+        """
+        Verifica si el curso ya tiene una sesión en el mismo día y bloque
+        """
+        return (curso.id, dia, bloque) in self._ocupacion_curso
 
     def _tiene_conflictos(self, curso, docente, aula, dia, bloque):
         """
@@ -192,44 +392,70 @@ class GeneradorHorarios:
         if self._aula_ocupada(aula, dia, bloque):
             return True
 
-        # Verificar capacidad del aula
-        if aula.capacidad < curso.capacidad_estimada:
+        # Verificar que el curso no tenga ya otra sesión en el mismo bloque
+        if self._curso_ocupado(curso, dia, bloque):
             return True
 
-        # Verificar requisitos de equipamiento (NUEVA VALIDACIÓN)
-        if not self._aula_cumple_requisitos(aula, curso):
+        # Restricciones registradas: capacidad y equipamiento (máscara precompilada),
+        # franja y docente
+        if not self.restricciones.admite_aula(curso, aula):
             return True
-
-        return False
+        if self.restricciones.franja_violada(curso, dia, bloque):
+            return True
+        return not self.restricciones.admite_docente(curso, docente, dia, bloque)
 
     def detectar_conflictos(self):
         """
         MEJORADO: Detecta y registra conflictos en el horario generado
         """
-        print("🔍 Detectando conflictos...")
-
-        asignaciones = Asignacion.objects.filter(horario=self.horario)
+        logger.info("Detectando conflictos en %s", self.horario.nombre)
+        self.progreso.fase('deteccion', conflictos=0)
+
+        if self.metricas.ejecucion is None:
+            # Sin generar_horario() no hay ejecución que completar: no se mide
+            self._detectar_conflictos()
+        else:
+            with self.metricas, self.metricas.fase('deteccion'):
+                self._detectar_conflictos()
+            self.metricas.extra['conflictos_detectados'] = len(self.conflictos)
+            self.metricas.persistir()
+        logger.info("Detección de conflictos completada. %d conflictos encontrados.", len(self.conflictos))
+
+    def _detectar_conflictos(self):
+        """
+        Recorre las asignaciones con el mismo conjunto de restricciones que usa
+        el motor. Solo las duras se registran como conflicto; las blandas se
+        cuentan en las métricas. También se registran las aulas que ya usa
+        otro horario publicado del semestre.
+        """
+        asignaciones = list(
+            Asignacion.objects.filter(horario=self.horario)
+            .select_related('curso', 'aula', 'docente')
+            .order_by('dia_semana', 'bloque_horario', 'id')
+        )
+        cursos = list({a.curso_id: a.curso for a in asignaciones}.values())
+        aulas = list({a.aula_id: a.aula for a in asignaciones}.values())
+        restricciones = ConjuntoRestricciones.desde_configuracion(self.config_restricciones, cursos, aulas)
+        externas = aulas_ocupadas_por_otros(self.horario, [aula.id for aula in aulas]) if aulas else set()
 
+        violaciones_blandas = 0
         for asignacion in asignaciones:
-            # Verificar conflictos de capacidad
-            if asignacion.aula.capacidad < asignacion.curso.capacidad_estimada:
-                self._registrar_conflicto(
-                    asignacion,
-                    'CAPACIDAD',
-                    f"El aula {asignacion.aula.nombre} tiene capacidad {asignacion.aula.capacidad} "
-                    f"pero el curso requiere {asignacion.curso.capacidad_estimada} estudiantes"
-                )
-
-            # Verificar conflictos de equipamiento (NUEVA DETECCIÓN)
-            if asignacion.curso.requiere_laboratorio and asignacion.aula.tipo_aula != 'LABORATORIO':
-                self._registrar_conflicto(
-                    asignacion,
-                    'EQUIPAMIENTO',
-                    f"El curso {asignacion.curso.codigo} requiere laboratorio "
-                    f"pero el aula {asignacion.aula.nombre} no es un laboratorio"
-                )
-
-        print(f"✅ Detección de conflictos completada. {len(self.conflictos)} conflictos encontrados.")
+            opcion = (asignacion.curso, asignacion.docente, asignacion.aula,
+                      asignacion.dia_semana, asignacion.bloque_horario)
+            if (asignacion.aula_id, asignacion.dia_semana, asignacion.bloque_horario) in externas:
+                self._registrar_conflicto(asignacion, 'AULA', (
+                    f"El aula {asignacion.aula.nombre} ya está ocupada por otro horario del semestre "
+                    f"el {asignacion.dia_semana} {asignacion.bloque_horario}"
+                ))
+            for restriccion in restricciones.violaciones(*opcion):
+                if restriccion.dura:
+                    self._registrar_conflicto(asignacion, restriccion.tipo_conflicto, restriccion.mensaje(*opcion))
+                else:
+                    violaciones_blandas += 1
+            restricciones.ocupar(*opcion)
+            self.progreso.actualizar(conflictos=len(self.conflictos))
+
+        self.metricas.extra['violaciones_blandas'] = violaciones_blandas
 
     def _registrar_conflicto(self, asignacion, tipo, descripcion):
         """
@@ -248,70 +474,89 @@ class ResolvedorConflictos:
     Módulo para la resolución automática de conflictos
     """
 
-    def __init__(self, horario_id):
+    def __init__(self, horario_id, configuracion=None, progreso=None):
         self.horario = Horario.objects.get(id=horario_id)
+        self.metricas = MetricasEjecucion(self.horario, tipo='RESOLUCION')
+        self.progreso = progreso or ProgresoNulo()
+        self.config_restricciones = dict((configuracion or {}).get('restricciones') or {})
+        self.restricciones = None
+        self._ocupacion_aula = set()
+        self._aulas_externas = set()
 
     def resolver_conflictos(self):
         """
         Intenta resolver automáticamente los conflictos detectados
         """
-        conflictos = ConflictoHorario.objects.filter(
-            horario=self.horario,
-            resuelto=False
-        )
-
-        for conflicto in conflictos:
-            if self._resolver_conflicto(conflicto):
-                conflicto.resuelto = True
-                conflicto.fecha_resolucion = datetime.now()
-                conflicto.save()
-
-        return conflictos.filter(resuelto=True).count()
+        with self.metricas:
+            with self.metricas.fase('carga'):
+                conflictos = list(ConflictoHorario.objects.filter(
+                    horario=self.horario,
+                    resuelto=False
+                ).select_related('asignacion__curso', 'asignacion__aula'))
+                # Una sola instancia por asignación, aunque tenga varios conflictos
+                asignaciones = {}
+                for conflicto in conflictos:
+                    conflicto.asignacion = asignaciones.setdefault(conflicto.asignacion_id, conflicto.asignacion)
+                # Aulas candidatas por curso (mismas restricciones que el motor)
+                # y ocupación de aulas en memoria: la del horario y la de los
+                # demás horarios publicados del semestre
+                cursos = list({c.asignacion.curso_id: c.asignacion.curso for c in conflictos}.values())
+                self.restricciones = ConjuntoRestricciones.desde_configuracion(
+                    self.config_restricciones, cursos, aulas_activas()
+                )
+                self._aulas_externas = aulas_ocupadas_por_otros(self.horario)
+                self._ocupacion_aula = set(Asignacion.objects.filter(horario=self.horario).values_list(
+                    'aula_id', 'dia_semana', 'bloque_horario'
+                )) | self._aulas_externas
+
+            resueltos = 0
+            self.progreso.fase('resolucion', conflictos=len(conflictos), conflictos_resueltos=0)
+            with self.metricas.fase('resolucion'):
+                for indice, conflicto in enumerate(conflictos, 1):
+                    if self._resolver_conflicto(conflicto):
+                        conflicto.resuelto = True
+                        conflicto.fecha_resolucion = datetime.now()
+                        conflicto.save()
+                        resueltos += 1
+                        self.metricas.sesion_asignada(conflicto.asignacion.curso, 1)
+                    else:
+                        self.metricas.sesion_fallida(
+                            conflicto.asignacion.curso, conflicto.asignacion_id, 1,
+                            f"sin_solucion_{conflicto.tipo_conflicto.lower()}"
+                        )
+                    self.progreso.actualizar(revisados=indice, conflictos_resueltos=resueltos)
+
+        self.metricas.extra['conflictos_resueltos'] = resueltos
+        self.metricas.extra['conflictos_pendientes'] = len(conflictos) - resueltos
+        self.metricas.persistir()
+        return resueltos
 
     def _resolver_conflicto(self, conflicto):
         """
         Intenta resolver un conflicto específico
         """
-        if conflicto.tipo_conflicto == 'CAPACIDAD':
-            return self._resolver_conflicto_capacidad(conflicto)
-        elif conflicto.tipo_conflicto == 'EQUIPAMIENTO':
-            return self._resolver_conflicto_equipamiento(conflicto)
+        if conflicto.tipo_conflicto in ('CAPACIDAD', 'EQUIPAMIENTO', 'AULA'):
+            return self._reasignar_aula(conflicto)
 
         return False
 
-    def _resolver_conflicto_capacidad(self, conflicto):
+    def _reasignar_aula(self, conflicto):
         """
-        Resuelve conflictos de capacidad buscando un aula más grande
+        Resuelve conflictos de capacidad, equipamiento o aula compartida con
+        otro horario moviendo la sesión al aula libre de mejor ajuste que
+        cumpla las restricciones del curso
         """
         asignacion = conflicto.asignacion
-        aulas_disponibles = Aula.objects.filter(
-            activa=True,
-            capacidad__gte=asignacion.curso.capacidad_estimada,
-            tipo_aula=asignacion.aula.tipo_aula  # Mantener mismo tipo de aula
-        ).exclude(id=asignacion.aula.id)
-
-        for aula in aulas_disponibles:
-            if not self._aula_ocupada_en_horario(aula, asignacion.dia_semana, asignacion.bloque_horario):
-                # Reasignar el aula
-                asignacion.aula = aula
-                asignacion.save()
-                return True
-
-        return False
-
-    def _resolver_conflicto_equipamiento(self, conflicto):
-        """
-        NUEVO MÉTODO: Resuelve conflictos de equipamiento
-        """
-        asignacion = conflicto.asignacion
-        aulas_disponibles = Aula.objects.filter(
-            activa=True,
-            tipo_aula='LABORATORIO',
-            capacidad__gte=asignacion.curso.capacidad_estimada
-        ).exclude(id=asignacion.aula.id)
+        actual = (asignacion.aula_id, asignacion.dia_semana, asignacion.bloque_horario)
+        if self.restricciones.admite_aula(asignacion.curso, asignacion.aula) and actual not in self._aulas_externas:
+            # Ya resuelto (p. ej. por otro conflicto de la misma asignación)
+            return True
 
-        for aula in aulas_disponibles:
+        for aula in self.restricciones.aulas_para(asignacion.curso):
             if not self._aula_ocupada_en_horario(aula, asignacion.dia_semana, asignacion.bloque_horario):
+                if actual not in self._aulas_externas:
+                    self._ocupacion_aula.discard(actual)
+                self._ocupacion_aula.add((aula.id, asignacion.dia_semana, asignacion.bloque_horario))
                 # Reasignar el aula
                 asignacion.aula = aula
                 asignacion.save()
@@ -321,11 +566,7 @@ class ResolvedorConflictos:
 
     def _aula_ocupada_en_horario(self, aula, dia, bloque):
         """
-        Verifica si un aula está ocupada en un horario específico
+        Verifica si un aula está ocupada en un horario específico, en este
+        horario o en otro publicado del mismo semestre
         """
-        return Asignacion.objects.filter(
-            horario=self.horario,
-            aula=aula,
-            dia_semana=dia,
-            bloque_horario=bloque
-        ).exists()
\ No newline at end of file
+        return (aula.id, dia, bloque) in self._ocupacion_aula
@@ -0,0 +1,99 @@
+# schedule/core/carga_docente.py
+"""
+Selección de docentes por carga.
+
+Por cada franja (día, bloque) se mantiene un montículo con los docentes
+disponibles en ella, ordenados por las horas que ya tienen asignadas en la
+pasada y un desempate aleatorio (distinto en cada pasada). Elegir al menos
+cargado cuesta O(log n): se extraen entradas hasta dar con uno que cumpla
+las restricciones del curso y los descartados por el curso se devuelven.
+
+Las cargas solo crecen. Al asignar una sesión se empuja la nueva carga del
+docente en los montículos de sus demás franjas y las entradas con una carga
+vieja se descartan al salir (eliminación perezosa). La franja que el
+docente acaba de ocupar ya no recibe entrada.
+
+Si el curso solo admite unos pocos docentes (habilitaciones DocenteCurso) no
+se recorre el montículo de la franja: se ordenan directamente esos candidatos.
+"""
+import heapq
+from collections import defaultdict
+
+
+class ColaDocentes:
+    def __init__(self, docentes, disponibilidad):
+        self.docentes = {docente.id: docente for docente in docentes}
+        # Franjas en las que cada docente registró disponibilidad
+        self.franjas = defaultdict(list)
+        for docente_id, dia, bloque in disponibilidad:
+            if docente_id in self.docentes:
+                self.franjas[docente_id].append((dia, bloque))
+        self.disponibles = {clave for clave in disponibilidad if clave[0] in self.docentes}
+        self.carga = {}
+        self.desempate = {}
+        self.ocupadas = set()
+        self.monticulos = {}
+
+    def reiniciar(self, azar):
+        """Cargas en cero y nuevo desempate, antes de cada pasada"""
+        self.carga = dict.fromkeys(self.docentes, 0)
+        self.desempate = {docente_id: azar.random() for docente_id in self.docentes}
+        self.ocupadas = set()
+        self.monticulos = defaultdict(list)
+        for docente_id, franjas in self.franjas.items():
+            for franja in franjas:
+                self.monticulos[franja].append((0, self.desempate[docente_id], docente_id))
+        for monticulo in self.monticulos.values():
+            heapq.heapify(monticulo)
+
+    def elegir(self, dia, bloque, admite, candidatos=None):
+        """
+        Docente menos cargado de la franja para el que `admite(docente)`, o
+        None. `candidatos` (ids) acota la búsqueda a un conjunto cerrado.
+        """
+        if candidatos is not None:
+            return self._elegir_entre(candidatos, dia, bloque, admite)
+        monticulo = self.monticulos.get((dia, bloque))
+        if not monticulo:
+            return None
+        apartadas = []
+        elegido = None
+        while monticulo:
+            entrada = heapq.heappop(monticulo)
+            carga, _, docente_id = entrada
+            if carga != self.carga[docente_id]:
+                continue
+            # Sigue en la cola: la opción aún puede descartarse por el aula
+            apartadas.append(entrada)
+            docente = self.docentes[docente_id]
+            if admite(docente):
+                elegido = docente
+                break
+        for entrada in apartadas:
+            heapq.heappush(monticulo, entrada)
+        return elegido
+
+    def _elegir_entre(self, candidatos, dia, bloque, admite):
+        opciones = sorted(
+            (self.carga[docente_id], self.desempate[docente_id], docente_id)
+            for docente_id in candidatos
+            if (docente_id, dia, bloque) in self.disponibles and (docente_id, dia, bloque) not in self.ocupadas
+        )
+        for _, _, docente_id in opciones:
+            docente = self.docentes[docente_id]
+            if admite(docente):
+                return docente
+        return None
+
+    def asignar(self, docente, dia, bloque, horas):
+        """Registra la sesión asignada y reubica al docente en sus franjas libres"""
+        carga = self.carga.get(docente.id)
+        if carga is None:
+            return
+        carga += horas
+        self.carga[docente.id] = carga
+        self.ocupadas.add((docente.id, dia, bloque))
+        entrada = (carga, self.desempate[docente.id], docente.id)
+        for franja in self.franjas[docente.id]:
+            if (docente.id, *franja) not in self.ocupadas:
+                heapq.heappush(self.monticulos[franja], entrada)
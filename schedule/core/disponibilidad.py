@@ -0,0 +1,26 @@
+# schedule/core/disponibilidad.py
+from ..models import HorarioPersonalizadoDocente
+
+
+def franjas_disponibles(docente_ids, dias, bloques):
+    """
+    Precalcula en una sola consulta los (docente, día, bloque) en los que
+    cada docente tiene un horario DISPONIBLE que cubre el bloque completo
+    """
+    disponibilidad = set()
+    horarios_disponibles = HorarioPersonalizadoDocente.objects.filter(
+        docente_id__in=docente_ids,
+        dia_semana__in=dias,
+        tipo='DISPONIBLE'
+    ).values_list('docente_id', 'dia_semana', 'hora_inicio', 'hora_fin')
+
+    # Convertir bloque a horas (ej: "08:00-10:00" -> "08:00" y "10:00")
+    bloques = [(bloque, *bloque.split('-')) for bloque in bloques]
+    for docente_id, dia, hora_inicio, hora_fin in horarios_disponibles:
+        horario_inicio_str = hora_inicio.strftime('%H:%M')
+        horario_fin_str = hora_fin.strftime('%H:%M')
+        for bloque, hora_inicio_bloque, hora_fin_bloque in bloques:
+            # Verificar si el bloque está dentro del horario disponible
+            if horario_inicio_str <= hora_inicio_bloque and horario_fin_str >= hora_fin_bloque:
+                disponibilidad.add((docente_id, dia, bloque))
+    return disponibilidad
@@ -0,0 +1,91 @@
+# schedule/core/indice_aulas.py
+"""
+Índice de aulas para buscar el aula libre de mejor ajuste.
+
+Las aulas con el mismo tipo, equipamiento y capacidad son intercambiables
+para las restricciones, así que se agrupan en clases de equivalencia y por
+cada franja solo se lleva qué aulas de cada clase están ocupadas. Para cada
+curso se guardan una vez por corrida sus clases compatibles, ordenadas por
+capacidad. El aula de mejor ajuste sale de una búsqueda binaria por la
+capacidad estimada del curso. Desde ahí se avanza hacia ambos lados y se
+saltan las clases sin aulas libres en la franja (un conteo). Nunca se prueba
+más de un aula por clase: las demás son simétricas.
+"""
+import bisect
+from collections import defaultdict
+
+# Atributos que deben coincidir para que dos aulas sean equivalentes
+CARACTERISTICAS = (
+    'tipo', 'capacidad', 'tiene_proyector', 'tiene_computadoras',
+    'tiene_pizarra_digital', 'equipamiento_adicional',
+)
+
+
+def clave_equivalencia(aula):
+    return tuple(getattr(aula, campo) for campo in CARACTERISTICAS)
+
+
+class IndiceAulas:
+    def __init__(self, aulas, restricciones):
+        grupos = {}
+        for aula in aulas:
+            grupos.setdefault(clave_equivalencia(aula), []).append(aula)
+        self.clases = list(grupos.values())
+        self.clase_de = {aula.id: i for i, clase in enumerate(self.clases) for aula in clase}
+        self.restricciones = restricciones
+        self._por_curso = {}
+        self.ocupadas = defaultdict(set)
+
+    def reiniciar(self, ocupadas=()):
+        """Antes de cada pasada: libres salvo las `ocupadas` [(aula_id, dia, bloque)]"""
+        self.ocupadas = defaultdict(set)
+        for aula_id, dia, bloque in ocupadas:
+            self._ocupar(aula_id, dia, bloque)
+
+    def compatibles(self, curso):
+        """(capacidades, índices de clase) compatibles con el curso, por capacidad"""
+        compatibles = self._por_curso.get(curso.id)
+        if compatibles is None:
+            # Basta un representante: las restricciones ven lo mismo en toda la clase
+            indices = sorted(
+                (i for i, clase in enumerate(self.clases) if self.restricciones.admite_aula(curso, clase[0])),
+                key=lambda i: self.clases[i][0].capacidad
+            )
+            compatibles = ([self.clases[i][0].capacidad for i in indices], indices)
+            self._por_curso[curso.id] = compatibles
+        return compatibles
+
+    def mejor_ajuste(self, curso, dia, bloque):
+        """Aula libre en la franja con la capacidad más cercana a la estimada del curso, o None"""
+        capacidades, indices = self.compatibles(curso)
+        objetivo = curso.capacidad_estimada
+        derecha = bisect.bisect_left(capacidades, objetivo)
+        izquierda = derecha - 1
+        while izquierda >= 0 or derecha < len(indices):
+            # El lado más cercano primero; a igual distancia, el aula más grande
+            if derecha < len(indices) and (
+                    izquierda < 0 or capacidades[derecha] - objetivo <= objetivo - capacidades[izquierda]):
+                posicion, derecha = derecha, derecha + 1
+            else:
+                posicion, izquierda = izquierda, izquierda - 1
+            aula = self._libre(indices[posicion], dia, bloque)
+            if aula is not None:
+                return aula
+        return None
+
+    def _libre(self, indice, dia, bloque):
+        clase = self.clases[indice]
+        ocupadas = self.ocupadas.get((indice, dia, bloque))
+        if not ocupadas:
+            return clase[0]
+        if len(ocupadas) >= len(clase):
+            return None
+        return next(aula for aula in clase if aula.id not in ocupadas)
+
+    def ocupar(self, aula, dia, bloque):
+        self._ocupar(aula.id, dia, bloque)
+
+    def _ocupar(self, aula_id, dia, bloque):
+        indice = self.clase_de.get(aula_id)
+        if indice is not None:
+            self.ocupadas[(indice, dia, bloque)].add(aula_id)
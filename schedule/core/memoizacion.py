@@ -0,0 +1,150 @@
+# schedule/core/memoizacion.py
+"""
+Memoización de resultados de generación direccionada por contenido.
+
+La huella de una generación es un SHA-256 de todas sus entradas (cursos
+activos y sus prerrequisitos, aulas activas, docentes activos y sus
+habilitaciones, disponibilidad, aulas ocupadas por otros horarios del
+semestre, configuración y semilla). Si ya existe una solución con esa
+huella se restaura con una copia masiva en lugar de volver a resolver. Las
+soluciones guardadas están acotadas en número y en tamaño y se desalojan por
+antigüedad de uso (LRU).
+"""
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from academic.models import Curso, Aula, DocenteCurso
+from users.models import User
+from ..models import Asignacion, HorarioPersonalizadoDocente, SolucionCacheada
+
+logger = logging.getLogger(__name__)
+
+LIMITES_POR_DEFECTO = {
+    'MAX_ENTRADAS': 50,
+    'MAX_BYTES': 20 * 1024 * 1024,
+    'MAX_BYTES_ENTRADA': 2 * 1024 * 1024,
+}
+
+CAMPOS_SOLUCION = ('curso_id', 'docente_id', 'aula_id', 'dia_semana', 'bloque_horario')
+
+
+def limites():
+    return {**LIMITES_POR_DEFECTO, **getattr(settings, 'HORUNAP_CACHE_SOLUCIONES', {})}
+
+
+def calcular_huella(configuracion, semilla, aulas_compartidas=()):
+    """
+    Huella SHA-256 de todas las entradas de una generación; `aulas_compartidas`
+    son las franjas ocupadas por otros horarios del semestre
+    """
+    entradas = {
+        'cursos': list(Curso.objects.filter(activo=True).order_by('id').values_list(
+            'id', 'sesiones_semana', 'duracion_sesion', 'capacidad_estimada', 'requiere_laboratorio', 'tipo'
+        )),
+        # Los niveles de la malla intervienen en las restricciones
+        'requisitos': list(Curso.requisitos.through.objects.order_by('id').values_list(
+            'from_curso_id', 'to_curso_id'
+        )),
+        'aulas': list(Aula.objects.filter(activa=True).order_by('id').values_list(
+            'id', 'capacidad', 'tipo', 'tiene_proyector'
+        )),
+        'docentes': list(User.objects.filter(rol='DOCENTE', is_active=True).order_by('id').values_list(
+            'id', flat=True
+        )),
+        'habilitaciones': list(DocenteCurso.objects.order_by('curso_id', 'docente_id').values_list(
+            'curso_id', 'docente_id', 'preferencia'
+        )),
+        'disponibilidad': list(HorarioPersonalizadoDocente.objects.order_by('id').values_list(
+            'docente_id', 'dia_semana', 'hora_inicio', 'hora_fin', 'tipo'
+        )),
+        'aulas_compartidas': sorted(aulas_compartidas),
+        'configuracion': configuracion,
+        'semilla': semilla,
+    }
+    contenido = json.dumps(entradas, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+def buscar_solucion(huella):
+    """Devuelve la solución cacheada para la huella (y marca su uso) o None"""
+    solucion = SolucionCacheada.objects.filter(huella=huella).first()
+    if solucion is not None:
+        SolucionCacheada.objects.filter(pk=solucion.pk).update(
+            fecha_ultimo_uso=timezone.now(),
+            usos=solucion.usos + 1
+        )
+    return solucion
+
+
+def restaurar_solucion(horario, solucion):
+    """Publica en bloque las asignaciones de la solución en el horario"""
+    from .operaciones import publicar_asignaciones
+
+    return publicar_asignaciones(horario, [
+        Asignacion(
+            horario=horario,
+            curso_id=curso_id,
+            docente_id=docente_id,
+            aula_id=aula_id,
+            dia_semana=dia,
+            bloque_horario=bloque
+        )
+        for curso_id, docente_id, aula_id, dia, bloque in solucion.asignaciones
+    ])
+
+
+def guardar_solucion(huella, horario):
+    """
+    Guarda las asignaciones del horario bajo la huella y desaloja entradas
+    antiguas si se superan los límites. Devuelve None si la solución es
+    demasiado grande para cachearse.
+    """
+    filas = [
+        list(fila) for fila in
+        Asignacion.objects.filter(horario=horario).order_by('id').values_list(*CAMPOS_SOLUCION)
+    ]
+    tamano = len(json.dumps(filas, separators=(',', ':')))
+    maximos = limites()
+    if tamano > maximos['MAX_BYTES_ENTRADA']:
+        logger.info("Solución de %d bytes no cacheada (máximo %d)", tamano, maximos['MAX_BYTES_ENTRADA'])
+        return None
+
+    solucion, _ = SolucionCacheada.objects.update_or_create(
+        huella=huella,
+        defaults={
+            'asignaciones': filas,
+            'num_asignaciones': len(filas),
+            'tamano_bytes': tamano,
+            'fecha_ultimo_uso': timezone.now(),
+        }
+    )
+    desalojar(maximos)
+    return solucion
+
+
+def desalojar(maximos=None):
+    """Elimina las soluciones menos usadas recientemente hasta cumplir los límites"""
+    maximos = maximos or limites()
+    entradas = list(SolucionCacheada.objects.order_by('-fecha_ultimo_uso').values_list('id', 'tamano_bytes'))
+
+    conservar_bytes = 0
+    eliminar = []
+    for posicion, (pk, tamano) in enumerate(entradas):
+        if posicion >= maximos['MAX_ENTRADAS'] or conservar_bytes + tamano > maximos['MAX_BYTES']:
+            eliminar.append(pk)
+        else:
+            conservar_bytes += tamano
+
+    if eliminar:
+        SolucionCacheada.objects.filter(id__in=eliminar).delete()
+        logger.debug("Desalojadas %d soluciones cacheadas", len(eliminar))
+    return len(eliminar)
+
+
+def tamano_total():
+    return SolucionCacheada.objects.aggregate(total=Sum('tamano_bytes'))['total'] or 0
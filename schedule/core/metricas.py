@@ -0,0 +1,215 @@
+# schedule/core/metricas.py
+import logging
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class MetricasEjecucion:
+    """
+    Registro de métricas y trazas de una ejecución del motor de horarios.
+
+    Mide por fase (carga, búsqueda, persistencia, detección, resolución) el
+    tiempo y las consultas SQL de forma exclusiva: cuando una fase se abre
+    dentro de otra, la fase exterior se pausa. Además lleva un histograma de
+    intentos por sesión, las sesiones asignadas/fallidas con su motivo y el
+    pico de memoria. Al final se persiste como `EjecucionGeneracion`.
+    """
+
+    # Límites superiores de los intervalos del histograma de intentos
+    LIMITES_HISTOGRAMA = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+    def __init__(self, horario, tipo='GENERACION'):
+        self.horario = horario
+        self.tipo = tipo
+        self.fases = {}
+        self.histograma_intentos = {self._etiqueta(i): 0 for i in range(len(self.LIMITES_HISTOGRAMA) + 1)}
+        self.sesiones_asignadas = 0
+        self.sesiones_fallidas = 0
+        self.fallos = []
+        self.motivos_fallo = {}
+        self.extra = {}
+        self.total_consultas = 0
+        self.memoria_pico_kb = None
+
+        self._pila_fases = []
+        self._inicio_fase = None
+        self._fecha_inicio = None
+        self._inicio = None
+        self._duracion_total = None
+        self.ejecucion = None
+        self._wrapper = None
+        self._medir_memoria = getattr(settings, 'HORUNAP_METRICAS_MEMORIA', False)
+        self._tracemalloc_propio = False
+
+    # --- Ciclo de vida ---
+
+    def iniciar(self):
+        # Puede reanudarse (p. ej. generación y luego detección de conflictos):
+        # la duración total se acumula y se actualiza la misma ejecución
+        if self._fecha_inicio is None:
+            self._fecha_inicio = timezone.now()
+        self._inicio = time.perf_counter()
+        self._wrapper = connection.execute_wrapper(self._contar_consulta)
+        self._wrapper.__enter__()
+        if self._medir_memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracemalloc_propio = True
+        return self
+
+    def finalizar(self):
+        if self._wrapper is not None:
+            self._wrapper.__exit__(None, None, None)
+            self._wrapper = None
+        self._duracion_total = (self._duracion_total or 0.0) + time.perf_counter() - self._inicio
+        self.memoria_pico_kb = self._memoria_pico_kb()
+        if self._tracemalloc_propio:
+            tracemalloc.stop()
+            self._tracemalloc_propio = False
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finalizar()
+        return False
+
+    # --- Fases ---
+
+    @contextmanager
+    def fase(self, nombre):
+        ahora = time.perf_counter()
+        if self._pila_fases:
+            self._acumular(self._pila_fases[-1], ahora - self._inicio_fase)
+        self._pila_fases.append(nombre)
+        self.fases.setdefault(nombre, {'segundos': 0.0, 'consultas': 0, 'tiempo_sql': 0.0})
+        self._inicio_fase = ahora
+        try:
+            yield
+        finally:
+            ahora = time.perf_counter()
+            self._acumular(self._pila_fases.pop(), ahora - self._inicio_fase)
+            self._inicio_fase = ahora
+
+    def _acumular(self, nombre, segundos):
+        self.fases[nombre]['segundos'] += segundos
+
+    def _contar_consulta(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.total_consultas += 1
+            if self._pila_fases:
+                fase = self.fases[self._pila_fases[-1]]
+                fase['consultas'] += 1
+                fase['tiempo_sql'] += time.perf_counter() - inicio
+
+    # --- Eventos de búsqueda ---
+
+    def sesion_asignada(self, curso, intentos):
+        self.sesiones_asignadas += 1
+        self._registrar_intentos(intentos)
+
+    def sesion_fallida(self, curso, sesion, intentos, motivo):
+        self.sesiones_fallidas += 1
+        self._registrar_intentos(intentos)
+        self.motivos_fallo[motivo] = self.motivos_fallo.get(motivo, 0) + 1
+        self.fallos.append({
+            'curso': curso.codigo,
+            'sesion': sesion,
+            'intentos': intentos,
+            'motivo': motivo,
+        })
+        logger.debug("No se pudo asignar sesión %s del curso %s (%s)", sesion, curso.codigo, motivo)
+
+    def _registrar_intentos(self, intentos):
+        for indice, limite in enumerate(self.LIMITES_HISTOGRAMA):
+            if intentos <= limite:
+                break
+        else:
+            indice = len(self.LIMITES_HISTOGRAMA)
+        self.histograma_intentos[self._etiqueta(indice)] += 1
+
+    @classmethod
+    def _etiqueta(cls, indice):
+        limites = cls.LIMITES_HISTOGRAMA
+        if indice == len(limites):
+            return f">{limites[-1]}"
+        inferior = limites[indice - 1] + 1 if indice else 1
+        return str(limites[indice]) if inferior == limites[indice] else f"{inferior}-{limites[indice]}"
+
+    # --- Resultado ---
+
+    @staticmethod
+    def _memoria_pico_kb():
+        if tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[1] // 1024
+        try:
+            import resource
+        except ImportError:
+            return None
+        # ru_maxrss está en KB en Linux (pico del proceso completo)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    def como_dict(self):
+        return {
+            'tipo': self.tipo,
+            'duracion_total': round(self._duracion_total or 0.0, 6),
+            'fases': {
+                nombre: {
+                    'segundos': round(datos['segundos'], 6),
+                    'consultas': datos['consultas'],
+                    'tiempo_sql': round(datos['tiempo_sql'], 6),
+                }
+                for nombre, datos in self.fases.items()
+            },
+            'histograma_intentos': self.histograma_intentos,
+            'sesiones_asignadas': self.sesiones_asignadas,
+            'sesiones_fallidas': self.sesiones_fallidas,
+            'motivos_fallo': self.motivos_fallo,
+            'fallos': self.fallos,
+            'total_consultas': self.total_consultas,
+            'memoria_pico_kb': self.memoria_pico_kb,
+            **self.extra,
+        }
+
+    def persistir(self, estado='COMPLETADA'):
+        """Guarda (o actualiza) la ejecución y sus métricas en la base de datos"""
+        from ..models import EjecucionGeneracion
+
+        if self._wrapper is not None:
+            self.finalizar()
+        datos = self.como_dict()
+        campos = {
+            'horario': self.horario,
+            'tipo': self.tipo,
+            'estado': estado,
+            'fecha_inicio': self._fecha_inicio or timezone.now(),
+            'duracion_total': datos['duracion_total'],
+            'sesiones_asignadas': self.sesiones_asignadas,
+            'sesiones_fallidas': self.sesiones_fallidas,
+            'total_consultas': self.total_consultas,
+            'memoria_pico_kb': self.memoria_pico_kb,
+            'metricas': datos,
+        }
+        if self.ejecucion is None:
+            self.ejecucion = EjecucionGeneracion.objects.create(**campos)
+        else:
+            for campo, valor in campos.items():
+                setattr(self.ejecucion, campo, valor)
+            self.ejecucion.save()
+        ejecucion = self.ejecucion
+        logger.info(
+            "%s de '%s' %s en %.3fs: %d sesiones asignadas, %d fallidas, %d consultas",
+            self.tipo.capitalize(), self.horario.nombre, estado.lower(),
+            datos['duracion_total'], self.sesiones_asignadas,
+            self.sesiones_fallidas, self.total_consultas
+        )
+        return ejecucion
@@ -0,0 +1,30 @@
+# schedule/core/ocupacion.py
+"""
+Ocupación global de aulas por semestre.
+
+Las aulas son un recurso compartido entre los horarios publicados (APROBADO
+o ACTIVO) de un mismo semestre, p. ej. los de distintas facultades. Al
+generar, resolver o validar un horario se cargan en una sola consulta las
+franjas que los demás ya ocupan y se tratan como ocupadas.
+
+Solo se leen horarios publicados, que no se generan ni se regeneran: las
+generaciones de horarios distintos pueden seguir corriendo en paralelo, cada
+una bajo su propio bloqueo, sin coordinarse entre sí.
+"""
+from ..calendario import ESTADOS_PUBLICADOS
+from ..models import Asignacion
+
+
+def aulas_ocupadas_por_otros(horario, aulas=None):
+    """
+    {(aula_id, dia, bloque)} ocupadas por los otros horarios publicados del
+    semestre del horario; `aulas` (ids) limita la consulta
+    """
+    asignaciones = Asignacion.objects.filter(
+        horario__semestre=horario.semestre,
+        horario__estado__in=ESTADOS_PUBLICADOS,
+        activa=True,
+    ).exclude(horario_id=horario.id)
+    if aulas is not None:
+        asignaciones = asignaciones.filter(aula_id__in=aulas)
+    return set(asignaciones.values_list('aula_id', 'dia_semana', 'bloque_horario'))
@@ -0,0 +1,351 @@
+# schedule/core/operaciones.py
+"""
+Operaciones masivas sobre horarios expresadas como una sola sentencia SQL
+(INSERT ... SELECT / DELETE por conjunto), sin recorrer filas en Python,
+publicación atómica de resultados del motor con bloqueo por horario, y
+movimientos/intercambios atómicos de asignaciones con control de
+concurrencia optimista.
+"""
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, CharField, F, Q, Value, When
+from django.db.models.functions import Cast, Concat
+from django.utils import timezone
+
+from horunap_api.catalogos import invalidar_catalogos
+from ..models import Horario, Asignacion, ConflictoHorario
+from .validacion import CAMPOS_CAMBIO, ValidadorCambios
+
+
+class GeneracionEnCurso(Exception):
+    """Otra generación o resolución ya está trabajando sobre el horario"""
+
+
+class ConflictoVersion(Exception):
+    """Otra edición modificó alguna de las asignaciones desde que se leyó su versión"""
+
+    def __init__(self, conflictos, mensaje='Las asignaciones fueron modificadas por otra edición'):
+        super().__init__(mensaje)
+        self.conflictos = conflictos
+
+
+class CambiosInvalidos(Exception):
+    """Algún cambio viola las restricciones del horario"""
+
+    def __init__(self, resultado):
+        super().__init__('Cambios inválidos')
+        self.resultado = resultado
+
+
+def _columnas(modelo, excluir=()):
+    """Columnas concretas del modelo (sin la clave primaria) en orden estable"""
+    return [
+        campo.column for campo in modelo._meta.concrete_fields
+        if not campo.primary_key and campo.name not in excluir
+    ]
+
+
+@contextmanager
+def bloquear_horario(horario_id):
+    """
+    Bloqueo por horario para generación y resolución: `cache.add` es atómico,
+    así que solo un proceso lo obtiene. Expira solo (HORUNAP_BLOQUEO_GENERACION_SEGUNDOS)
+    si el proceso muere sin liberarlo.
+    """
+    clave = f'bloqueo:horario:{horario_id}'
+    token = uuid.uuid4().hex
+    duracion = getattr(settings, 'HORUNAP_BLOQUEO_GENERACION_SEGUNDOS', 15 * 60)
+    if not cache.add(clave, token, duracion):
+        raise GeneracionEnCurso(f'El horario {horario_id} ya se está generando o resolviendo')
+    try:
+        yield
+    finally:
+        # Solo quien lo tomó lo libera (si expiró, otro pudo tomarlo)
+        if cache.get(clave) == token:
+            cache.delete(clave)
+
+
+def publicar_asignaciones(horario, asignaciones, estado='GENERADO'):
+    """
+    Reemplaza las asignaciones del horario por las recibidas (ya construidas
+    en memoria) en una sola transacción: quien lea el horario ve el resultado
+    anterior completo o el nuevo completo, nunca uno a medio construir.
+
+    La fila del horario se bloquea (select_for_update) para serializar
+    publicaciones concurrentes, y el borrado es por conjunto: dos DELETE
+    (conflictos y asignaciones) en lugar del borrado en cascada del ORM, que
+    primero lee todas las filas relacionadas.
+    """
+    qn = connection.ops.quote_name
+    tabla_asig = qn(Asignacion._meta.db_table)
+    tabla_conf = qn(ConflictoHorario._meta.db_table)
+    asig_horario = qn(Asignacion._meta.get_field('horario').column)
+    conf_horario = qn(ConflictoHorario._meta.get_field('horario').column)
+    conf_asig = qn(ConflictoHorario._meta.get_field('asignacion').column)
+
+    with transaction.atomic():
+        list(Horario.objects.select_for_update().filter(pk=horario.pk).values_list('pk'))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {tabla_conf} WHERE {conf_horario} = %s OR {conf_asig} IN "
+                f"(SELECT {qn('id')} FROM {tabla_asig} WHERE {asig_horario} = %s)",
+                [horario.pk, horario.pk]
+            )
+            cursor.execute(f"DELETE FROM {tabla_asig} WHERE {asig_horario} = %s", [horario.pk])
+        invalidar_catalogos('conflictos')
+        creadas = Asignacion.objects.bulk_create(asignaciones, batch_size=500)
+
+        # Guardar el horario emite post_save e invalida los feeds cacheados
+        horario.estado = estado
+        horario.save()
+    return len(creadas)
+
+
+@transaction.atomic
+def clonar_horario(horario, nombre, creado_por, semestre=None, incluir_conflictos=False, excluir_aulas=None):
+    """
+    Crea un nuevo horario (variante/escenario) copiando las asignaciones del
+    horario original con un único INSERT ... SELECT, opcionalmente también sus
+    conflictos. `excluir_aulas` permite simular escenarios como "el laboratorio
+    B está cerrado": sus asignaciones no se copian.
+
+    Devuelve (nuevo_horario, asignaciones_copiadas, conflictos_copiados).
+    """
+    nuevo = Horario.objects.create(
+        nombre=nombre,
+        semestre=semestre or horario.semestre,
+        estado='BORRADOR',
+        fecha_inicio=horario.fecha_inicio,
+        fecha_fin=horario.fecha_fin,
+        creado_por=creado_por,
+    )
+    qn = connection.ops.quote_name
+    ahora = connection.ops.adapt_datetimefield_value(timezone.now())
+
+    tabla_asig = qn(Asignacion._meta.db_table)
+    col_horario = Asignacion._meta.get_field('horario').column
+    col_fecha = Asignacion._meta.get_field('fecha_asignacion').column
+    copiadas = _columnas(Asignacion, excluir=('horario', 'fecha_asignacion'))
+
+    sql = (
+        f"INSERT INTO {tabla_asig} ({qn(col_horario)}, {qn(col_fecha)}, {', '.join(qn(c) for c in copiadas)}) "
+        f"SELECT %s, %s, {', '.join(qn(c) for c in copiadas)} FROM {tabla_asig} WHERE {qn(col_horario)} = %s"
+    )
+    params = [nuevo.id, ahora, horario.id]
+    if excluir_aulas:
+        col_aula = Asignacion._meta.get_field('aula').column
+        sql += f" AND {qn(col_aula)} NOT IN ({', '.join(['%s'] * len(excluir_aulas))})"
+        params.extend(excluir_aulas)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        asignaciones_copiadas = cursor.rowcount
+
+        conflictos_copiados = 0
+        if incluir_conflictos:
+            conflictos_copiados = _clonar_conflictos(cursor, horario.id, nuevo.id)
+    if conflictos_copiados:
+        invalidar_catalogos('conflictos')
+
+    return nuevo, asignaciones_copiadas, conflictos_copiados
+
+
+def _clonar_conflictos(cursor, origen_id, destino_id):
+    """
+    Copia los conflictos enlazándolos con la asignación equivalente del nuevo
+    horario, identificada por (curso, día, bloque), que es única por horario.
+    """
+    qn = connection.ops.quote_name
+    tabla_conf = qn(ConflictoHorario._meta.db_table)
+    tabla_asig = qn(Asignacion._meta.db_table)
+
+    def campo(modelo, nombre):
+        return qn(modelo._meta.get_field(nombre).column)
+
+    conf_horario = campo(ConflictoHorario, 'horario')
+    conf_asig = campo(ConflictoHorario, 'asignacion')
+    copiadas = _columnas(ConflictoHorario, excluir=('horario', 'asignacion'))
+
+    asig_horario = campo(Asignacion, 'horario')
+    enlace = ' AND '.join(
+        f"nueva.{campo(Asignacion, nombre)} = vieja.{campo(Asignacion, nombre)}"
+        for nombre in ('curso', 'dia_semana', 'bloque_horario')
+    )
+
+    cursor.execute(
+        f"INSERT INTO {tabla_conf} ({conf_horario}, {conf_asig}, {', '.join(qn(c) for c in copiadas)}) "
+        f"SELECT %s, nueva.{qn('id')}, {', '.join('c.' + qn(c) for c in copiadas)} "
+        f"FROM {tabla_conf} c "
+        f"JOIN {tabla_asig} vieja ON vieja.{qn('id')} = c.{conf_asig} "
+        f"JOIN {tabla_asig} nueva ON nueva.{asig_horario} = %s AND {enlace} "
+        f"WHERE c.{conf_horario} = %s",
+        [destino_id, destino_id, origen_id]
+    )
+    return cursor.rowcount
+
+
+def aplicar_lote(horario, crear=(), actualizar=(), activa=()):
+    """
+    Aplica en una sola transacción un lote de cambios sobre las asignaciones
+    de un horario:
+      - actualizar: [{'asignacion': id, 'version': n (opcional), 'dia_semana': ..., ...}]
+      - crear:      [{'curso': id, 'docente': id, 'aula': id, 'dia_semana': ..., 'bloque_horario': ...}]
+      - activa:     [{'asignacion': id, 'version': n (opcional), 'activa': bool (omitido = alternar)}]
+
+    1. Valida actualizaciones y altas juntas contra la instantánea del
+       horario (ValidadorCambios): las altas pueden ocupar franjas que el
+       mismo lote libera. Una versión desactualizada lanza ConflictoVersion;
+       cualquier cambio inválido, CambiosInvalidos (no se aplica nada).
+    2. Un solo UPDATE condicionado a las versiones incrementa la versión de
+       las filas tocadas y aparta las movidas a un bloque temporal único
+       ('__tmp_<id>'), para que los cambios cruzados (intercambios) no
+       choquen con unique_together a mitad de camino.
+    3. bulk_update con las posiciones finales y `activa`, y bulk_create de
+       las altas.
+
+    Devuelve los resultados por elemento, en el orden recibido.
+    """
+    from ..calendario import invalidar_horarios
+
+    crear, actualizar, activa = list(crear), list(actualizar), list(activa)
+    validador = ValidadorCambios(horario)
+    resultado = validador.validar(actualizar + crear)
+    existentes = validador.asignaciones
+
+    resultados = []
+    for operacion, cambios, veredictos in (
+            ('actualizar', actualizar, resultado['resultados'][:len(actualizar)]),
+            ('crear', crear, resultado['resultados'][len(actualizar):])):
+        for indice, veredicto in enumerate(veredictos):
+            resultados.append({**veredicto, 'operacion': operacion, 'indice': indice})
+    for indice, cambio in enumerate(activa):
+        existe = cambio['asignacion'] in existentes
+        resultados.append({
+            'operacion': 'activa', 'indice': indice, 'asignacion': cambio['asignacion'], 'valido': existe,
+            'errores': [] if existe else [{'codigo': 'asignacion_inexistente',
+                                          'mensaje': 'La asignación no pertenece a este horario'}],
+            'advertencias': [],
+        })
+
+    # Versiones desactualizadas: se informan antes que cualquier error de validación
+    versiones = {}
+    for cambio in actualizar + activa:
+        if cambio.get('version') is not None:
+            versiones[cambio['asignacion']] = cambio['version']
+    obsoletas = [
+        {'asignacion': asignacion_id, 'version_esperada': version,
+         'version_actual': existentes[asignacion_id]['version']}
+        for asignacion_id, version in versiones.items()
+        if asignacion_id in existentes and existentes[asignacion_id]['version'] != version
+    ]
+    if obsoletas:
+        raise ConflictoVersion(obsoletas)
+    if not all(r['valido'] for r in resultados):
+        raise CambiosInvalidos({'valido': False, 'resultados': resultados})
+
+    # Posición final completa de cada asignación movida (los campos omitidos no cambian)
+    finales = {c['asignacion']: validador.completar(c) for c in actualizar}
+    movidas = list(finales)
+    tocadas = set(movidas) | {c['asignacion'] for c in activa}
+
+    with transaction.atomic():
+        filtro = Q()
+        for asignacion_id in tocadas:
+            if asignacion_id in versiones:
+                filtro |= Q(id=asignacion_id, version=versiones[asignacion_id])
+            else:
+                filtro |= Q(id=asignacion_id)
+        if tocadas:
+            apartadas = Asignacion.objects.filter(filtro, horario=horario).update(
+                bloque_horario=Case(
+                    When(id__in=movidas, then=Concat(Value('__tmp_'), Cast('id', CharField()))),
+                    default=F('bloque_horario'),
+                ),
+                version=F('version') + 1,
+            )
+            if apartadas != len(tocadas):
+                actuales = dict(Asignacion.objects.filter(id__in=versiones).values_list('id', 'version'))
+                raise ConflictoVersion([
+                    {'asignacion': asignacion_id, 'version_esperada': version,
+                     'version_actual': actuales.get(asignacion_id)}
+                    for asignacion_id, version in versiones.items()
+                    if actuales.get(asignacion_id) != version
+                ])
+
+        asignaciones = Asignacion.objects.in_bulk(list(tocadas)) if tocadas else {}
+        for asignacion_id, final in finales.items():
+            asignacion = asignaciones[asignacion_id]
+            for campo in CAMPOS_CAMBIO:
+                atributo = campo if campo in ('dia_semana', 'bloque_horario') else f'{campo}_id'
+                setattr(asignacion, atributo, final[campo])
+        for cambio in activa:
+            asignacion = asignaciones[cambio['asignacion']]
+            asignacion.activa = cambio['activa'] if cambio.get('activa') is not None else not asignacion.activa
+
+        nuevas = [
+            Asignacion(
+                horario=horario, curso_id=c['curso'], docente_id=c['docente'], aula_id=c['aula'],
+                dia_semana=c['dia_semana'], bloque_horario=c['bloque_horario'],
+                activa=c.get('activa', True),
+            )
+            for c in crear
+        ]
+        try:
+            if asignaciones:
+                Asignacion.objects.bulk_update(
+                    asignaciones.values(), ['curso', 'docente', 'aula', 'dia_semana', 'bloque_horario', 'activa'],
+                    batch_size=500
+                )
+            if nuevas:
+                Asignacion.objects.bulk_create(nuevas, batch_size=500)
+        except IntegrityError:
+            # Un cambio concurrente en otra asignación ocupó una franja destino
+            raise ConflictoVersion([], 'Otra edición ocupó una de las franjas destino')
+
+    invalidar_horarios()
+
+    por_operacion = {
+        'actualizar': [asignaciones[c['asignacion']] for c in actualizar],
+        'crear': nuevas,
+        'activa': [asignaciones[c['asignacion']] for c in activa],
+    }
+    for resultado_item in resultados:
+        asignacion = por_operacion[resultado_item['operacion']][resultado_item['indice']]
+        resultado_item.update({
+            'asignacion': asignacion.id, 'version': asignacion.version, 'activa': asignacion.activa,
+        })
+    return {'valido': True, 'resultados': resultados, 'asignaciones': por_operacion}
+
+
+def mover_asignaciones(horario, cambios):
+    """
+    Movimientos atómicos con control de concurrencia optimista (ver
+    aplicar_lote): cada cambio lleva la versión que leyó el cliente.
+    Devuelve las asignaciones movidas, ya con su nueva versión.
+    """
+    return aplicar_lote(horario, actualizar=cambios)['asignaciones']['actualizar']
+
+
+def intercambiar_asignaciones(horario, primera, segunda, incluir_aula=True):
+    """
+    Intercambia la posición (día, bloque y, por defecto, aula) de dos
+    asignaciones. `primera` y `segunda` son (asignacion_id, version).
+    """
+    posiciones = {
+        fila['id']: fila for fila in Asignacion.objects.filter(
+            horario=horario, id__in=[primera[0], segunda[0]]
+        ).values('id', 'aula_id', 'dia_semana', 'bloque_horario')
+    }
+    cambios = []
+    for (origen, version), (destino, _) in ((primera, segunda), (segunda, primera)):
+        posicion = posiciones.get(destino, {})
+        cambio = {'asignacion': origen, 'version': version,
+                  'dia_semana': posicion.get('dia_semana'), 'bloque_horario': posicion.get('bloque_horario')}
+        if incluir_aula:
+            cambio['aula'] = posicion.get('aula_id')
+        cambios.append(cambio)
+    return mover_asignaciones(horario, cambios)
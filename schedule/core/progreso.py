@@ -0,0 +1,99 @@
+# schedule/core/progreso.py
+"""
+Progreso en vivo de generaciones y resoluciones.
+
+El motor informa su avance (fase, sesiones colocadas, mejor resultado hasta
+ahora, conflictos) en cada paso, pero solo se publica en la caché una
+instantánea cada `HORUNAP_PROGRESO_INTERVALO` segundos: una corrida de mil
+sesiones produce un número de mensajes acotado por su duración, no por su
+tamaño. Las fases y el resultado final se publican siempre.
+
+La vista de eventos (SSE) lee esa instantánea y la reenvía al cliente cuando
+cambia, así el proceso que genera no necesita conocer a los clientes. Con
+varios procesos la caché por defecto debe ser compartida.
+"""
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+ESTADOS_FINALES = {'COMPLETADA', 'ERROR'}
+
+# La instantánea sobrevive un rato al final de la ejecución para quien se conecte tarde
+CACHE_TIMEOUT = 10 * 60
+
+
+def clave_progreso(horario_id):
+    return f'progreso:horario:{horario_id}'
+
+
+def intervalo_progreso():
+    return getattr(settings, 'HORUNAP_PROGRESO_INTERVALO', 0.5)
+
+
+def leer_progreso(horario_id):
+    return cache.get(clave_progreso(horario_id))
+
+
+async def aleer_progreso(horario_id):
+    return await cache.aget(clave_progreso(horario_id))
+
+
+class ProgresoEjecucion:
+    """
+    Uso:
+        progreso = ProgresoEjecucion(horario.id, tipo='GENERACION')
+        progreso.actualizar(sesiones_colocadas=10)   # coalescido
+        progreso.fase('persistencia')                # se publica siempre
+        progreso.finalizar(conflictos=0)
+    """
+
+    def __init__(self, horario_id, tipo='GENERACION', intervalo=None):
+        self.clave = clave_progreso(horario_id)
+        self.intervalo = intervalo_progreso() if intervalo is None else intervalo
+        self.datos = {
+            'ejecucion': uuid.uuid4().hex,
+            'horario': horario_id,
+            'tipo': tipo,
+            'estado': 'EN_CURSO',
+            'fase': None,
+            'secuencia': 0,
+        }
+        self.publicaciones = 0
+        self._ultima = None
+
+    def actualizar(self, **datos):
+        """Registra el avance; se publica solo si pasó el intervalo mínimo"""
+        self.datos.update(datos)
+        ahora = time.perf_counter()
+        if self._ultima is None or ahora - self._ultima >= self.intervalo:
+            self._publicar(ahora)
+
+    def fase(self, nombre, **datos):
+        self.datos.update(datos, fase=nombre)
+        self._publicar(time.perf_counter())
+
+    def finalizar(self, estado='COMPLETADA', **datos):
+        self.datos.update(datos, estado=estado)
+        self._publicar(time.perf_counter())
+
+    def _publicar(self, ahora):
+        self._ultima = ahora
+        self.publicaciones += 1
+        self.datos['secuencia'] += 1
+        self.datos['actualizado'] = time.time()
+        cache.set(self.clave, dict(self.datos), CACHE_TIMEOUT)
+
+
+class ProgresoNulo:
+    """Progreso que no se publica (uso del motor fuera de una petición)"""
+
+    def actualizar(self, **datos):
+        pass
+
+    def fase(self, nombre, **datos):
+        pass
+
+    def finalizar(self, estado='COMPLETADA', **datos):
+        pass
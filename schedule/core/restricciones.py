@@ -0,0 +1,387 @@
+# schedule/core/restricciones.py
+"""
+Registro de restricciones del generador.
+
+Cada restricción se declara una sola vez como subclase de `Restriccion` y se
+registra con `@registrar`. Puede ser dura (descarta la opción) o blanda (la
+penaliza con su peso), según su valor por defecto o la configuración de la
+generación:
+
+    configuracion['restricciones'] = {
+        'max_sesiones_docente_dia': {'activa': True, 'maximo': 2},
+        'sesiones_dias_distintos': {'dura': True},
+    }
+
+Cada restricción declara en `parametros` los atributos ajustables y el campo
+DRF que los valida; `activa`, `dura` y `peso` son comunes a todas.
+
+Antes de la búsqueda el registro se compila en un `ConjuntoRestricciones`.
+Las reglas estáticas curso-aula quedan como máscaras de bits por curso y
+listas de aulas ya ordenadas. Las reglas que dependen del estado usan tablas
+de conteo que se actualizan de forma incremental. El motor y la detección de
+conflictos consultan el mismo conjunto compilado.
+
+Una restricción implementa solo los métodos que necesita:
+- admite_aula(curso, aula): compatibilidad estática (se compila a máscara)
+- admite_franja(curso, dia, bloque): depende de lo ya asignado
+- admite_docente(curso, docente, dia, bloque): depende de lo ya asignado
+- docentes_para(curso): conjunto cerrado de docentes admitidos (índice de candidatos)
+- ocupar(...) / reiniciar(): mantienen sus tablas de estado
+"""
+from collections import Counter
+
+from rest_framework import serializers
+
+REGISTRO = {}
+
+# Opciones que admite cualquier restricción
+OPCIONES_COMUNES = {
+    'activa': serializers.BooleanField(),
+    'dura': serializers.BooleanField(),
+    'peso': serializers.FloatField(min_value=0),
+}
+
+
+def registrar(clase):
+    REGISTRO[clase.codigo] = clase
+    return clase
+
+
+class Restriccion:
+    codigo = ''
+    descripcion = ''
+    # Tipo de ConflictoHorario con el que se registra una violación
+    tipo_conflicto = 'CURSO'
+    dura = True
+    activa = True
+    peso = 1
+    # Atributos ajustables desde la configuración: {nombre: campo DRF}
+    parametros = {}
+
+    def __init__(self, dura=None, peso=None, **parametros):
+        if dura is not None:
+            self.dura = bool(dura)
+        if peso is not None:
+            self.peso = peso
+        for nombre, valor in parametros.items():
+            if nombre not in self.parametros:
+                raise TypeError(f"{self.codigo}: parámetro desconocido '{nombre}'")
+            setattr(self, nombre, valor)
+
+    @classmethod
+    def opciones(cls):
+        """Campos DRF de todas las opciones configurables de la restricción"""
+        return {**OPCIONES_COMUNES, **cls.parametros}
+
+    def compilar(self, contexto):
+        """Precalcula tablas a partir de los cursos, aulas y docentes de la generación"""
+
+    def reiniciar(self):
+        """Vacía el estado antes de cada pasada"""
+
+    def admite_aula(self, curso, aula):
+        return True
+
+    def admite_franja(self, curso, dia, bloque):
+        return True
+
+    def admite_docente(self, curso, docente, dia, bloque):
+        return True
+
+    def ocupar(self, curso, docente, aula, dia, bloque):
+        pass
+
+    def docentes_para(self, curso):
+        """Ids de los únicos docentes que admite para el curso, o None si no lo acota"""
+        return None
+
+    def mensaje(self, curso, docente, aula, dia, bloque):
+        return f"{self.descripcion}: {curso.codigo} ({dia} {bloque})"
+
+
+def _implementa(restriccion, metodo):
+    return getattr(type(restriccion), metodo) is not getattr(Restriccion, metodo)
+
+
+# --- Restricciones disponibles ---
+
+@registrar
+class CapacidadAula(Restriccion):
+    codigo = 'capacidad'
+    descripcion = 'El aula debe tener capacidad para los estudiantes del curso'
+    tipo_conflicto = 'CAPACIDAD'
+
+    def admite_aula(self, curso, aula):
+        return aula.capacidad >= curso.capacidad_estimada
+
+    def mensaje(self, curso, docente, aula, dia, bloque):
+        return (f"El aula {aula.nombre} tiene capacidad {aula.capacidad} "
+                f"pero el curso requiere {curso.capacidad_estimada} estudiantes")
+
+
+@registrar
+class LaboratorioRequerido(Restriccion):
+    codigo = 'laboratorio'
+    descripcion = 'Los cursos con laboratorio requieren un laboratorio con proyector'
+    tipo_conflicto = 'EQUIPAMIENTO'
+
+    def admite_aula(self, curso, aula):
+        return not curso.requiere_laboratorio or (aula.tipo_aula == 'LABORATORIO' and aula.tiene_proyector)
+
+    def mensaje(self, curso, docente, aula, dia, bloque):
+        if aula.tipo_aula != 'LABORATORIO':
+            return (f"El curso {curso.codigo} requiere laboratorio "
+                    f"pero el aula {aula.nombre} no es un laboratorio")
+        return f"El curso {curso.codigo} requiere proyector pero el laboratorio {aula.nombre} no tiene"
+
+
+@registrar
+class DocenteHabilitado(Restriccion):
+    """Solo docentes habilitados para el curso (DocenteCurso); sin habilitaciones, cualquiera"""
+    codigo = 'docente_habilitado'
+    descripcion = 'El docente debe estar habilitado para dictar el curso'
+    tipo_conflicto = 'DOCENTE'
+
+    def compilar(self, contexto):
+        from horunap_api.catalogos import docentes_por_curso
+
+        self.habilitados = docentes_por_curso()
+
+    def docentes_para(self, curso):
+        return self.habilitados.get(curso.id)
+
+    def admite_docente(self, curso, docente, dia, bloque):
+        habilitados = self.habilitados.get(curso.id)
+        return habilitados is None or docente.id in habilitados
+
+    def mensaje(self, curso, docente, aula, dia, bloque):
+        return f"El docente {docente.username} no está habilitado para dictar {curso.codigo}"
+
+
+@registrar
+class NivelesSinSolape(Restriccion):
+    """Cursos obligatorios del mismo nivel de la malla (grafo de prerrequisitos) no se cruzan"""
+    codigo = 'niveles_sin_solape'
+    descripcion = 'Los cursos obligatorios de un mismo nivel no deben cruzarse'
+    activa = False
+    solo_obligatorios = True
+    parametros = {'solo_obligatorios': serializers.BooleanField()}
+
+    def compilar(self, contexto):
+        from academic.grafo import obtener_grafo
+
+        grafo = obtener_grafo()
+        self.nivel = {
+            curso.id: grafo.nivel(curso.id) for curso in contexto['cursos']
+            if not self.solo_obligatorios or curso.tipo == 'OBLIGATORIO'
+        }
+
+    def reiniciar(self):
+        self.ocupadas = Counter()
+
+    def _clave(self, curso, dia, bloque):
+        nivel = self.nivel.get(curso.id)
+        return None if nivel is None else (nivel, dia, bloque)
+
+    def admite_franja(self, curso, dia, bloque):
+        clave = self._clave(curso, dia, bloque)
+        return clave is None or self.ocupadas[clave] == 0
+
+    def ocupar(self, curso, docente, aula, dia, bloque):
+        clave = self._clave(curso, dia, bloque)
+        if clave is not None:
+            self.ocupadas[clave] += 1
+
+    def mensaje(self, curso, docente, aula, dia, bloque):
+        return (f"El curso {curso.codigo} se cruza con otro curso del nivel "
+                f"{self.nivel[curso.id]} el {dia} {bloque}")
+
+
+@registrar
+class MaxSesionesDocenteDia(Restriccion):
+    codigo = 'max_sesiones_docente_dia'
+    descripcion = 'Un docente no debe dictar más de `maximo` sesiones por día'
+    tipo_conflicto = 'DOCENTE'
+    activa = False
+    maximo = 3
+    parametros = {'maximo': serializers.IntegerField(min_value=1)}
+
+    def reiniciar(self):
+        self.sesiones = Counter()
+
+    def admite_docente(self, curso, docente, dia, bloque):
+        return self.sesiones[(docente.id, dia)] < self.maximo
+
+    def ocupar(self, curso, docente, aula, dia, bloque):
+        self.sesiones[(docente.id, dia)] += 1
+
+    def mensaje(self, curso, docente, aula, dia, bloque):
+        return f"El docente {docente.username} supera las {self.maximo} sesiones el {dia}"
+
+
+@registrar
+class MaxHorasDocenteSemana(Restriccion):
+    codigo = 'max_horas_docente_semana'
+    descripcion = 'Un docente no debe dictar más de `maximo` horas por semana'
+    tipo_conflicto = 'DOCENTE'
+    activa = False
+    maximo = 20
+    parametros = {'maximo': serializers.IntegerField(min_value=1)}
+
+    def reiniciar(self):
+        self.horas = Counter()
+
+    def admite_docente(self, curso, docente, dia, bloque):
+        return self.horas[docente.id] + curso.duracion_sesion <= self.maximo
+
+    def ocupar(self, curso, docente, aula, dia, bloque):
+        self.horas[docente.id] += curso.duracion_sesion
+
+    def mensaje(self, curso, docente, aula, dia, bloque):
+        return f"El docente {docente.username} supera las {self.maximo} horas semanales"
+
+
+@registrar
+class SesionesDiasDistintos(Restriccion):
+    codigo = 'sesiones_dias_distintos'
+    descripcion = 'Las sesiones de un curso deben caer en días distintos'
+    dura = False
+
+    def reiniciar(self):
+        self.dias = set()
+
+    def admite_franja(self, curso, dia, bloque):
+        return (curso.id, dia) not in self.dias
+
+    def ocupar(self, curso, docente, aula, dia, bloque):
+        self.dias.add((curso.id, dia))
+
+    def mensaje(self, curso, docente, aula, dia, bloque):
+        return f"El curso {curso.codigo} tiene más de una sesión el {dia}"
+
+
+# --- Conjunto compilado ---
+
+def restricciones_configuradas(configuracion=None):
+    """Instancia las restricciones activas aplicando la configuración de la generación"""
+    configuracion = configuracion or {}
+    restricciones = []
+    for codigo, clase in REGISTRO.items():
+        opciones = dict(configuracion.get(codigo) or {})
+        if not opciones.pop('activa', clase.activa):
+            continue
+        restricciones.append(clase(**opciones))
+    return restricciones
+
+
+class ConjuntoRestricciones:
+    def __init__(self, restricciones, cursos, aulas, docentes=()):
+        self.restricciones = list(restricciones)
+        contexto = {'cursos': cursos, 'aulas': aulas, 'docentes': docentes}
+        for restriccion in self.restricciones:
+            restriccion.compilar(contexto)
+
+        duras = [r for r in self.restricciones if r.dura]
+        self.blandas = [r for r in self.restricciones if not r.dura]
+        self._duras_franja = [r for r in duras if _implementa(r, 'admite_franja')]
+        self._duras_docente = [r for r in duras if _implementa(r, 'admite_docente')]
+        self._blandas_aula = [r for r in self.blandas if _implementa(r, 'admite_aula')]
+        self._blandas_franja = [r for r in self.blandas if _implementa(r, 'admite_franja')]
+        self._blandas_docente = [r for r in self.blandas if _implementa(r, 'admite_docente')]
+        self._con_estado = [r for r in self.restricciones if _implementa(r, 'ocupar')]
+        duras_aula = [r for r in duras if _implementa(r, 'admite_aula')]
+
+        # Compatibilidad curso-aula: un bit por aula, y la lista de aulas
+        # compatibles ordenada por cercanía de capacidad
+        self._indice_aula = {aula.id: i for i, aula in enumerate(aulas)}
+        self._mascaras = {}
+        self._aulas_por_curso = {}
+        for curso in cursos:
+            mascara = 0
+            compatibles = []
+            for i, aula in enumerate(aulas):
+                if all(r.admite_aula(curso, aula) for r in duras_aula):
+                    mascara |= 1 << i
+                    compatibles.append(aula)
+            compatibles.sort(key=lambda a: abs(a.capacidad - curso.capacidad_estimada))
+            self._mascaras[curso.id] = mascara
+            self._aulas_por_curso[curso.id] = compatibles
+
+        # Índice de docentes candidatos por curso (solo los cursos acotados)
+        self._docentes_por_curso = {}
+        duras_candidatos = [r for r in duras if _implementa(r, 'docentes_para')]
+        for curso in cursos:
+            for restriccion in duras_candidatos:
+                admitidos = restriccion.docentes_para(curso)
+                if admitidos is None:
+                    continue
+                previos = self._docentes_por_curso.get(curso.id)
+                self._docentes_por_curso[curso.id] = set(admitidos) if previos is None else previos & set(admitidos)
+
+        self.reiniciar()
+
+    @classmethod
+    def desde_configuracion(cls, configuracion, cursos, aulas, docentes=()):
+        return cls(restricciones_configuradas(configuracion), cursos, aulas, docentes)
+
+    def reiniciar(self):
+        for restriccion in self.restricciones:
+            restriccion.reiniciar()
+
+    @property
+    def con_estado(self):
+        """True si alguna restricción depende de lo ya asignado (requiere `ocupar`)"""
+        return bool(self._con_estado)
+
+    # --- Consultas del motor ---
+
+    def aulas_para(self, curso):
+        """Aulas que cumplen las restricciones duras estáticas, de mejor a peor ajuste"""
+        return self._aulas_por_curso.get(curso.id, ())
+
+    def docentes_para(self, curso):
+        """Ids de los docentes que las restricciones duras permiten para el curso, o None si cualquiera"""
+        return self._docentes_por_curso.get(curso.id)
+
+    def admite_aula(self, curso, aula):
+        indice = self._indice_aula.get(aula.id)
+        return indice is not None and bool(self._mascaras.get(curso.id, 0) >> indice & 1)
+
+    def franja_violada(self, curso, dia, bloque):
+        """Primera restricción dura de franja violada, o None"""
+        for restriccion in self._duras_franja:
+            if not restriccion.admite_franja(curso, dia, bloque):
+                return restriccion
+        return None
+
+    def admite_docente(self, curso, docente, dia, bloque):
+        return all(r.admite_docente(curso, docente, dia, bloque) for r in self._duras_docente)
+
+    def penalizacion(self, curso, docente, aula, dia, bloque):
+        """Suma de pesos de las restricciones blandas violadas"""
+        total = 0
+        for r in self._blandas_franja:
+            if not r.admite_franja(curso, dia, bloque):
+                total += r.peso
+        for r in self._blandas_docente:
+            if not r.admite_docente(curso, docente, dia, bloque):
+                total += r.peso
+        for r in self._blandas_aula:
+            if not r.admite_aula(curso, aula):
+                total += r.peso
+        return total
+
+    def ocupar(self, curso, docente, aula, dia, bloque):
+        for restriccion in self._con_estado:
+            restriccion.ocupar(curso, docente, aula, dia, bloque)
+
+    # --- Detección de conflictos ---
+
+    def violaciones(self, curso, docente, aula, dia, bloque):
+        """Todas las restricciones (duras y blandas) que violaría la asignación"""
+        return [
+            r for r in self.restricciones
+            if not (r.admite_aula(curso, aula) and
+                    r.admite_franja(curso, dia, bloque) and
+                    r.admite_docente(curso, docente, dia, bloque))
+        ]
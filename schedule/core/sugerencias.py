@@ -0,0 +1,145 @@
+# schedule/core/sugerencias.py
+"""
+Sugerencias de franjas alternativas para mover una asignación.
+
+La ocupación del horario se carga una vez en mapas de bits (un entero por
+docente, aula y curso, un bit por franja día × bloque); las franjas libres de
+un docente salen de `disponible & ~ocupado` sin recorrer asignaciones. Sobre
+esas franjas se aplican las restricciones registradas y se puntúa cada
+alternativa:
+
+    (penalización blanda, cambio de docente, preferencia del docente por el
+     curso (negada), carga del docente, ajuste del aula, cambio de día)
+
+Menor es mejor; la preferencia sale de las habilitaciones DocenteCurso. Sin
+configuración explícita se usan los días, bloques y restricciones de la
+última generación del horario, como el generador. Las
+aulas de cada curso ya vienen ordenadas por ajuste de capacidad, así que por
+cada (franja, docente) basta mirar las primeras K.
+"""
+import heapq
+from collections import Counter, defaultdict
+
+from academic.models import Curso
+from horunap_api.catalogos import aulas_activas, docentes_activos, docentes_por_curso
+from users.models import User
+from ..models import Asignacion
+from .disponibilidad import franjas_disponibles
+from .ocupacion import aulas_ocupadas_por_otros
+from .restricciones import ConjuntoRestricciones
+
+
+def _bits(mascara):
+    """Índices de los bits encendidos"""
+    while mascara:
+        bajo = mascara & -mascara
+        yield bajo.bit_length() - 1
+        mascara ^= bajo
+
+
+class SugeridorAlternativas:
+    def __init__(self, asignacion, configuracion=None):
+        from .algorithm import GeneradorHorarios
+
+        if configuracion is None:
+            configuracion = GeneradorHorarios.configuracion_guardada(asignacion.horario)
+        self.asignacion = asignacion
+        self.dias = list(configuracion.get('dias_semana') or GeneradorHorarios.DIAS_SEMANA)
+        self.bloques = list(configuracion.get('bloques_horarios') or GeneradorHorarios.BLOQUES_HORARIOS)
+        self.config_restricciones = dict(configuracion.get('restricciones') or {})
+        self.franjas = [(dia, bloque) for dia in self.dias for bloque in self.bloques]
+        self.indice = {franja: i for i, franja in enumerate(self.franjas)}
+
+    def sugerir(self, k=5, cambiar_docente=False):
+        asignacion = self.asignacion
+        curso = asignacion.curso
+
+        docentes = docentes_activos() if cambiar_docente else [asignacion.docente]
+        aulas = aulas_activas()
+        otras = [
+            fila for fila in Asignacion.objects.filter(horario_id=asignacion.horario_id)
+            .exclude(id=asignacion.id)
+            .values_list('curso_id', 'docente_id', 'aula_id', 'dia_semana', 'bloque_horario')
+        ]
+
+        # Mapas de bits de ocupación y disponibilidad
+        ocupado_docente, ocupado_aula, ocupado_curso = defaultdict(int), defaultdict(int), 0
+        carga = Counter()
+        for curso_id, docente_id, aula_id, dia, bloque in otras:
+            carga[docente_id] += 1
+            bit = self.indice.get((dia, bloque))
+            if bit is None:
+                continue
+            ocupado_docente[docente_id] |= 1 << bit
+            ocupado_aula[aula_id] |= 1 << bit
+            if curso_id == curso.id:
+                ocupado_curso |= 1 << bit
+        # Aulas compartidas con los demás horarios publicados del semestre
+        for aula_id, dia, bloque in aulas_ocupadas_por_otros(asignacion.horario):
+            bit = self.indice.get((dia, bloque))
+            if bit is not None:
+                ocupado_aula[aula_id] |= 1 << bit
+
+        disponible = defaultdict(int)
+        for docente_id, dia, bloque in franjas_disponibles([d.id for d in docentes], self.dias, self.bloques):
+            disponible[docente_id] |= 1 << self.indice[(dia, bloque)]
+
+        # Restricciones con el estado del resto del horario
+        cursos = Curso.objects.in_bulk({fila[0] for fila in otras} - {curso.id})
+        cursos[curso.id] = curso
+        aulas_por_id = {aula.id: aula for aula in aulas}
+        restricciones = ConjuntoRestricciones.desde_configuracion(
+            self.config_restricciones, list(cursos.values()), aulas, docentes
+        )
+        if restricciones.con_estado:
+            usuarios = User.objects.only('id', 'username').in_bulk({fila[1] for fila in otras})
+            for curso_id, docente_id, aula_id, dia, bloque in otras:
+                if aula_id in aulas_por_id:
+                    restricciones.ocupar(
+                        cursos[curso_id], usuarios[docente_id], aulas_por_id[aula_id], dia, bloque
+                    )
+
+        preferencias = docentes_por_curso().get(curso.id, {})
+        actual = (asignacion.dia_semana, asignacion.bloque_horario, asignacion.aula_id, asignacion.docente_id)
+        aulas_curso = restricciones.aulas_para(curso)
+        candidatas = []
+        for docente in docentes:
+            libres = disponible[docente.id] & ~ocupado_docente[docente.id] & ~ocupado_curso
+            for bit in _bits(libres):
+                dia, bloque = self.franjas[bit]
+                if restricciones.franja_violada(curso, dia, bloque):
+                    continue
+                if not restricciones.admite_docente(curso, docente, dia, bloque):
+                    continue
+                vistas = 0
+                for aula in aulas_curso:
+                    if ocupado_aula[aula.id] >> bit & 1 or (dia, bloque, aula.id, docente.id) == actual:
+                        continue
+                    puntaje = (
+                        restricciones.penalizacion(curso, docente, aula, dia, bloque),
+                        0 if docente.id == asignacion.docente_id else 1,
+                        -preferencias.get(docente.id, 0),
+                        carga[docente.id],
+                        abs(aula.capacidad - curso.capacidad_estimada),
+                        0 if dia == asignacion.dia_semana else 1,
+                    )
+                    candidatas.append((puntaje, bit, aula.id, docente.id))
+                    vistas += 1
+                    if vistas >= k:
+                        break
+
+        docentes_por_id = {docente.id: docente for docente in docentes}
+        sugerencias = []
+        for puntaje, bit, aula_id, docente_id in heapq.nsmallest(k, candidatas):
+            dia, bloque = self.franjas[bit]
+            aula, docente = aulas_por_id[aula_id], docentes_por_id[docente_id]
+            sugerencias.append({
+                'dia_semana': dia,
+                'bloque_horario': bloque,
+                'aula': aula.id,
+                'aula_nombre': aula.nombre,
+                'docente': docente.id,
+                'docente_nombre': docente.get_full_name() or docente.username,
+                'puntaje': list(puntaje),
+            })
+        return sugerencias
@@ -0,0 +1,161 @@
+# schedule/core/validacion.py
+"""
+Validación "what-if" de cambios manuales sobre un horario.
+
+Un lote de cambios (movimientos de asignaciones existentes o asignaciones
+nuevas) se comprueba contra una única instantánea en memoria del horario:
+una consulta por tabla, sin importar el tamaño del lote. Las asignaciones que
+el lote mueve se retiran primero de la instantánea y luego los cambios se
+colocan en orden, de modo que cada veredicto considera los cambios válidos
+anteriores del mismo lote (p. ej. un intercambio de franjas es válido). Un
+movimiento rechazado devuelve la asignación a su posición original.
+
+Se comprueban todas las restricciones duras: disponibilidad del docente,
+choques de docente, aula y curso, aulas ocupadas por otros horarios
+publicados del semestre y las restricciones registradas (capacidad,
+laboratorio, ...). Las blandas se devuelven como advertencias.
+"""
+from academic.models import Curso, Aula
+from users.models import User
+from ..models import Asignacion, Horario
+from .disponibilidad import franjas_disponibles
+from .ocupacion import aulas_ocupadas_por_otros
+from .restricciones import ConjuntoRestricciones
+
+CAMPOS_CAMBIO = ('curso', 'docente', 'aula', 'dia_semana', 'bloque_horario')
+
+DIAS_VALIDOS = {dia for dia, _ in Horario.DIA_SEMANA}
+BLOQUES_VALIDOS = {bloque for bloque, _ in Horario.BLOQUES_HORARIOS}
+
+
+class ValidadorCambios:
+    """
+    Uso:
+        resultado = ValidadorCambios(horario).validar([
+            {'asignacion': 12, 'dia_semana': 'MARTES', 'bloque_horario': '10:00-12:00'},
+            {'curso': 3, 'docente': 7, 'aula': 2, 'dia_semana': 'LUNES', 'bloque_horario': '08:00-10:00'},
+        ])
+    """
+
+    def __init__(self, horario, configuracion=None):
+        self.horario = horario
+        self.config_restricciones = dict((configuracion or {}).get('restricciones') or {})
+
+    def validar(self, cambios):
+        self._cargar(cambios)
+        resultados = []
+        for indice, cambio in enumerate(cambios):
+            resultado = self._validar_cambio(indice, cambio)
+            original = self.asignaciones.get(cambio.get('asignacion'))
+            if not resultado['valido'] and original is not None:
+                # La asignación no se mueve: sigue ocupando su franja
+                self._ocupar(original)
+            resultados.append(resultado)
+        return {
+            'valido': all(r['valido'] for r in resultados),
+            'resultados': resultados,
+        }
+
+    # --- Instantánea ---
+
+    def _cargar(self, cambios):
+        existentes = list(Asignacion.objects.filter(horario=self.horario).values_list(
+            'id', 'curso_id', 'docente_id', 'aula_id', 'dia_semana', 'bloque_horario', 'version'
+        ))
+        self.asignaciones = {
+            fila[0]: dict(zip(('id',) + CAMPOS_CAMBIO + ('version',), fila)) for fila in existentes
+        }
+
+        movidas = {c.get('asignacion') for c in cambios if c.get('asignacion')}
+        propuestas = [self.completar(c) for c in cambios]
+        ids = {campo: set() for campo in ('curso', 'docente', 'aula')}
+        for fila in list(self.asignaciones.values()) + propuestas:
+            for campo in ids:
+                if fila.get(campo):
+                    ids[campo].add(fila[campo])
+
+        self.cursos = Curso.objects.in_bulk(ids['curso'])
+        self.aulas = Aula.objects.in_bulk(ids['aula'])
+        self.docentes = User.objects.only('id', 'username', 'rol', 'is_active').in_bulk(ids['docente'])
+
+        dias = {p['dia_semana'] for p in propuestas} & DIAS_VALIDOS
+        bloques = {p['bloque_horario'] for p in propuestas} & BLOQUES_VALIDOS
+        docentes_propuestos = {p['docente'] for p in propuestas if p['docente']}
+        self.disponibilidad = franjas_disponibles(docentes_propuestos, dias, bloques) if dias and bloques else set()
+
+        self.restricciones = ConjuntoRestricciones.desde_configuracion(
+            self.config_restricciones, list(self.cursos.values()), list(self.aulas.values())
+        )
+        aulas_propuestas = {p['aula'] for p in propuestas if p['aula']}
+        self.aulas_externas = aulas_ocupadas_por_otros(self.horario, aulas_propuestas) if aulas_propuestas else set()
+        self.ocupacion_docente = set()
+        self.ocupacion_aula = set()
+        self.ocupacion_curso = set()
+        for asignacion in self.asignaciones.values():
+            if asignacion['id'] not in movidas:
+                self._ocupar(asignacion)
+
+    def completar(self, cambio):
+        """Un movimiento hereda de la asignación original los campos que no cambia"""
+        original = self.asignaciones.get(cambio.get('asignacion')) or {}
+        return {campo: cambio.get(campo) or original.get(campo) for campo in CAMPOS_CAMBIO}
+
+    def _objetos(self, propuesta):
+        return (self.cursos[propuesta['curso']], self.docentes[propuesta['docente']],
+                self.aulas[propuesta['aula']], propuesta['dia_semana'], propuesta['bloque_horario'])
+
+    def _ocupar(self, propuesta):
+        dia, bloque = propuesta['dia_semana'], propuesta['bloque_horario']
+        self.ocupacion_docente.add((propuesta['docente'], dia, bloque))
+        self.ocupacion_aula.add((propuesta['aula'], dia, bloque))
+        self.ocupacion_curso.add((propuesta['curso'], dia, bloque))
+        if propuesta['curso'] in self.cursos and propuesta['aula'] in self.aulas:
+            self.restricciones.ocupar(*self._objetos(propuesta))
+
+    # --- Veredictos ---
+
+    def _validar_cambio(self, indice, cambio):
+        resultado = {'indice': indice, 'asignacion': cambio.get('asignacion'),
+                     'valido': False, 'errores': [], 'advertencias': []}
+        errores = resultado['errores']
+        agregar = lambda lista, codigo, mensaje: lista.append({'codigo': codigo, 'mensaje': mensaje})
+
+        if cambio.get('asignacion') and cambio['asignacion'] not in self.asignaciones:
+            agregar(errores, 'asignacion_inexistente', 'La asignación no pertenece a este horario')
+            return resultado
+
+        propuesta = self.completar(cambio)
+        for campo, catalogo in (('curso', self.cursos), ('docente', self.docentes), ('aula', self.aulas)):
+            if propuesta[campo] not in catalogo:
+                agregar(errores, f'{campo}_inexistente', f'No existe el {campo} indicado')
+        if propuesta['dia_semana'] not in DIAS_VALIDOS:
+            agregar(errores, 'dia_invalido', 'Día no válido')
+        if propuesta['bloque_horario'] not in BLOQUES_VALIDOS:
+            agregar(errores, 'bloque_invalido', 'Bloque horario no válido')
+        if errores:
+            return resultado
+
+        curso, docente, aula, dia, bloque = opcion = self._objetos(propuesta)
+
+        if (docente.id, dia, bloque) not in self.disponibilidad:
+            agregar(errores, 'docente_no_disponible',
+                    f'{docente.username} no registró disponibilidad el {dia} {bloque}')
+        if (docente.id, dia, bloque) in self.ocupacion_docente:
+            agregar(errores, 'docente_ocupado', 'El docente ya tiene una asignación en este horario')
+        if (aula.id, dia, bloque) in self.ocupacion_aula:
+            agregar(errores, 'aula_ocupada', 'El aula ya está ocupada en este horario')
+        if (aula.id, dia, bloque) in self.aulas_externas:
+            agregar(errores, 'aula_ocupada_otro_horario',
+                    'El aula está ocupada por otro horario publicado del semestre')
+        if (curso.id, dia, bloque) in self.ocupacion_curso:
+            agregar(errores, 'curso_ocupado', 'El curso ya tiene una sesión en este horario')
+
+        for restriccion in self.restricciones.violaciones(*opcion):
+            agregar(errores if restriccion.dura else resultado['advertencias'],
+                    restriccion.codigo, restriccion.mensaje(*opcion))
+
+        if not errores:
+            resultado['valido'] = True
+            # Los cambios siguientes del lote ven este cambio aplicado
+            self._ocupar(propuesta)
+        return resultado
@@ -0,0 +1,41 @@
+# schedule/estadisticas.py
+"""
+Resumen de indicadores para la portada de administración: catálogos y
+conflictos, cada bloque calculado con agregados condicionales en una sola
+consulta y cacheado bajo la versión de su catálogo. Con la caché vigente el
+resumen completo no consulta la base de datos.
+"""
+from django.db.models import Count, Q
+
+from academic.estadisticas import estadisticas_cursos, estadisticas_aulas, estadisticas_docentes
+from horunap_api.catalogos import obtener
+from .models import ConflictoHorario
+
+
+def _calcular_conflictos():
+    por_tipo = list(
+        ConflictoHorario.objects.values('tipo_conflicto')
+        .annotate(total=Count('id'), resueltos=Count('id', filter=Q(resuelto=True)))
+        .order_by('tipo_conflicto')
+    )
+    total = sum(fila['total'] for fila in por_tipo)
+    resueltos = sum(fila['resueltos'] for fila in por_tipo)
+    return {
+        'total_conflictos': total,
+        'conflictos_resueltos': resueltos,
+        'conflictos_pendientes': total - resueltos,
+        'por_tipo': por_tipo,
+    }
+
+
+def estadisticas_conflictos():
+    return obtener(('conflictos',), 'estadisticas:conflictos', _calcular_conflictos)
+
+
+def resumen_general():
+    return {
+        'cursos': estadisticas_cursos(),
+        'aulas': estadisticas_aulas(),
+        'docentes': estadisticas_docentes(),
+        'conflictos': estadisticas_conflictos(),
+    }
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0003_horariopersonalizadodocente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EjecucionGeneracion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('GENERACION', 'Generación'), ('RESOLUCION', 'Resolución de Conflictos')], default='GENERACION', max_length=20)),
+                ('estado', models.CharField(choices=[('COMPLETADA', 'Completada'), ('ERROR', 'Error')], default='COMPLETADA', max_length=20)),
+                ('fecha_inicio', models.DateTimeField(verbose_name='Fecha de Inicio')),
+                ('duracion_total', models.FloatField(default=0, verbose_name='Duración Total (segundos)')),
+                ('sesiones_asignadas', models.IntegerField(default=0, verbose_name='Sesiones Asignadas')),
+                ('sesiones_fallidas', models.IntegerField(default=0, verbose_name='Sesiones Fallidas')),
+                ('total_consultas', models.IntegerField(default=0, verbose_name='Consultas SQL')),
+                ('memoria_pico_kb', models.IntegerField(blank=True, null=True, verbose_name='Pico de Memoria (KB)')),
+                ('metricas', models.JSONField(default=dict, verbose_name='Métricas Detalladas')),
+                ('horario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ejecuciones', to='schedule.horario')),
+            ],
+            options={
+                'verbose_name': 'Ejecución del Generador',
+                'verbose_name_plural': 'Ejecuciones del Generador',
+                'ordering': ['-fecha_inicio'],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0004_ejecuciongeneracion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolucionCacheada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('huella', models.CharField(max_length=64, unique=True, verbose_name='Huella de Entradas')),
+                ('asignaciones', models.JSONField(default=list, verbose_name='Asignaciones')),
+                ('num_asignaciones', models.IntegerField(default=0, verbose_name='Número de Asignaciones')),
+                ('tamano_bytes', models.IntegerField(default=0, verbose_name='Tamaño (bytes)')),
+                ('usos', models.IntegerField(default=0, verbose_name='Veces Reutilizada')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('fecha_ultimo_uso', models.DateTimeField(db_index=True, verbose_name='Último Uso')),
+            ],
+            options={
+                'verbose_name': 'Solución Cacheada',
+                'verbose_name_plural': 'Soluciones Cacheadas',
+                'ordering': ['-fecha_ultimo_uso'],
+            },
+        ),
+    ]
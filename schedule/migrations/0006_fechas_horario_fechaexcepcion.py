@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0005_solucioncacheada'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='horario',
+            name='fecha_fin',
+            field=models.DateField(blank=True, null=True, verbose_name='Fin de Clases'),
+        ),
+        migrations.AddField(
+            model_name='horario',
+            name='fecha_inicio',
+            field=models.DateField(blank=True, null=True, verbose_name='Inicio de Clases'),
+        ),
+        migrations.CreateModel(
+            name='FechaExcepcion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('descripcion', models.CharField(blank=True, max_length=200, verbose_name='Descripción')),
+                ('horario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='excepciones', to='schedule.horario', verbose_name='Horario (vacío = todos)')),
+            ],
+            options={
+                'verbose_name': 'Fecha de Excepción',
+                'verbose_name_plural': 'Fechas de Excepción (Feriados)',
+                'ordering': ['fecha'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0006_fechas_horario_fechaexcepcion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asignacion',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, verbose_name='Versión'),
+        ),
+    ]
@@ -34,6 +34,8 @@ class Horario(models.Model):
     fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
     fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name="Fecha de Actualización")
     estado = models.CharField(max_length=20, choices=ESTADO_HORARIO, default='BORRADOR')
+    fecha_inicio = models.DateField(null=True, blank=True, verbose_name="Inicio de Clases")
+    fecha_fin = models.DateField(null=True, blank=True, verbose_name="Fin de Clases")
     creado_por = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -48,6 +50,29 @@ class Horario(models.Model):
     def __str__(self):
         return f"{self.nombre} - {self.semestre} ({self.estado})"
 
+class FechaExcepcion(models.Model):
+    """
+    Feriados o fechas sin clases. Sin horario aplica a todos los horarios.
+    """
+    fecha = models.DateField(verbose_name="Fecha")
+    descripcion = models.CharField(max_length=200, blank=True, verbose_name="Descripción")
+    horario = models.ForeignKey(
+        Horario,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='excepciones',
+        verbose_name="Horario (vacío = todos)"
+    )
+
+    class Meta:
+        verbose_name = "Fecha de Excepción"
+        verbose_name_plural = "Fechas de Excepción (Feriados)"
+        ordering = ['fecha']
+
+    def __str__(self):
+        return f"{self.fecha} - {self.descripcion}" if self.descripcion else str(self.fecha)
+
 class Asignacion(models.Model):
     horario = models.ForeignKey(Horario, on_delete=models.CASCADE, related_name='asignaciones')
     curso = models.ForeignKey(Curso, on_delete=models.CASCADE, verbose_name="Curso")
@@ -62,6 +87,8 @@ class Asignacion(models.Model):
     bloque_horario = models.CharField(max_length=20, choices=Horario.BLOQUES_HORARIOS, verbose_name="Bloque Horario")
     fecha_asignacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Asignación")
     activa = models.BooleanField(default=True, verbose_name="Asignación Activa")
+    # Control de concurrencia optimista: se incrementa en cada modificación
+    version = models.PositiveIntegerField(default=1, editable=False, verbose_name="Versión")
 
     class Meta:
         verbose_name = "Asignación"
@@ -76,6 +103,14 @@ class Asignacion(models.Model):
     def __str__(self):
         return f"{self.curso.codigo} - {self.docente.username} - {self.dia_semana} {self.bloque_horario}"
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'version' not in update_fields:
+                kwargs['update_fields'] = [*update_fields, 'version']
+        super().save(*args, **kwargs)
+
 class ConflictoHorario(models.Model):
     TIPO_CONFLICTO = [
         ('DOCENTE', 'Conflicto de Docente'),
@@ -182,4 +217,60 @@ class HorarioPersonalizadoDocente(models.Model):
         inicio = datetime.combine(datetime.today(), self.hora_inicio)
         fin = datetime.combine(datetime.today(), self.hora_fin)
         diferencia = fin - inicio
-        return diferencia.total_seconds() / 3600  # Convertir a horas
\ No newline at end of file
+        return diferencia.total_seconds() / 3600  # Convertir a horas
+
+class EjecucionGeneracion(models.Model):
+    """
+    Métricas persistidas de una ejecución del motor (generación o resolución)
+    """
+    TIPO_EJECUCION = [
+        ('GENERACION', 'Generación'),
+        ('RESOLUCION', 'Resolución de Conflictos'),
+    ]
+
+    ESTADO_EJECUCION = [
+        ('COMPLETADA', 'Completada'),
+        ('ERROR', 'Error'),
+    ]
+
+    horario = models.ForeignKey(Horario, on_delete=models.CASCADE, related_name='ejecuciones')
+    tipo = models.CharField(max_length=20, choices=TIPO_EJECUCION, default='GENERACION')
+    estado = models.CharField(max_length=20, choices=ESTADO_EJECUCION, default='COMPLETADA')
+    fecha_inicio = models.DateTimeField(verbose_name="Fecha de Inicio")
+    duracion_total = models.FloatField(default=0, verbose_name="Duración Total (segundos)")
+    sesiones_asignadas = models.IntegerField(default=0, verbose_name="Sesiones Asignadas")
+    sesiones_fallidas = models.IntegerField(default=0, verbose_name="Sesiones Fallidas")
+    total_consultas = models.IntegerField(default=0, verbose_name="Consultas SQL")
+    memoria_pico_kb = models.IntegerField(null=True, blank=True, verbose_name="Pico de Memoria (KB)")
+    metricas = models.JSONField(default=dict, verbose_name="Métricas Detalladas")
+
+    class Meta:
+        verbose_name = "Ejecución del Generador"
+        verbose_name_plural = "Ejecuciones del Generador"
+        ordering = ['-fecha_inicio']
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} - {self.horario.nombre} ({self.fecha_inicio:%Y-%m-%d %H:%M})"
+
+
+class SolucionCacheada(models.Model):
+    """
+    Resultado de una generación guardado por la huella de sus entradas.
+    Las asignaciones se guardan como filas compactas
+    [curso_id, docente_id, aula_id, dia_semana, bloque_horario].
+    """
+    huella = models.CharField(max_length=64, unique=True, verbose_name="Huella de Entradas")
+    asignaciones = models.JSONField(default=list, verbose_name="Asignaciones")
+    num_asignaciones = models.IntegerField(default=0, verbose_name="Número de Asignaciones")
+    tamano_bytes = models.IntegerField(default=0, verbose_name="Tamaño (bytes)")
+    usos = models.IntegerField(default=0, verbose_name="Veces Reutilizada")
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
+    fecha_ultimo_uso = models.DateTimeField(db_index=True, verbose_name="Último Uso")
+
+    class Meta:
+        verbose_name = "Solución Cacheada"
+        verbose_name_plural = "Soluciones Cacheadas"
+        ordering = ['-fecha_ultimo_uso']
+
+    def __str__(self):
+        return f"{self.huella[:12]} ({self.num_asignaciones} asignaciones)"
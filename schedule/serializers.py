@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Horario, Asignacion, ConflictoHorario, DisponibilidadDocente
+from .models import Horario, Asignacion, ConflictoHorario, DisponibilidadDocente, EjecucionGeneracion
 from academic.serializers import CursoSerializer, AulaSerializer
 from users.serializers import UserSerializer
 
@@ -13,7 +13,7 @@ class HorarioSerializer(serializers.ModelSerializer):
         model = Horario
         fields = [
             'id', 'nombre', 'semestre', 'estado', 'estado_display',
-            'fecha_creacion', 'fecha_actualizacion', 'creado_por',
+            'fecha_inicio', 'fecha_fin', 'fecha_creacion', 'fecha_actualizacion', 'creado_por',
             'creado_por_nombre', 'total_asignaciones', 'total_conflictos'
         ]
         read_only_fields = ['fecha_creacion', 'fecha_actualizacion', 'creado_por']
@@ -36,7 +36,7 @@ class AsignacionSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'horario', 'curso', 'curso_info', 'docente', 'docente_info',
             'aula', 'aula_info', 'dia_semana', 'dia_display', 'bloque_horario',
-            'bloque_display', 'fecha_asignacion', 'activa'
+            'bloque_display', 'fecha_asignacion', 'activa', 'version'
         ]
 
 class AsignacionCreateSerializer(serializers.ModelSerializer):
@@ -125,6 +125,54 @@ class DisponibilidadMasivaSerializer(serializers.Serializer):
         except User.DoesNotExist:
             raise serializers.ValidationError("Docente no encontrado")
 
+class ConfiguracionGeneracionSerializer(serializers.Serializer):
+    """
+    Configuración que acepta el generador. Los valores omitidos toman los
+    valores por defecto de GeneradorHorarios.
+    """
+    dias_semana = serializers.ListField(
+        child=serializers.ChoiceField(choices=Horario.DIA_SEMANA),
+        allow_empty=False, required=False
+    )
+    bloques_horarios = serializers.ListField(
+        child=serializers.ChoiceField(choices=Horario.BLOQUES_HORARIOS),
+        allow_empty=False, required=False
+    )
+    max_intentos_por_curso = serializers.IntegerField(min_value=1, max_value=100000, required=False)
+    # Presupuesto de tiempo: al vencer se devuelve la mejor solución parcial
+    tiempo_limite_segundos = serializers.FloatField(min_value=0.1, max_value=8 * 3600, required=False)
+    # Ajustes por restricción registrada: {"codigo": {"activa": bool, "dura": bool, "peso": n, ...}}
+    restricciones = serializers.DictField(child=serializers.DictField(), required=False)
+
+    def validate_restricciones(self, value):
+        from .core.restricciones import REGISTRO
+
+        errores = {}
+        validadas = {}
+        for codigo, opciones in value.items():
+            clase = REGISTRO.get(codigo)
+            if clase is None:
+                errores[codigo] = 'Restricción desconocida'
+                continue
+            # Cada opción se valida con el campo que declara la restricción
+            campos = clase.opciones()
+            validadas[codigo] = {}
+            errores_opciones = {}
+            for opcion, valor in opciones.items():
+                campo = campos.get(opcion)
+                if campo is None:
+                    errores_opciones[opcion] = 'Opción desconocida'
+                    continue
+                try:
+                    validadas[codigo][opcion] = campo.run_validation(valor)
+                except serializers.ValidationError as error:
+                    errores_opciones[opcion] = error.detail
+            if errores_opciones:
+                errores[codigo] = errores_opciones
+        if errores:
+            raise serializers.ValidationError(errores)
+        return validadas
+
 class GenerarHorarioSerializer(serializers.Serializer):
     """Serializer para la generación de horarios"""
     nombre = serializers.CharField(max_length=100)
@@ -132,21 +180,100 @@ class GenerarHorarioSerializer(serializers.Serializer):
     configuracion = serializers.JSONField(default=dict)
 
     def validate_configuracion(self, value):
-        configuraciones_validas = {
-            'dias_semana': ['LUNES', 'MARTES', 'MIERCOLES', 'JUEVES', 'VIERNES'],
-            'bloques_horarios': ['08:00-10:00', '10:00-12:00', '14:00-16:00', '16:00-18:00'],
-            'max_intentos_por_curso': 1000
-        }
-
-        # Validar que las configuraciones sean correctas
-        if 'dias_semana' in value:
-            dias_validos = ['LUNES', 'MARTES', 'MIERCOLES', 'JUEVES', 'VIERNES', 'SABADO']
-            for dia in value['dias_semana']:
-                if dia not in dias_validos:
-                    raise serializers.ValidationError(f"Día no válido: {dia}")
+        serializer = ConfiguracionGeneracionSerializer(data=value)
+        if not serializer.is_valid():
+            raise serializers.ValidationError(serializer.errors)
+        return serializer.validated_data
+
+class CambioAsignacionSerializer(serializers.Serializer):
+    """
+    Un cambio propuesto: con `asignacion` es un movimiento (los campos omitidos
+    conservan su valor); sin ella es una asignación nueva. Los ids se
+    resuelven en bloque al validar, no aquí.
+    """
+    asignacion = serializers.IntegerField(required=False)
+    curso = serializers.IntegerField(required=False)
+    docente = serializers.IntegerField(required=False)
+    aula = serializers.IntegerField(required=False)
+    dia_semana = serializers.ChoiceField(choices=Horario.DIA_SEMANA, required=False)
+    bloque_horario = serializers.ChoiceField(choices=Horario.BLOQUES_HORARIOS, required=False)
+
+    def validate(self, data):
+        if 'asignacion' not in data:
+            faltantes = [c for c in ('curso', 'docente', 'aula', 'dia_semana', 'bloque_horario') if c not in data]
+            if faltantes:
+                raise serializers.ValidationError(
+                    f"Una asignación nueva requiere: {', '.join(faltantes)}"
+                )
+        return data
+
+class ActualizarAsignacionSerializer(CambioAsignacionSerializer):
+    asignacion = serializers.IntegerField()
+    # Opcional: si se envía, la actualización solo se aplica sobre esa versión
+    version = serializers.IntegerField(min_value=1, required=False)
+
+class CrearAsignacionSerializer(CambioAsignacionSerializer):
+    activa = serializers.BooleanField(default=True)
+
+    def validate(self, data):
+        if 'asignacion' in data:
+            raise serializers.ValidationError('Una asignación nueva no lleva `asignacion`')
+        return super().validate(data)
 
+class ActivaAsignacionSerializer(serializers.Serializer):
+    asignacion = serializers.IntegerField()
+    version = serializers.IntegerField(min_value=1, required=False)
+    # Omitido: alterna el estado actual
+    activa = serializers.BooleanField(required=False, allow_null=True, default=None)
+
+class LoteAsignacionesSerializer(serializers.Serializer):
+    """Altas, actualizaciones y cambios de `activa` de un horario en una sola transacción"""
+    horario = serializers.IntegerField()
+    crear = CrearAsignacionSerializer(many=True, required=False, default=list)
+    actualizar = ActualizarAsignacionSerializer(many=True, required=False, default=list)
+    activa = ActivaAsignacionSerializer(many=True, required=False, default=list)
+
+    def validate(self, data):
+        if not (data['crear'] or data['actualizar'] or data['activa']):
+            raise serializers.ValidationError('El lote está vacío')
+        return data
+
+class ValidarCambiosSerializer(serializers.Serializer):
+    """Lote de cambios para validar contra el horario (what-if)"""
+    cambios = CambioAsignacionSerializer(many=True, allow_empty=False)
+    restricciones = serializers.DictField(child=serializers.DictField(), required=False)
+
+    def validate_restricciones(self, value):
+        return ConfiguracionGeneracionSerializer().validate_restricciones(value)
+
+class MoverAsignacionSerializer(serializers.Serializer):
+    """Nueva posición de una asignación; `version` es la que el cliente leyó"""
+    version = serializers.IntegerField(min_value=1)
+    dia_semana = serializers.ChoiceField(choices=Horario.DIA_SEMANA, required=False)
+    bloque_horario = serializers.ChoiceField(choices=Horario.BLOQUES_HORARIOS, required=False)
+    aula = serializers.IntegerField(required=False)
+    docente = serializers.IntegerField(required=False)
+
+class VersionAsignacionSerializer(serializers.Serializer):
+    asignacion = serializers.IntegerField()
+    version = serializers.IntegerField(min_value=1)
+
+class IntercambiarAsignacionesSerializer(serializers.Serializer):
+    asignaciones = VersionAsignacionSerializer(many=True)
+    incluir_aula = serializers.BooleanField(default=True)
+
+    def validate_asignaciones(self, value):
+        if len(value) != 2 or value[0]['asignacion'] == value[1]['asignacion']:
+            raise serializers.ValidationError('Se requieren exactamente dos asignaciones distintas')
         return value
 
+class ClonarHorarioSerializer(serializers.Serializer):
+    """Parámetros para clonar un horario en una variante"""
+    nombre = serializers.CharField(max_length=100, required=False)
+    semestre = serializers.CharField(max_length=20, required=False)
+    incluir_conflictos = serializers.BooleanField(default=False)
+    excluir_aulas = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
 class EstadisticasHorarioSerializer(serializers.Serializer):
     """Serializer para estadísticas del horario"""
     total_asignaciones = serializers.IntegerField()
@@ -155,4 +282,17 @@ class EstadisticasHorarioSerializer(serializers.Serializer):
     conflictos_resueltos = serializers.IntegerField()
     porcentaje_ocupacion = serializers.FloatField()
     aulas_utilizadas = serializers.IntegerField()
-    docentes_asignados = serializers.IntegerField()
\ No newline at end of file
+    docentes_asignados = serializers.IntegerField()
+
+class EjecucionGeneracionSerializer(serializers.ModelSerializer):
+    """Serializer para las métricas de una ejecución del motor"""
+    tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
+
+    class Meta:
+        model = EjecucionGeneracion
+        fields = [
+            'id', 'horario', 'tipo', 'tipo_display', 'estado', 'fecha_inicio',
+            'duracion_total', 'sesiones_asignadas', 'sesiones_fallidas',
+            'total_consultas', 'memoria_pico_kb', 'metricas'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,24 @@
+# schedule/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from horunap_api.catalogos import invalidar_catalogos
+from .calendario import invalidar_horarios
+from .models import Horario, Asignacion, ConflictoHorario, FechaExcepcion
+
+
+@receiver(post_save, sender=Horario)
+@receiver(post_delete, sender=Horario)
+@receiver(post_save, sender=Asignacion)
+@receiver(post_delete, sender=Asignacion)
+@receiver(post_save, sender=FechaExcepcion)
+@receiver(post_delete, sender=FechaExcepcion)
+def horarios_modificados(sender, **kwargs):
+    """Cualquier cambio en horarios o asignaciones invalida los feeds cacheados"""
+    invalidar_horarios()
+
+
+@receiver(post_save, sender=ConflictoHorario)
+@receiver(post_delete, sender=ConflictoHorario)
+def conflictos_modificados(sender, **kwargs):
+    invalidar_catalogos('conflictos')
@@ -1,9 +1,14 @@
-from django.test import TestCase
+import datetime
+import json
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
-from .models import Horario, Asignacion, ConflictoHorario
+from .models import (
+    Horario, Asignacion, ConflictoHorario, HorarioPersonalizadoDocente,
+    EjecucionGeneracion, SolucionCacheada, FechaExcepcion
+)
 from academic.models import Curso, Aula
 
 User = get_user_model()
@@ -137,7 +142,8 @@ class AsignacionAPITest(APITestCase):
         response = self.client.post(url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
-class AlgorithmTest(TestCase):
+class DatosAlgoritmoMixin:
+    """Catálogo mínimo para ejecutar el generador"""
     def setUp(self):
         self.admin_user = User.objects.create_user(
             username='admin',
@@ -185,7 +191,19 @@ class AlgorithmTest(TestCase):
             password='password123',
             rol='DOCENTE'
         )
-    
+
+        # El generador solo asigna docentes con disponibilidad registrada
+        for docente in (self.docente1, self.docente2):
+            for dia in ['LUNES', 'MARTES', 'MIERCOLES', 'JUEVES', 'VIERNES']:
+                HorarioPersonalizadoDocente.objects.create(
+                    docente=docente,
+                    dia_semana=dia,
+                    hora_inicio=datetime.time(8, 0),
+                    hora_fin=datetime.time(18, 0),
+                    tipo='DISPONIBLE'
+                )
+
+class AlgorithmTest(DatosAlgoritmoMixin, TestCase):
     def test_generador_horarios(self):
         from .core.algorithm import GeneradorHorarios
         
@@ -197,4 +215,944 @@ class AlgorithmTest(TestCase):
         
         # Verificar que se detectaron conflictos
         generador.detectar_conflictos()
-        self.assertGreaterEqual(self.horario.conflictos.count(), 0)
\ No newline at end of file
+        self.assertGreaterEqual(self.horario.conflictos.count(), 0)
+
+    def test_metricas_de_generacion(self):
+        from .core.algorithm import GeneradorHorarios
+
+        generador = GeneradorHorarios(self.horario.id)
+        asignaciones_creadas = generador.generar_horario()
+        generador.detectar_conflictos()
+
+        ejecucion = EjecucionGeneracion.objects.get(horario=self.horario, tipo='GENERACION')
+        self.assertEqual(ejecucion.estado, 'COMPLETADA')
+        self.assertEqual(ejecucion.sesiones_asignadas, asignaciones_creadas)
+        self.assertEqual(ejecucion.sesiones_asignadas + ejecucion.sesiones_fallidas, 3)
+        self.assertGreater(ejecucion.total_consultas, 0)
+        for fase in ['carga', 'busqueda', 'persistencia', 'deteccion']:
+            self.assertIn(fase, ejecucion.metricas['fases'])
+        self.assertEqual(sum(ejecucion.metricas['histograma_intentos'].values()), 3)
+
+    def test_deteccion_sin_generacion_no_registra_metricas(self):
+        from .core.algorithm import GeneradorHorarios
+
+        GeneradorHorarios(self.horario.id).detectar_conflictos()
+        self.assertFalse(EjecucionGeneracion.objects.filter(horario=self.horario).exists())
+
+    def test_sesion_fallida_registra_motivo(self):
+        from .core.algorithm import GeneradorHorarios
+
+        HorarioPersonalizadoDocente.objects.all().delete()
+        generador = GeneradorHorarios(self.horario.id)
+        self.assertEqual(generador.generar_horario(), 0)
+
+        ejecucion = generador.metricas.ejecucion
+        self.assertEqual(ejecucion.sesiones_fallidas, 3)
+        self.assertEqual(ejecucion.metricas['motivos_fallo'], {'sin_docente_disponible': 3})
+
+    def test_metricas_por_api(self):
+        from rest_framework.test import APIClient
+        from .core.algorithm import GeneradorHorarios
+
+        GeneradorHorarios(self.horario.id).generar_horario()
+        client = APIClient()
+        client.force_authenticate(user=self.admin_user)
+        response = client.get(reverse('horario-metricas', args=[self.horario.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertIn('fases', response.data[0]['metricas'])
+
+
+class MemoizacionTest(DatosAlgoritmoMixin, TestCase):
+    def _filas(self, horario):
+        return sorted(horario.asignaciones.values_list(
+            'curso_id', 'docente_id', 'aula_id', 'dia_semana', 'bloque_horario'
+        ))
+
+    def test_misma_entrada_restaura_desde_cache(self):
+        from .core.algorithm import GeneradorHorarios
+
+        primero = GeneradorHorarios(self.horario.id)
+        creadas = primero.generar_horario(semilla=7)
+        self.assertFalse(primero.desde_cache)
+        filas = self._filas(self.horario)
+
+        otro = Horario.objects.create(nombre="Otro", semestre="2025-I", creado_por=self.admin_user)
+        segundo = GeneradorHorarios(otro.id)
+        self.assertEqual(segundo.generar_horario(semilla=7), creadas)
+        self.assertTrue(segundo.desde_cache)
+        self.assertEqual(self._filas(otro), filas)
+        self.assertEqual(SolucionCacheada.objects.get().usos, 1)
+
+    def test_cambio_de_entradas_invalida(self):
+        from .core.algorithm import GeneradorHorarios
+
+        GeneradorHorarios(self.horario.id).generar_horario(semilla=7)
+        self.aula2.capacidad = 60
+        self.aula2.save()
+        generador = GeneradorHorarios(self.horario.id)
+        generador.generar_horario(semilla=7)
+        self.assertFalse(generador.desde_cache)
+
+        generador = GeneradorHorarios(self.horario.id)
+        generador.generar_horario(semilla=8)
+        self.assertFalse(generador.desde_cache)
+        self.assertEqual(SolucionCacheada.objects.count(), 3)
+
+    @override_settings(HORUNAP_CACHE_SOLUCIONES={'MAX_ENTRADAS': 2})
+    def test_desalojo_por_numero_de_entradas(self):
+        from .core.algorithm import GeneradorHorarios
+
+        for semilla in range(4):
+            GeneradorHorarios(self.horario.id).generar_horario(semilla=semilla)
+        self.assertEqual(SolucionCacheada.objects.count(), 2)
+
+class ConfiguracionGeneracionTest(DatosAlgoritmoMixin, TestCase):
+    def test_respeta_dias_y_bloques(self):
+        from .core.algorithm import GeneradorHorarios
+
+        generador = GeneradorHorarios(self.horario.id, configuracion={
+            'dias_semana': ['MARTES', 'JUEVES'],
+            'bloques_horarios': ['10:00-12:00'],
+        })
+        generador.generar_horario(semilla=1)
+        franjas = set(self.horario.asignaciones.values_list('dia_semana', 'bloque_horario'))
+        self.assertTrue(franjas <= {('MARTES', '10:00-12:00'), ('JUEVES', '10:00-12:00')})
+        self.assertEqual(generador.completitud, 1.0)
+
+    def test_limite_de_tiempo_devuelve_mejor_parcial(self):
+        from .core.algorithm import GeneradorHorarios
+
+        # Un solo bloque y un curso con más sesiones que días: imposible de completar
+        Curso.objects.create(nombre="Curso 3", codigo="C3", creditos=2, sesiones_semana=6)
+        generador = GeneradorHorarios(self.horario.id, configuracion={
+            'bloques_horarios': ['08:00-10:00'],
+            'max_intentos_por_curso': 20,
+            'tiempo_limite_segundos': 0.2,
+        })
+        creadas = generador.generar_horario(semilla=3)
+
+        self.assertTrue(generador.interrumpido_por_tiempo)
+        self.assertLess(generador.completitud, 1.0)
+        self.assertEqual(creadas, self.horario.asignaciones.count())
+        self.assertEqual(generador.sesiones_totales, 9)
+        self.assertGreater(generador.metricas.ejecucion.metricas['pasadas'], 1)
+
+        # La solución parcial no se cachea: la misma entrada vuelve a buscar
+        self.assertFalse(SolucionCacheada.objects.exists())
+        generador = GeneradorHorarios(self.horario.id, configuracion=generador.configuracion())
+        generador.generar_horario(semilla=3)
+        self.assertFalse(generador.desde_cache)
+        self.assertTrue(generador.interrumpido_por_tiempo)
+
+    def test_api_valida_configuracion(self):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(user=self.admin_user)
+        url = reverse('horario-generar-automatico', args=[self.horario.id])
+
+        response = client.post(url, {'configuracion': {'dias_semana': ['DOMINGO']}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = client.post(url, {'configuracion': {'tiempo_limite_segundos': 5}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['completitud'], 1.0)
+
+class RestriccionesTest(DatosAlgoritmoMixin, TestCase):
+    def test_compatibilidad_aula_compilada(self):
+        from .core.restricciones import ConjuntoRestricciones
+
+        laboratorio = Aula.objects.create(nombre="Lab", capacidad=40, tipo='LABORATORIO', tiene_proyector=True)
+        self.curso2.equipamiento_requerido = 'Software de simulación'
+        self.curso2.save()
+        aulas = [self.aula1, self.aula2, laboratorio]
+        conjunto = ConjuntoRestricciones.desde_configuracion({}, [self.curso1, self.curso2], aulas)
+
+        self.assertEqual(list(conjunto.aulas_para(self.curso1)), [self.aula2, self.aula1, laboratorio])
+        self.assertEqual(list(conjunto.aulas_para(self.curso2)), [laboratorio])
+        self.assertFalse(conjunto.admite_aula(self.curso2, self.aula1))
+
+    def test_generacion_respeta_restricciones_configuradas(self):
+        from .core.algorithm import GeneradorHorarios
+
+        generador = GeneradorHorarios(self.horario.id, configuracion={
+            'restricciones': {
+                'max_sesiones_docente_dia': {'activa': True, 'maximo': 1},
+                'sesiones_dias_distintos': {'dura': True},
+            },
+        })
+        generador.generar_horario(semilla=5)
+        self.assertEqual(generador.completitud, 1.0)
+
+        asignaciones = list(self.horario.asignaciones.values_list('curso_id', 'docente_id', 'dia_semana'))
+        por_docente_dia = [(d, dia) for _, d, dia in asignaciones]
+        por_curso_dia = [(c, dia) for c, _, dia in asignaciones]
+        self.assertEqual(len(por_docente_dia), len(set(por_docente_dia)))
+        self.assertEqual(len(por_curso_dia), len(set(por_curso_dia)))
+
+    def test_reparte_la_carga_entre_docentes(self):
+        from collections import Counter
+        from .core.algorithm import GeneradorHorarios
+
+        for semilla in range(5):
+            generador = GeneradorHorarios(self.horario.id)
+            generador.generar_horario(semilla=semilla, usar_cache=False)
+            carga = Counter(self.horario.asignaciones.values_list('docente_id', flat=True))
+            self.assertEqual(sorted(carga.values()), [1, 2])
+
+    def test_tope_de_horas_semanales(self):
+        from .core.algorithm import GeneradorHorarios
+
+        # Sesiones de 2 horas: cada docente admite una sola
+        generador = GeneradorHorarios(self.horario.id, configuracion={
+            'restricciones': {'max_horas_docente_semana': {'activa': True, 'maximo': 3}},
+        })
+        self.assertEqual(generador.generar_horario(semilla=1), 2)
+        self.assertEqual(
+            sorted(self.horario.asignaciones.values_list('docente_id', flat=True)),
+            [self.docente1.id, self.docente2.id]
+        )
+
+    def test_habilitaciones_acotan_los_docentes_del_curso(self):
+        from academic.models import DocenteCurso
+        from .core.algorithm import GeneradorHorarios
+
+        # Solo C1 tiene habilitaciones; C2 admite a cualquier docente
+        DocenteCurso.objects.create(docente=self.docente2, curso=self.curso1)
+        generador = GeneradorHorarios(self.horario.id)
+        self.assertEqual(generador.generar_horario(semilla=3, usar_cache=False), 3)
+        self.assertEqual(
+            set(self.horario.asignaciones.filter(curso=self.curso1).values_list('docente_id', flat=True)),
+            {self.docente2.id}
+        )
+
+        # La detección usa la misma restricción
+        self.horario.asignaciones.filter(curso=self.curso2).delete()
+        self.horario.asignaciones.filter(curso=self.curso1).update(docente=self.docente1)
+        generador.detectar_conflictos()
+        self.assertEqual({c.tipo_conflicto for c in generador.conflictos}, {'DOCENTE'})
+        self.assertEqual(len(generador.conflictos), 2)
+
+    def test_indice_de_aulas_por_clases_equivalentes(self):
+        from .core.indice_aulas import IndiceAulas
+        from .core.restricciones import ConjuntoRestricciones
+
+        # Aula 2 y sus dos copias son intercambiables; Aula 1 (35) queda aparte
+        copias = [Aula.objects.create(nombre=f"Copia {i}", capacidad=30) for i in range(2)]
+        grande = Aula.objects.create(nombre="Grande", capacidad=80)
+        aulas = [self.aula1, self.aula2, *copias, grande]
+        indice = IndiceAulas(aulas, ConjuntoRestricciones.desde_configuracion({}, [self.curso1], aulas))
+        self.assertEqual(len(indice.clases), 3)
+        self.assertEqual(indice.compatibles(self.curso1)[0], [30, 35, 80])
+
+        ocupadas = []
+        for _ in range(3):
+            aula = indice.mejor_ajuste(self.curso1, 'LUNES', '08:00-10:00')
+            self.assertEqual(aula.capacidad, 30)
+            indice.ocupar(aula, 'LUNES', '08:00-10:00')
+            ocupadas.append(aula.id)
+        self.assertEqual(len(set(ocupadas)), 3)
+        # Clase de 30 llena en la franja: sigue la más cercana por arriba
+        self.assertEqual(indice.mejor_ajuste(self.curso1, 'LUNES', '08:00-10:00'), self.aula1)
+        self.assertEqual(indice.mejor_ajuste(self.curso1, 'MARTES', '08:00-10:00').capacidad, 30)
+
+        indice.reiniciar()
+        self.assertEqual(indice.mejor_ajuste(self.curso1, 'LUNES', '08:00-10:00').capacidad, 30)
+
+    def test_cola_de_docentes_elige_el_menos_cargado(self):
+        import random
+        from .core.carga_docente import ColaDocentes
+
+        franjas = {(docente.id, 'LUNES', bloque) for docente in (self.docente1, self.docente2)
+                   for bloque in ('08:00-10:00', '10:00-12:00')}
+        cola = ColaDocentes([self.docente1, self.docente2], franjas)
+        cola.reiniciar(random.Random(0))
+        cola.asignar(self.docente1, 'LUNES', '08:00-10:00', 2)
+
+        self.assertEqual(cola.elegir('LUNES', '10:00-12:00', lambda d: True), self.docente2)
+        # Los descartados por el curso siguen disponibles para otras consultas
+        self.assertEqual(cola.elegir('LUNES', '10:00-12:00', lambda d: d != self.docente2), self.docente1)
+        self.assertEqual(cola.elegir('LUNES', '10:00-12:00', lambda d: True), self.docente2)
+        # La franja ocupada ya no ofrece al docente
+        self.assertEqual(cola.elegir('LUNES', '08:00-10:00', lambda d: True), self.docente2)
+        self.assertIsNone(cola.elegir('LUNES', '08:00-10:00', lambda d: d == self.docente1))
+        self.assertIsNone(cola.elegir('MARTES', '08:00-10:00', lambda d: True))
+
+    def test_deteccion_usa_el_mismo_registro(self):
+        from .core.algorithm import GeneradorHorarios
+
+        # C1 y C2 son obligatorios sin prerrequisitos: mismo nivel de la malla
+        for curso, aula in ((self.curso1, self.aula1), (self.curso2, self.aula2)):
+            Asignacion.objects.create(
+                horario=self.horario, curso=curso, docente=self.docente1 if aula == self.aula1 else self.docente2,
+                aula=aula, dia_semana='LUNES', bloque_horario='08:00-10:00'
+            )
+        generador = GeneradorHorarios(self.horario.id, configuracion={
+            'restricciones': {'niveles_sin_solape': {'activa': True}},
+        })
+        generador.detectar_conflictos()
+        self.assertEqual([c.tipo_conflicto for c in generador.conflictos], ['CURSO'])
+
+    def test_configuracion_rechaza_restriccion_desconocida(self):
+        from .serializers import ConfiguracionGeneracionSerializer
+
+        serializer = ConfiguracionGeneracionSerializer(data={'restricciones': {'inexistente': {}}})
+        self.assertFalse(serializer.is_valid())
+        serializer = ConfiguracionGeneracionSerializer(
+            data={'restricciones': {'max_sesiones_docente_dia': {'maximo': 2}}}
+        )
+        self.assertTrue(serializer.is_valid())
+
+    def test_configuracion_valida_tipos_de_parametros(self):
+        from .serializers import ConfiguracionGeneracionSerializer
+
+        invalidas = [
+            {'capacidad': {'admite_aula': 1}},
+            {'max_sesiones_docente_dia': {'maximo': 'dos'}},
+            {'max_sesiones_docente_dia': {'maximo': 0}},
+            {'max_sesiones_docente_dia': {'mensaje': 'x'}},
+            {'sesiones_dias_distintos': {'peso': 'alto'}},
+            {'sesiones_dias_distintos': {'dura': 'quizas'}},
+        ]
+        for restricciones in invalidas:
+            serializer = ConfiguracionGeneracionSerializer(data={'restricciones': restricciones})
+            self.assertFalse(serializer.is_valid(), restricciones)
+
+        serializer = ConfiguracionGeneracionSerializer(
+            data={'restricciones': {'max_sesiones_docente_dia': {'activa': 'true', 'maximo': '2'}}}
+        )
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data['restricciones'],
+                         {'max_sesiones_docente_dia': {'activa': True, 'maximo': 2}})
+
+    def test_parametros_invalidos_responden_400(self):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(user=self.admin_user)
+        restricciones = {'capacidad': {'admite_aula': 1}}
+        response = client.post(reverse('horario-generar-automatico', args=[self.horario.id]),
+                                    {'configuracion': {'restricciones': restricciones}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = client.post(
+            reverse('horario-validar-cambios', args=[self.horario.id]),
+            {'cambios': [{'curso': self.curso1.id, 'docente': self.docente1.id, 'aula': self.aula1.id,
+                          'dia_semana': 'LUNES', 'bloque_horario': '08:00-10:00'}],
+             'restricciones': {'max_sesiones_docente_dia': {'maximo': 'dos'}}},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('maximo', response.data['restricciones']['max_sesiones_docente_dia'])
+
+class AsignacionesEditablesMixin(DatosAlgoritmoMixin):
+    """Dos asignaciones del mismo docente en lunes y martes a primera hora"""
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.admin_user)
+        self.url = reverse('horario-validar-cambios', args=[self.horario.id])
+        self.a1 = Asignacion.objects.create(
+            horario=self.horario, curso=self.curso1, docente=self.docente1, aula=self.aula1,
+            dia_semana='LUNES', bloque_horario='08:00-10:00'
+        )
+        self.a2 = Asignacion.objects.create(
+            horario=self.horario, curso=self.curso2, docente=self.docente1, aula=self.aula2,
+            dia_semana='MARTES', bloque_horario='08:00-10:00'
+        )
+
+class ValidarCambiosTest(AsignacionesEditablesMixin, APITestCase):
+    def test_intercambio_de_franjas_es_valido(self):
+        cambios = [
+            {'asignacion': self.a1.id, 'dia_semana': 'MARTES'},
+            {'asignacion': self.a2.id, 'dia_semana': 'LUNES'},
+        ]
+        response = self.client.post(self.url, {'cambios': cambios}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['valido'])
+
+    def test_movimiento_rechazado_conserva_su_franja(self):
+        cambios = [
+            # Choca con a2: a1 se queda el lunes
+            {'asignacion': self.a1.id, 'dia_semana': 'MARTES'},
+            {'curso': self.curso2.id, 'docente': self.docente2.id, 'aula': self.aula1.id,
+             'dia_semana': 'LUNES', 'bloque_horario': '08:00-10:00'},
+        ]
+        response = self.client.post(self.url, {'cambios': cambios}, format='json')
+        codigos = [[e['codigo'] for e in r['errores']] for r in response.data['resultados']]
+        self.assertFalse(response.data['valido'])
+        self.assertEqual(codigos, [['docente_ocupado'], ['aula_ocupada']])
+
+    def test_veredictos_por_cambio(self):
+        laboratorio = Aula.objects.create(nombre="Lab", capacidad=10, tipo='LABORATORIO')
+        cambios = [
+            # Choca con a2 (mismo docente y franja)
+            {'asignacion': self.a1.id, 'dia_semana': 'MARTES', 'aula': self.aula2.id},
+            # Aula sin capacidad suficiente
+            {'curso': self.curso1.id, 'docente': self.docente2.id, 'aula': laboratorio.id,
+             'dia_semana': 'JUEVES', 'bloque_horario': '08:00-10:00'},
+            # Nueva, sin disponibilidad del docente el sábado
+            {'curso': self.curso2.id, 'docente': self.docente2.id, 'aula': self.aula1.id,
+             'dia_semana': 'SABADO', 'bloque_horario': '08:00-10:00'},
+            # Nueva y válida, pero ocupa la franja de la siguiente
+            {'curso': self.curso2.id, 'docente': self.docente2.id, 'aula': self.aula1.id,
+             'dia_semana': 'MIERCOLES', 'bloque_horario': '10:00-12:00'},
+            {'curso': self.curso1.id, 'docente': self.docente1.id, 'aula': self.aula1.id,
+             'dia_semana': 'MIERCOLES', 'bloque_horario': '10:00-12:00'},
+        ]
+        # Horario, asignaciones, cursos, aulas, docentes, disponibilidad, habilitaciones
+        # y aulas de otros horarios: fijo por lote
+        with self.assertNumQueries(8):
+            response = self.client.post(self.url, {'cambios': cambios}, format='json')
+        codigos = [{e['codigo'] for e in r['errores']} for r in response.data['resultados']]
+        self.assertFalse(response.data['valido'])
+        self.assertEqual(codigos[0], {'docente_ocupado', 'aula_ocupada'})
+        self.assertEqual(codigos[1], {'capacidad'})
+        self.assertEqual(codigos[2], {'docente_no_disponible'})
+        self.assertEqual(codigos[3], set())
+        self.assertEqual(codigos[4], {'aula_ocupada'})
+        self.assertEqual(Asignacion.objects.get(pk=self.a1.pk).dia_semana, 'LUNES')
+
+class MoverAsignacionesTest(AsignacionesEditablesMixin, APITestCase):
+    def test_intercambiar(self):
+        url = reverse('asignacion-intercambiar')
+        datos = {'asignaciones': [{'asignacion': self.a1.id, 'version': 1},
+                                  {'asignacion': self.a2.id, 'version': 1}]}
+        response = self.client.post(url, datos, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.a1.refresh_from_db()
+        self.a2.refresh_from_db()
+        self.assertEqual((self.a1.dia_semana, self.a1.aula_id, self.a1.version), ('MARTES', self.aula2.id, 2))
+        self.assertEqual((self.a2.dia_semana, self.a2.aula_id, self.a2.version), ('LUNES', self.aula1.id, 2))
+
+        # La misma petición con versiones viejas ya no se aplica
+        response = self.client.post(url, datos, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual({c['version_actual'] for c in response.data['conflictos']}, {2})
+        self.a1.refresh_from_db()
+        self.assertEqual(self.a1.dia_semana, 'MARTES')
+
+    def test_mover(self):
+        url = reverse('asignacion-mover', args=[self.a1.id])
+        response = self.client.post(url, {'version': 1, 'dia_semana': 'MARTES'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['resultados'][0]['errores'][0]['codigo'], 'docente_ocupado')
+
+        response = self.client.post(url, {'version': 1, 'bloque_horario': '14:00-16:00'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['asignaciones'][0]['version'], 2)
+        self.assertEqual(response.data['asignaciones'][0]['dia_semana'], 'LUNES')
+
+class LoteAsignacionesTest(AsignacionesEditablesMixin, APITestCase):
+    def test_lote_aplica_todo_en_una_transaccion(self):
+        datos = {
+            'horario': self.horario.id,
+            # a1 libera el lunes a primera hora y una alta lo ocupa en el mismo lote
+            'actualizar': [{'asignacion': self.a1.id, 'version': 1, 'dia_semana': 'MIERCOLES'}],
+            'crear': [
+                {'curso': self.curso2.id, 'docente': self.docente1.id, 'aula': self.aula1.id,
+                 'dia_semana': 'LUNES', 'bloque_horario': '08:00-10:00'},
+                {'curso': self.curso1.id, 'docente': self.docente2.id, 'aula': self.aula2.id,
+                 'dia_semana': 'JUEVES', 'bloque_horario': '10:00-12:00', 'activa': False},
+            ],
+            'activa': [{'asignacion': self.a2.id}],
+        }
+        response = self.client.post(reverse('asignacion-lote'), datos, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['creadas'], 2)
+        self.assertEqual(self.horario.asignaciones.count(), 4)
+        self.a1.refresh_from_db()
+        self.a2.refresh_from_db()
+        self.assertEqual((self.a1.dia_semana, self.a1.version), ('MIERCOLES', 2))
+        self.assertEqual((self.a2.activa, self.a2.version), (False, 2))
+        self.assertFalse(self.horario.asignaciones.get(dia_semana='JUEVES').activa)
+
+    def test_lote_invalido_no_aplica_nada(self):
+        datos = {
+            'horario': self.horario.id,
+            'crear': [
+                {'curso': self.curso2.id, 'docente': self.docente2.id, 'aula': self.aula1.id,
+                 'dia_semana': 'VIERNES', 'bloque_horario': '08:00-10:00'},
+                # Misma aula y franja que la anterior
+                {'curso': self.curso1.id, 'docente': self.docente1.id, 'aula': self.aula1.id,
+                 'dia_semana': 'VIERNES', 'bloque_horario': '08:00-10:00'},
+            ],
+            'activa': [{'asignacion': 999999, 'activa': False}],
+        }
+        response = self.client.post(reverse('asignacion-lote'), datos, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        veredictos = [(r['operacion'], r['indice'], r['valido']) for r in response.data['resultados']]
+        self.assertEqual(veredictos, [('crear', 0, True), ('crear', 1, False), ('activa', 0, False)])
+        self.assertEqual(self.horario.asignaciones.count(), 2)
+
+class SugerenciasTest(AsignacionesEditablesMixin, APITestCase):
+    def test_sugerencias_factibles_y_ordenadas(self):
+        url = reverse('asignacion-sugerencias', args=[self.a1.id])
+        response = self.client.get(url, {'k': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sugerencias = response.data['sugerencias']
+        self.assertEqual(len(sugerencias), 3)
+        # Mismo docente, aula de mejor ajuste (C1 pide 30: Aula 2) y mismo día primero
+        self.assertEqual((sugerencias[0]['aula'], sugerencias[0]['dia_semana']), (self.aula2.id, 'LUNES'))
+        self.assertEqual([s['puntaje'] for s in sugerencias], sorted(s['puntaje'] for s in sugerencias))
+        for s in sugerencias:
+            self.assertNotEqual((s['dia_semana'], s['bloque_horario']), ('MARTES', '08:00-10:00'))
+
+        # Cada sugerencia es aplicable tal cual con `mover`
+        cambio = {k: sugerencias[0][k] for k in ('dia_semana', 'bloque_horario', 'aula', 'docente')}
+        response = self.client.post(reverse('asignacion-mover', args=[self.a1.id]),
+                                    {'version': response.data['version'], **cambio}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cambiar_docente(self):
+        url = reverse('asignacion-sugerencias', args=[self.a2.id])
+        response = self.client.get(url, {'k': 50, 'cambiar_docente': 'true'})
+        docentes = {s['docente'] for s in response.data['sugerencias']}
+        self.assertEqual(docentes, {self.docente1.id, self.docente2.id})
+        self.assertEqual(response.data['sugerencias'][0]['docente'], self.docente1.id)
+
+    def test_usa_la_configuracion_de_la_ultima_generacion(self):
+        from django.utils import timezone
+
+        EjecucionGeneracion.objects.create(
+            horario=self.horario, tipo='GENERACION', fecha_inicio=timezone.now(),
+            metricas={'configuracion': {'dias_semana': ['MIERCOLES', 'JUEVES'],
+                                        'bloques_horarios': ['10:00-12:00']}}
+        )
+        response = self.client.get(reverse('asignacion-sugerencias', args=[self.a1.id]), {'k': 50})
+        franjas = {(s['dia_semana'], s['bloque_horario']) for s in response.data['sugerencias']}
+        self.assertEqual(franjas, {('MIERCOLES', '10:00-12:00'), ('JUEVES', '10:00-12:00')})
+
+class UtilizacionHorarioTest(AsignacionesEditablesMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.laboratorio = Aula.objects.create(nombre="Lab", capacidad=20, tipo='LABORATORIO', tiene_proyector=True)
+        self.curso3 = Curso.objects.create(nombre="Curso 3", codigo="C3", creditos=2, sesiones_semana=1,
+                                           capacidad_estimada=25, requiere_laboratorio=True)
+        self.a3 = Asignacion.objects.create(
+            horario=self.horario, curso=self.curso3, docente=self.docente2, aula=self.laboratorio,
+            dia_semana='LUNES', bloque_horario='08:00-10:00'
+        )
+        self.url = reverse('horario-utilizacion', args=[self.horario.id])
+
+    def test_matrices_y_tablas(self):
+        datos = self.client.get(self.url).data
+        self.assertEqual(len(datos['ocupacion']['aulas_ocupadas']), len(datos['dias']))
+        lunes, martes = datos['ocupacion']['aulas_ocupadas'][:2]
+        self.assertEqual((lunes[0], martes[0], lunes[1]), (2, 1, 0))
+        self.assertEqual(datos['ocupacion']['tasa'][0][0], round(2 / 3, 3))
+
+        aulas = {fila[0]: dict(zip(datos['aulas']['columnas'], fila)) for fila in datos['aulas']['filas']}
+        self.assertEqual(aulas[self.aula1.id]['desperdicio_total'], 5)
+        self.assertEqual(aulas[self.laboratorio.id]['desperdicio_total'], -5)
+        self.assertEqual(aulas[self.laboratorio.id]['sesiones_sobrecupo'], 1)
+        self.assertEqual(datos['aulas_ociosas'], [])
+        self.assertIn([self.a3.id, self.laboratorio.id, -5], datos['asignaciones']['filas'])
+
+        # Ordenados por horas semanales: docente1 dicta dos cursos distintos
+        docentes = [dict(zip(datos['docentes']['columnas'], fila)) for fila in datos['docentes']['filas']]
+        self.assertEqual(docentes[0]['docente'], self.docente1.id)
+        self.assertEqual((docentes[0]['horas_semanales'], docentes[0]['creditos'], docentes[0]['cursos']), (4, 7, 2))
+        self.assertEqual(docentes[1]['sesiones'], 1)
+
+        laboratorios = datos['laboratorios']
+        self.assertEqual((laboratorios['oferta'], laboratorios['demanda'][0][0]), (1, 1))
+        self.assertEqual((laboratorios['demanda_total'], laboratorios['deficit'][0][0]), (1, 0))
+
+    def test_tasas_sobre_las_franjas_configuradas(self):
+        from django.utils import timezone
+
+        # Sin generación: días y bloques por defecto del generador (5 × 4)
+        datos = self.client.get(self.url).data
+        aulas = {fila[0]: dict(zip(datos['aulas']['columnas'], fila)) for fila in datos['aulas']['filas']}
+        self.assertEqual(datos['franjas_semana'], 20)
+        self.assertEqual(aulas[self.aula1.id]['tasa_uso'], round(1 / 20, 3))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            EjecucionGeneracion.objects.create(
+                horario=self.horario, tipo='GENERACION', fecha_inicio=timezone.now(),
+                metricas={'configuracion': {'dias_semana': ['LUNES', 'MARTES'],
+                                            'bloques_horarios': ['08:00-10:00', '10:00-12:00']}}
+            )
+            self.horario.save()
+        datos = self.client.get(self.url).data
+        aulas = {fila[0]: dict(zip(datos['aulas']['columnas'], fila)) for fila in datos['aulas']['filas']}
+        self.assertEqual(datos['franjas_semana'], 4)
+        self.assertEqual(aulas[self.aula1.id]['tasa_uso'], 0.25)
+        self.assertEqual(datos['laboratorios']['capacidad_semanal'], 4)
+
+    def test_cacheado_hasta_cambiar_el_horario(self):
+        self.client.get(self.url)
+        # Solo la consulta del horario
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Asignacion.objects.create(
+                horario=self.horario, curso=self.curso3, docente=self.docente2, aula=self.laboratorio,
+                dia_semana='MARTES', bloque_horario='08:00-10:00'
+            )
+        datos = self.client.get(self.url).data
+        self.assertEqual(datos['laboratorios']['demanda'][1][0], 1)
+        self.assertEqual(datos['ocupacion']['aulas_ocupadas'][1][0], 2)
+
+class AulasCompartidasTest(DatosAlgoritmoMixin, APITestCase):
+    """Las aulas se comparten entre los horarios publicados del mismo semestre"""
+    def setUp(self):
+        super().setUp()
+        from .core.algorithm import GeneradorHorarios
+
+        self.client.force_authenticate(user=self.admin_user)
+        franjas = [(dia, bloque) for dia in GeneradorHorarios.DIAS_SEMANA for bloque in GeneradorHorarios.BLOQUES_HORARIOS]
+        # Aula 2 ocupada toda la semana por otro horario activo del semestre;
+        # Aula 1, por uno de otro semestre (no cuenta)
+        for semestre, aula in (('2025-I', self.aula2), ('2024-II', self.aula1)):
+            otro = Horario.objects.create(nombre=f"Otro {semestre}", semestre=semestre,
+                                          estado='ACTIVO', creado_por=self.admin_user)
+            Asignacion.objects.bulk_create([
+                Asignacion(horario=otro, curso=self.curso2, docente=self.admin_user, aula=aula,
+                           dia_semana=dia, bloque_horario=bloque)
+                for dia, bloque in franjas
+            ])
+
+    def test_generacion_evita_aulas_de_otros_horarios(self):
+        from .core.algorithm import GeneradorHorarios
+
+        generador = GeneradorHorarios(self.horario.id)
+        self.assertEqual(generador.generar_horario(semilla=2), 3)
+        self.assertEqual(set(self.horario.asignaciones.values_list('aula_id', flat=True)), {self.aula1.id})
+
+    def test_deteccion_resolucion_y_validacion(self):
+        from .core.algorithm import GeneradorHorarios, ResolvedorConflictos
+
+        asignacion = Asignacion.objects.create(
+            horario=self.horario, curso=self.curso1, docente=self.docente1, aula=self.aula2,
+            dia_semana='LUNES', bloque_horario='08:00-10:00'
+        )
+        generador = GeneradorHorarios(self.horario.id)
+        generador.detectar_conflictos()
+        self.assertEqual([c.tipo_conflicto for c in generador.conflictos], ['AULA'])
+
+        self.assertEqual(ResolvedorConflictos(self.horario.id).resolver_conflictos(), 1)
+        asignacion.refresh_from_db()
+        self.assertEqual(asignacion.aula_id, self.aula1.id)
+
+        cambios = [{'asignacion': asignacion.id, 'aula': self.aula2.id}]
+        response = self.client.post(reverse('horario-validar-cambios', args=[self.horario.id]),
+                                    {'cambios': cambios}, format='json')
+        self.assertEqual([e['codigo'] for e in response.data['resultados'][0]['errores']],
+                         ['aula_ocupada_otro_horario'])
+
+class PublicacionGeneracionTest(AsignacionesEditablesMixin, APITestCase):
+    def test_publicar_reemplaza_asignaciones_y_conflictos(self):
+        from .core.operaciones import publicar_asignaciones
+
+        ConflictoHorario.objects.create(
+            horario=self.horario, asignacion=self.a1, tipo_conflicto='AULA', descripcion='Choque'
+        )
+        nueva = Asignacion(
+            horario=self.horario, curso=self.curso1, docente=self.docente2, aula=self.aula2,
+            dia_semana='JUEVES', bloque_horario='10:00-12:00'
+        )
+        # Bloqueo, dos DELETE por conjunto, INSERT y estado del horario (más savepoints)
+        with self.assertNumQueries(7):
+            self.assertEqual(publicar_asignaciones(self.horario, [nueva]), 1)
+
+        self.assertEqual(list(self.horario.asignaciones.values_list('dia_semana', flat=True)), ['JUEVES'])
+        self.assertFalse(ConflictoHorario.objects.exists())
+        self.horario.refresh_from_db()
+        self.assertEqual(self.horario.estado, 'GENERADO')
+
+    def test_generacion_en_curso_devuelve_409(self):
+        from .core.operaciones import bloquear_horario, GeneracionEnCurso
+
+        with bloquear_horario(self.horario.id):
+            with self.assertRaises(GeneracionEnCurso):
+                with bloquear_horario(self.horario.id):
+                    pass
+            for nombre in ('horario-generar-automatico', 'horario-resolver-conflictos'):
+                response = self.client.post(reverse(nombre, args=[self.horario.id]), {}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.horario.asignaciones.count(), 2)
+
+        # Liberado el bloqueo, la generación publica el nuevo resultado
+        response = self.client.post(reverse('horario-generar-automatico', args=[self.horario.id]),
+                                    {'usar_cache': False}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.horario.asignaciones.count(), response.data['asignaciones_creadas'])
+
+@override_settings(HORUNAP_PROGRESO_INTERVALO=0.01)
+class ProgresoGeneracionTest(DatosAlgoritmoMixin, TestCase):
+    def test_actualizaciones_coalescidas(self):
+        from .core.progreso import ProgresoEjecucion, leer_progreso
+
+        progreso = ProgresoEjecucion(self.horario.id, intervalo=60)
+        for colocadas in range(1000):
+            progreso.actualizar(sesiones_colocadas=colocadas)
+        progreso.fase('persistencia')
+        progreso.finalizar(conflictos=0)
+        self.assertEqual(progreso.publicaciones, 3)
+        self.assertEqual(leer_progreso(self.horario.id)['sesiones_colocadas'], 999)
+
+    def test_generar_publica_resultado_final(self):
+        from rest_framework.test import APIClient
+        from .core.progreso import leer_progreso
+
+        client = APIClient()
+        client.force_authenticate(user=self.admin_user)
+        response = client.post(reverse('horario-generar-automatico', args=[self.horario.id]),
+                               {'usar_cache': False}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        progreso = leer_progreso(self.horario.id)
+        self.assertEqual((progreso['estado'], progreso['fase']), ('COMPLETADA', 'deteccion'))
+        self.assertEqual(progreso['sesiones_asignadas'], response.data['asignaciones_creadas'])
+        self.assertEqual(progreso['sesiones_totales'], 3)
+        self.assertEqual(progreso['conflictos'], 0)
+
+    async def test_flujo_sse(self):
+        from .core.progreso import ProgresoEjecucion
+
+        url = reverse('horario-progreso', args=[self.horario.id])
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 401)
+
+        await self.async_client.aforce_login(self.admin_user)
+        progreso = ProgresoEjecucion(self.horario.id)
+        progreso.fase('busqueda', sesiones_totales=3)
+        response = await self.async_client.get(url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        eventos = []
+        async for trozo in response.streaming_content:
+            trozo = trozo.decode() if isinstance(trozo, bytes) else trozo
+            if trozo.startswith('id:'):
+                eventos.append(json.loads(trozo.split('data: ', 1)[1]))
+                if len(eventos) == 1:
+                    progreso.finalizar(sesiones_asignadas=3)
+        self.assertEqual([e['estado'] for e in eventos], ['EN_CURSO', 'COMPLETADA'])
+        self.assertEqual(eventos[1]['sesiones_asignadas'], 3)
+
+class ClonarHorarioTest(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_user(
+            username='admin',
+            password='password123',
+            rol='ADMIN'
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        self.horario = Horario.objects.create(
+            nombre="Original",
+            semestre="2025-I",
+            fecha_inicio=datetime.date(2025, 3, 3),
+            fecha_fin=datetime.date(2025, 7, 20),
+            creado_por=self.admin_user
+        )
+        docente = User.objects.create_user(username='docente', password='password123', rol='DOCENTE')
+        self.aula_a = Aula.objects.create(nombre="A", capacidad=40)
+        self.lab_b = Aula.objects.create(nombre="Lab B", capacidad=30, tipo='LABORATORIO')
+        for i, (aula, bloque) in enumerate([(self.aula_a, '08:00-10:00'), (self.lab_b, '10:00-12:00')]):
+            curso = Curso.objects.create(nombre=f"Curso {i}", codigo=f"C{i}", creditos=3)
+            asignacion = Asignacion.objects.create(
+                horario=self.horario, curso=curso, docente=docente, aula=aula,
+                dia_semana='LUNES', bloque_horario=bloque
+            )
+            ConflictoHorario.objects.create(
+                horario=self.horario, asignacion=asignacion,
+                tipo_conflicto='CAPACIDAD', descripcion=f"Conflicto {i}"
+            )
+
+    def test_clonar_copia_asignaciones_y_conflictos(self):
+        url = reverse('horario-clonar', args=[self.horario.id])
+        response = self.client.post(url, {'nombre': 'Variante', 'incluir_conflictos': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['asignaciones_copiadas'], 2)
+        self.assertEqual(response.data['conflictos_copiados'], 2)
+
+        nuevo = Horario.objects.get(nombre='Variante')
+        self.assertEqual((nuevo.fecha_inicio, nuevo.fecha_fin),
+                         (datetime.date(2025, 3, 3), datetime.date(2025, 7, 20)))
+        self.assertEqual(
+            sorted(nuevo.asignaciones.values_list('curso_id', 'aula_id', 'dia_semana', 'bloque_horario')),
+            sorted(self.horario.asignaciones.values_list('curso_id', 'aula_id', 'dia_semana', 'bloque_horario'))
+        )
+        for conflicto in nuevo.conflictos.all():
+            self.assertEqual(conflicto.asignacion.horario_id, nuevo.id)
+        self.assertEqual(self.horario.asignaciones.count(), 2)
+
+    def test_clonar_excluyendo_aula(self):
+        from .core.operaciones import clonar_horario
+
+        # SAVEPOINT + horario + INSERT..SELECT asignaciones + INSERT..SELECT conflictos + RELEASE
+        with self.assertNumQueries(5):
+            nuevo, copiadas, conflictos = clonar_horario(
+                self.horario, "Sin Lab B", self.admin_user,
+                incluir_conflictos=True, excluir_aulas=[self.lab_b.id]
+            )
+        self.assertEqual(copiadas, 1)
+        self.assertEqual(conflictos, 1)
+        self.assertFalse(nuevo.asignaciones.filter(aula=self.lab_b).exists())
+
+class ExportacionTest(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_user(
+            username='admin',
+            password='password123',
+            rol='ADMIN'
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        self.horario = Horario.objects.create(nombre="Exportar", semestre="2025-I", creado_por=self.admin_user)
+        self.docente1 = User.objects.create_user(username='docente1', password='password123', rol='DOCENTE')
+        self.docente2 = User.objects.create_user(username='docente2', password='password123', rol='DOCENTE')
+        aula = Aula.objects.create(nombre="Aula Ñ", capacidad=40, edificio="Pabellón A")
+        for i, docente in enumerate([self.docente1, self.docente2, self.docente1]):
+            curso = Curso.objects.create(nombre=f"Álgebra {i}", codigo=f"AL{i}", creditos=4)
+            Asignacion.objects.create(
+                horario=self.horario, curso=curso, docente=docente, aula=aula,
+                dia_semana='LUNES', bloque_horario=['08:00-10:00', '10:00-12:00', '14:00-16:00'][i]
+            )
+
+    def _contenido(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_exportar_csv(self):
+        response = self.client.get(reverse('horario-exportar', args=[self.horario.id]), {'formato': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        lineas = self._contenido(response).decode('utf-8-sig').strip().splitlines()
+        self.assertEqual(len(lineas), 4)
+        self.assertIn('Álgebra 0', lineas[1])
+        self.assertIn('Pabellón A', lineas[1])
+
+    def test_exportar_xlsx(self):
+        import io
+        import zipfile
+
+        response = self.client.get(reverse('horario-exportar', args=[self.horario.id]), {'formato': 'xlsx'})
+        archivo = zipfile.ZipFile(io.BytesIO(self._contenido(response)))
+        self.assertIsNone(archivo.testzip())
+        hoja = archivo.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertEqual(hoja.count('<row>'), 4)
+        self.assertIn('Aula Ñ', hoja)
+
+    def test_exportar_por_docente(self):
+        response = self.client.get(reverse('asignacion-exportar'), {'docente': self.docente1.id})
+        lineas = self._contenido(response).decode('utf-8-sig').strip().splitlines()
+        self.assertEqual(len(lineas), 3)
+        self.assertIn('docente_', response['Content-Disposition'])
+
+    def test_exportar_requiere_filtro_y_formato_valido(self):
+        self.assertEqual(self.client.get(reverse('asignacion-exportar')).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(reverse('horario-exportar', args=[self.horario.id]), {'formato': 'pdf'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_exportar_rechaza_filtros_no_enteros(self):
+        for valor in ('1"; x="y', '1\r\nX-Otro: 1', 'abc'):
+            response = self.client.get(reverse('asignacion-exportar'), {'docente': valor})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            response = self.client.get(reverse('horario-exportar', args=[self.horario.id]), {'aula': valor})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class CalendarioTest(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.admin_user = User.objects.create_user(username='admin', password='password123', rol='ADMIN')
+        self.docente = User.objects.create_user(username='docente', password='password123', rol='DOCENTE')
+        # Semestre de 3 semanas, del lunes 2025-03-03 al domingo 2025-03-23
+        self.horario = Horario.objects.create(
+            nombre="2025-I", semestre="2025-I", estado='ACTIVO', creado_por=self.admin_user,
+            fecha_inicio=datetime.date(2025, 3, 3), fecha_fin=datetime.date(2025, 3, 23)
+        )
+        self.aula = Aula.objects.create(nombre="A-101", capacidad=40)
+        self.curso = Curso.objects.create(nombre="Cálculo; I", codigo="MAT1", creditos=4)
+        self.asignacion = Asignacion.objects.create(
+            horario=self.horario, curso=self.curso, docente=self.docente, aula=self.aula,
+            dia_semana='MIERCOLES', bloque_horario='08:00-10:00'
+        )
+
+    def _url(self):
+        return reverse('calendario-docente', args=[self.docente.id])
+
+    def test_expande_ocurrencias_y_omite_feriados(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            FechaExcepcion.objects.create(fecha=datetime.date(2025, 3, 12), descripcion="Feriado")
+        response = self.client.get(self._url())
+        self.assertEqual(response.status_code, 200)
+        contenido = response.content.decode('utf-8')
+        self.assertEqual(contenido.count('BEGIN:VEVENT'), 2)
+        # 08:00 en Lima (UTC-5) = 13:00 UTC
+        self.assertIn('DTSTART:20250305T130000Z', contenido)
+        self.assertNotIn('20250312', contenido)
+        self.assertIn('SUMMARY:MAT1 - Cálculo\; I', contenido)
+
+    def test_etag_y_cache(self):
+        response = self.client.get(self._url())
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self._url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self._url()).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.asignacion.bloque_horario = '10:00-12:00'
+            self.asignacion.save()
+        response = self.client.get(self._url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('DTSTART:20250305T150000Z', response.content.decode('utf-8'))
+
+    def test_horarios_no_publicados_no_aparecen(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.horario.estado = 'BORRADOR'
+            self.horario.save()
+        response = self.client.get(reverse('calendario-aula', args=[self.aula.id]))
+        self.assertNotIn('BEGIN:VEVENT', response.content.decode('utf-8'))
+
+class EstadisticasTest(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_user(username='admin', password='password123', rol='ADMIN')
+        self.client.force_authenticate(user=self.admin_user)
+        horario = Horario.objects.create(nombre="Estadísticas", semestre="2025-I", creado_por=self.admin_user)
+        curso = Curso.objects.create(nombre="Curso", codigo="E1", creditos=3, sesiones_semana=2)
+        Curso.objects.create(nombre="Electivo", codigo="E2", creditos=2, tipo='ELECTIVO', activo=False)
+        Aula.objects.create(nombre="Aula 1", capacidad=30)
+        aula = Aula.objects.create(nombre="Lab", capacidad=20, tipo='LABORATORIO')
+        Aula.objects.create(nombre="Cerrada", capacidad=50, activa=False)
+        asignacion = Asignacion.objects.create(
+            horario=horario, curso=curso, docente=self.admin_user, aula=aula,
+            dia_semana='LUNES', bloque_horario='08:00-10:00'
+        )
+        for tipo, resuelto in (('AULA', True), ('AULA', False), ('DOCENTE', False)):
+            ConflictoHorario.objects.create(horario=horario, asignacion=asignacion, tipo_conflicto=tipo,
+                                            descripcion='x', resuelto=resuelto)
+
+    def test_resumen_en_una_respuesta_y_cacheado(self):
+        url = reverse('estadisticas')
+        # Una consulta agregada por bloque (cursos, aulas, docentes, conflictos)
+        with self.assertNumQueries(4):
+            datos = self.client.get(url).data
+        self.assertEqual(datos['cursos']['total_cursos'], 2)
+        self.assertEqual(datos['cursos']['cursos_electivos'], 1)
+        self.assertEqual(datos['cursos']['sesiones_semanales'], 2)
+        self.assertEqual((datos['aulas']['aulas_activas'], datos['aulas']['capacidad_total']), (2, 50))
+        self.assertEqual(datos['aulas']['laboratorios_activos'], 1)
+        self.assertEqual(datos['conflictos']['conflictos_pendientes'], 2)
+        self.assertEqual(
+            [(f['tipo_conflicto'], f['total']) for f in datos['conflictos']['por_tipo']],
+            [('AULA', 2), ('DOCENTE', 1)]
+        )
+
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+        # Borrar un conflicto solo recalcula el bloque de conflictos
+        ConflictoHorario.objects.filter(tipo_conflicto='DOCENTE').get().delete()
+        with self.assertNumQueries(1):
+            datos = self.client.get(url).data
+        self.assertEqual(datos['conflictos']['total_conflictos'], 2)
+
+        # Los endpoints existentes comparten la misma caché
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('aula-estadisticas')).data['capacidad_total'], 50)
+            self.assertEqual(self.client.get(reverse('conflicto-estadisticas-globales')).data['conflictos_resueltos'], 1)
@@ -7,7 +7,12 @@ router.register(r'horarios', views.HorarioViewSet, basename='horario')
 router.register(r'asignaciones', views.AsignacionViewSet, basename='asignacion')
 router.register(r'conflictos', views.ConflictoHorarioViewSet, basename='conflicto')
 router.register(r'disponibilidades', views.DisponibilidadDocenteViewSet, basename='disponibilidad')  # NUEVA RUTA
+router.register(r'ejecuciones', views.EjecucionGeneracionViewSet, basename='ejecucion')
 
 urlpatterns = [
+    path('horarios/<int:horario_id>/progreso/', views.progreso_horario, name='horario-progreso'),
+    path('estadisticas/', views.EstadisticasView.as_view(), name='estadisticas'),
     path('', include(router.urls)),
+    path('calendario/docente/<int:docente_id>.ics', views.calendario_docente, name='calendario-docente'),
+    path('calendario/aula/<int:aula_id>.ics', views.calendario_aula, name='calendario-aula'),
 ]
\ No newline at end of file
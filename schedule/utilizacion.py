@@ -0,0 +1,132 @@
+# schedule/utilizacion.py
+"""
+Reportes de utilización de un horario: ocupación de aulas por día × bloque,
+asientos desperdiciados (capacidad del aula - capacidad estimada del curso)
+por asignación y por aula, carga semanal de cada docente y demanda de
+laboratorios frente a la oferta.
+
+Todo se calcula con consultas agrupadas sobre la tabla de asignaciones (una
+por vista del reporte); Python solo coloca los resultados en matrices
+compactas: días × bloques, o {'columnas': [...], 'filas': [[...], ...]}.
+Las tasas de uso semanales se miden sobre las franjas (días × bloques) de la
+configuración con la que se generó el horario; las matrices cubren todos los
+días y bloques, porque las asignaciones manuales pueden caer en cualquiera.
+El reporte se cachea bajo la versión de los horarios y de los catálogos.
+"""
+from django.db.models import Count, ExpressionWrapper, F, IntegerField, Min, Q, Sum
+
+from horunap_api.catalogos import aulas_activas, docentes_activos, obtener
+from .calendario import version_horarios
+from .core.algorithm import GeneradorHorarios
+from .models import Asignacion, Horario
+
+DIAS = [dia for dia, _ in Horario.DIA_SEMANA]
+BLOQUES = [bloque for bloque, _ in Horario.BLOQUES_HORARIOS]
+INDICE_DIA = {dia: i for i, dia in enumerate(DIAS)}
+INDICE_BLOQUE = {bloque: j for j, bloque in enumerate(BLOQUES)}
+
+DESPERDICIO = ExpressionWrapper(F('aula__capacidad') - F('curso__capacidad_estimada'), output_field=IntegerField())
+
+
+def _matriz(filas, campo):
+    """Matriz días × bloques a partir de filas agrupadas por (dia_semana, bloque_horario)"""
+    matriz = [[0] * len(BLOQUES) for _ in DIAS]
+    for fila in filas:
+        i, j = INDICE_DIA.get(fila['dia_semana']), INDICE_BLOQUE.get(fila['bloque_horario'])
+        if i is not None and j is not None:
+            matriz[i][j] = fila[campo]
+    return matriz
+
+
+def _tabla(columnas, filas):
+    return {'columnas': list(columnas), 'filas': [list(fila) for fila in filas]}
+
+
+def reporte_utilizacion(horario):
+    clave = f'utilizacion:{horario.id}:{version_horarios()}'
+    return obtener(('cursos', 'aulas', 'docentes'), clave, lambda: _calcular(horario))
+
+
+def _calcular(horario):
+    asignaciones = Asignacion.objects.filter(horario=horario, activa=True)
+    aulas = aulas_activas()
+    laboratorios = [aula for aula in aulas if aula.tipo_aula == 'LABORATORIO' and aula.tiene_proyector]
+    configuracion = GeneradorHorarios.configuracion_guardada(horario)
+    franjas_semana = (len(configuracion.get('dias_semana') or GeneradorHorarios.DIAS_SEMANA) *
+                      len(configuracion.get('bloques_horarios') or GeneradorHorarios.BLOQUES_HORARIOS))
+
+    # Ocupación y demanda de laboratorio por franja
+    franjas = list(asignaciones.values('dia_semana', 'bloque_horario').annotate(
+        aulas_ocupadas=Count('aula', distinct=True),
+        demanda_laboratorio=Count('id', filter=Q(curso__requiere_laboratorio=True)),
+    ).order_by())
+    ocupadas = _matriz(franjas, 'aulas_ocupadas')
+    demanda = _matriz(franjas, 'demanda_laboratorio')
+
+    # Uso y desperdicio de asientos por aula (las activas sin sesiones quedan en cero)
+    por_aula = {fila['aula']: fila for fila in asignaciones.values('aula').annotate(
+        sesiones=Count('id'),
+        desperdicio_total=Sum(DESPERDICIO),
+        desperdicio_minimo=Min(DESPERDICIO),
+        sesiones_sobrecupo=Count('id', filter=Q(aula__capacidad__lt=F('curso__capacidad_estimada'))),
+    ).order_by()}
+    filas_aula = []
+    for aula in aulas:
+        fila = por_aula.get(aula.id, {})
+        sesiones = fila.get('sesiones', 0)
+        filas_aula.append((
+            aula.id, aula.nombre, aula.capacidad, sesiones,
+            round(sesiones / franjas_semana, 3),
+            fila.get('desperdicio_total') or 0,
+            round(fila['desperdicio_total'] / sesiones, 1) if sesiones else None,
+            fila.get('sesiones_sobrecupo', 0),
+        ))
+
+    # Carga por docente: agrupada por (docente, curso) para sumar créditos sin repetir cursos
+    carga = {}
+    for fila in asignaciones.values('docente', 'curso', 'curso__creditos').annotate(
+        sesiones=Count('id'), horas=Sum('curso__duracion_sesion')
+    ).order_by():
+        total = carga.setdefault(fila['docente'], [0, 0, 0, 0])
+        total[0] += fila['sesiones']
+        total[1] += fila['horas']
+        total[2] += fila['curso__creditos']
+        total[3] += 1
+    docentes = {docente.id: docente.username for docente in docentes_activos()}
+    filas_docente = sorted(
+        ((docente_id, docentes.get(docente_id), *carga.get(docente_id, (0, 0, 0, 0)))
+         for docente_id in docentes.keys() | carga.keys()),
+        key=lambda fila: (-fila[3], fila[0])
+    )
+
+    oferta = len(laboratorios)
+    return {
+        'dias': DIAS,
+        'bloques': BLOQUES,
+        'franjas_semana': franjas_semana,
+        'ocupacion': {
+            'aulas_activas': len(aulas),
+            'aulas_ocupadas': ocupadas,
+            'tasa': [[round(n / len(aulas), 3) if aulas else 0 for n in fila] for fila in ocupadas],
+        },
+        'aulas': _tabla(
+            ('aula', 'nombre', 'capacidad', 'sesiones', 'tasa_uso',
+             'desperdicio_total', 'desperdicio_promedio', 'sesiones_sobrecupo'),
+            filas_aula
+        ),
+        'aulas_ociosas': [aula.id for aula in aulas if aula.id not in por_aula],
+        'asignaciones': _tabla(
+            ('asignacion', 'aula', 'desperdicio'),
+            asignaciones.annotate(desperdicio=DESPERDICIO).order_by('id').values_list('id', 'aula', 'desperdicio')
+        ),
+        'docentes': _tabla(
+            ('docente', 'username', 'sesiones', 'horas_semanales', 'creditos', 'cursos'), filas_docente
+        ),
+        'laboratorios': {
+            'oferta': oferta,
+            'demanda': demanda,
+            'deficit': [[max(0, n - oferta) for n in fila] for fila in demanda],
+            'demanda_total': sum(map(sum, demanda)),
+            'capacidad_semanal': oferta * franjas_semana,
+        },
+    }
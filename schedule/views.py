@@ -1,15 +1,42 @@
+import asyncio
+import json
+import time
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count, Q
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
+from django.db.models import Q
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from .models import Horario, Asignacion, ConflictoHorario, DisponibilidadDocente
+from django.views.decorators.http import require_GET
+from .models import Horario, Asignacion, ConflictoHorario, DisponibilidadDocente, EjecucionGeneracion
 from .serializers import (
     HorarioSerializer, AsignacionSerializer, AsignacionCreateSerializer,
     ConflictoHorarioSerializer, GenerarHorarioSerializer, EstadisticasHorarioSerializer,
-    DisponibilidadDocenteSerializer, DisponibilidadMasivaSerializer
+    DisponibilidadDocenteSerializer, DisponibilidadMasivaSerializer,
+    EjecucionGeneracionSerializer, ConfiguracionGeneracionSerializer, ClonarHorarioSerializer,
+    ValidarCambiosSerializer, MoverAsignacionSerializer, IntercambiarAsignacionesSerializer,
+    LoteAsignacionesSerializer
 )
 from .core.algorithm import GeneradorHorarios, ResolvedorConflictos
+from .core.operaciones import (
+    clonar_horario, aplicar_lote, mover_asignaciones, intercambiar_asignaciones,
+    bloquear_horario, ConflictoVersion, CambiosInvalidos, GeneracionEnCurso
+)
+from .core.progreso import ProgresoEjecucion, ESTADOS_FINALES, aleer_progreso, intervalo_progreso
+from .core.sugerencias import SugeridorAlternativas
+from .core.validacion import ValidadorCambios
+from .estadisticas import estadisticas_conflictos, resumen_general
+from .exportacion import FORMATOS, respuesta_exportacion
+from .utilizacion import reporte_utilizacion
+from . import calendario
+
+def ids_filtros(query_params, claves):
+    """{clave: id} de los filtros presentes; ValueError si alguno no es un entero"""
+    return {clave: int(query_params[clave]) for clave in claves if query_params.get(clave)}
 
 class HorarioViewSet(viewsets.ModelViewSet):
     queryset = Horario.objects.all()
@@ -52,20 +79,49 @@ class HorarioViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        try:
-            generador = GeneradorHorarios(horario.id)
-            asignaciones_creadas = generador.generar_horario()
+        configuracion = ConfiguracionGeneracionSerializer(data=request.data.get('configuracion', {}))
+        if not configuracion.is_valid():
+            return Response(configuracion.errors, status=status.HTTP_400_BAD_REQUEST)
 
-            # Detectar conflictos después de la generación
-            generador.detectar_conflictos()
+        semilla = request.data.get('semilla')
+        usar_cache = str(request.data.get('usar_cache', True)).lower() != 'false'
+
+        progreso = None
+        try:
+            # Un solo proceso genera cada horario; la publicación es atómica,
+            # así que los lectores siguen viendo el resultado anterior completo
+            with bloquear_horario(horario.id):
+                # El avance se sigue en vivo en /api/horarios/<id>/progreso/
+                progreso = ProgresoEjecucion(horario.id, tipo='GENERACION')
+                generador = GeneradorHorarios(
+                    horario.id, configuracion=configuracion.validated_data, progreso=progreso
+                )
+                asignaciones_creadas = generador.generar_horario(semilla=semilla, usar_cache=usar_cache)
+
+                # Detectar conflictos después de la generación
+                generador.detectar_conflictos()
+                progreso.finalizar(
+                    sesiones_asignadas=asignaciones_creadas,
+                    completitud=round(generador.completitud, 4),
+                    conflictos=len(generador.conflictos)
+                )
 
             return Response({
                 'message': f'Horario generado exitosamente. {asignaciones_creadas} asignaciones creadas.',
                 'asignaciones_creadas': asignaciones_creadas,
-                'estado': 'GENERADO'
+                'estado': 'GENERADO',
+                'desde_cache': generador.desde_cache,
+                'sesiones_totales': generador.sesiones_totales,
+                'completitud': round(generador.completitud, 4),
+                'interrumpido_por_tiempo': generador.interrumpido_por_tiempo,
+                'ejecucion': generador.metricas.ejecucion.id
             })
 
+        except GeneracionEnCurso as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
         except Exception as e:
+            if progreso is not None:
+                progreso.finalizar('ERROR', error=str(e))
             return Response(
                 {'error': f'Error al generar horario: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -78,21 +134,87 @@ class HorarioViewSet(viewsets.ModelViewSet):
         """
         horario = self.get_object()
 
+        progreso = None
         try:
-            resolvedor = ResolvedorConflictos(horario.id)
-            conflictos_resueltos = resolvedor.resolver_conflictos()
+            with bloquear_horario(horario.id):
+                progreso = ProgresoEjecucion(horario.id, tipo='RESOLUCION')
+                resolvedor = ResolvedorConflictos(horario.id, progreso=progreso)
+                conflictos_resueltos = resolvedor.resolver_conflictos()
+                progreso.finalizar(conflictos_resueltos=conflictos_resueltos)
 
             return Response({
                 'message': f'Se resolvieron {conflictos_resueltos} conflictos automáticamente.',
-                'conflictos_resueltos': conflictos_resueltos
+                'conflictos_resueltos': conflictos_resueltos,
+                'ejecucion': resolvedor.metricas.ejecucion.id
             })
 
+        except GeneracionEnCurso as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
         except Exception as e:
+            if progreso is not None:
+                progreso.finalizar('ERROR', error=str(e))
             return Response(
                 {'error': f'Error al resolver conflictos: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=True, methods=['post'])
+    def clonar(self, request, pk=None):
+        """
+        Clona el horario en una variante (escenario) copiando sus asignaciones
+        en bloque y, opcionalmente, sus conflictos
+        """
+        horario = self.get_object()
+        serializer = ClonarHorarioSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        datos = serializer.validated_data
+
+        nuevo, asignaciones_copiadas, conflictos_copiados = clonar_horario(
+            horario,
+            nombre=datos.get('nombre') or f"{horario.nombre} (copia)",
+            semestre=datos.get('semestre'),
+            creado_por=request.user,
+            incluir_conflictos=datos['incluir_conflictos'],
+            excluir_aulas=datos['excluir_aulas'],
+        )
+
+        return Response({
+            'message': f'Horario clonado con {asignaciones_copiadas} asignaciones.',
+            'horario': HorarioSerializer(nuevo).data,
+            'asignaciones_copiadas': asignaciones_copiadas,
+            'conflictos_copiados': conflictos_copiados,
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'])
+    def validar_cambios(self, request, pk=None):
+        """
+        Valida un lote de movimientos o asignaciones nuevas sin aplicarlos
+        (what-if) y devuelve un veredicto por cambio
+        """
+        horario = self.get_object()
+        serializer = ValidarCambiosSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        validador = ValidadorCambios(horario, configuracion=serializer.validated_data)
+        return Response(validador.validar(serializer.validated_data['cambios']))
+
+    @action(detail=True, methods=['get'])
+    def metricas(self, request, pk=None):
+        """
+        Métricas de las ejecuciones del motor (generación y resolución) del horario
+        """
+        horario = self.get_object()
+        ejecuciones = horario.ejecuciones.all()
+
+        tipo = request.query_params.get('tipo', None)
+        if tipo:
+            ejecuciones = ejecuciones.filter(tipo=tipo)
+
+        serializer = EjecucionGeneracionSerializer(ejecuciones[:20], many=True)
+        return Response(serializer.data)
+
     @action(detail=True, methods=['get'])
     def estadisticas(self, request, pk=None):
         """
@@ -126,6 +248,14 @@ class HorarioViewSet(viewsets.ModelViewSet):
         serializer = EstadisticasHorarioSerializer(estadisticas)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def utilizacion(self, request, pk=None):
+        """
+        Ocupación de aulas por día × bloque, asientos desperdiciados, carga
+        de los docentes y demanda de laboratorios del horario
+        """
+        return Response(reporte_utilizacion(self.get_object()))
+
     @action(detail=True, methods=['get'])
     def asignaciones(self, request, pk=None):
         """
@@ -149,6 +279,31 @@ class HorarioViewSet(viewsets.ModelViewSet):
         serializer = AsignacionSerializer(asignaciones, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def exportar(self, request, pk=None):
+        """
+        Exporta en streaming las asignaciones del horario (?formato=csv|xlsx),
+        opcionalmente filtradas por docente o aula
+        """
+        horario = self.get_object()
+        formato = request.query_params.get('formato', 'csv')
+        if formato not in FORMATOS:
+            return Response(
+                {'error': f'Formato no soportado: {formato}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            filtros = ids_filtros(request.query_params, ('docente', 'aula'))
+        except ValueError:
+            return Response({'error': 'docente y aula deben ser enteros'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # El nombre del archivo solo lleva los ids ya convertidos a entero
+        asignaciones = horario.asignaciones.filter(**{f'{clave}_id': valor for clave, valor in filtros.items()})
+        nombre_archivo = f"horario_{horario.id}" + ''.join(f"_{clave}_{valor}" for clave, valor in filtros.items())
+
+        return respuesta_exportacion(asignaciones, formato, nombre_archivo)
+
     @action(detail=True, methods=['get'])
     def conflictos(self, request, pk=None):
         """
@@ -200,6 +355,134 @@ class AsignacionViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        """
+        Exporta en streaming las asignaciones filtradas (p. ej. todas las de un
+        docente o de un aula en todos los horarios) en CSV o XLSX
+        """
+        formato = request.query_params.get('formato', 'csv')
+        if formato not in FORMATOS:
+            return Response(
+                {'error': f'Formato no soportado: {formato}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            filtros = ids_filtros(request.query_params, ('horario', 'docente', 'aula'))
+        except ValueError:
+            return Response(
+                {'error': 'horario, docente y aula deben ser enteros'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not filtros:
+            return Response(
+                {'error': 'Se requiere al menos uno de los parámetros horario, docente o aula'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        nombre_archivo = 'asignaciones_' + '_'.join(f"{clave}_{valor}" for clave, valor in filtros.items())
+        return respuesta_exportacion(self.get_queryset(), formato, nombre_archivo)
+
+    @action(detail=True, methods=['post'])
+    def mover(self, request, pk=None):
+        """
+        Mueve la asignación a otra franja/aula/docente si la versión enviada
+        sigue vigente (control de concurrencia optimista)
+        """
+        asignacion = self.get_object()
+        serializer = MoverAsignacionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        cambio = {'asignacion': asignacion.id, **serializer.validated_data}
+        return self._aplicar_movimiento(lambda: mover_asignaciones(asignacion.horario, [cambio]))
+
+    @action(detail=True, methods=['get'])
+    def sugerencias(self, request, pk=None):
+        """
+        Mejores K alternativas factibles (día, bloque, aula y, con
+        cambiar_docente=true, docente) para mover la asignación
+        """
+        asignacion = get_object_or_404(
+            Asignacion.objects.select_related('horario', 'curso', 'docente', 'aula'), pk=pk
+        )
+        try:
+            k = min(max(int(request.query_params.get('k', 5)), 1), 50)
+        except ValueError:
+            return Response({'error': 'k debe ser un entero'}, status=status.HTTP_400_BAD_REQUEST)
+        cambiar_docente = request.query_params.get('cambiar_docente', '').lower() == 'true'
+
+        sugerencias = SugeridorAlternativas(asignacion).sugerir(k=k, cambiar_docente=cambiar_docente)
+        return Response({
+            'asignacion': asignacion.id,
+            'version': asignacion.version,
+            'sugerencias': sugerencias,
+        })
+
+    @action(detail=False, methods=['post'])
+    def intercambiar(self, request):
+        """
+        Intercambia atómicamente la posición de dos asignaciones del mismo horario
+        """
+        serializer = IntercambiarAsignacionesSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        primera, segunda = serializer.validated_data['asignaciones']
+
+        horario = get_object_or_404(Asignacion.objects.select_related('horario'), pk=primera['asignacion']).horario
+        return self._aplicar_movimiento(lambda: intercambiar_asignaciones(
+            horario,
+            (primera['asignacion'], primera['version']),
+            (segunda['asignacion'], segunda['version']),
+            incluir_aula=serializer.validated_data['incluir_aula'],
+        ))
+
+    @action(detail=False, methods=['post'])
+    def lote(self, request):
+        """
+        Altas, actualizaciones y activación/desactivación masivas de las
+        asignaciones de un horario. Todo o nada: si un elemento es inválido no
+        se aplica ninguno y se devuelve el veredicto de cada uno.
+        """
+        serializer = LoteAsignacionesSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        datos = serializer.validated_data
+        horario = get_object_or_404(Horario, pk=datos['horario'])
+
+        return self._aplicar_cambios(
+            lambda: aplicar_lote(horario, crear=datos['crear'], actualizar=datos['actualizar'],
+                                 activa=datos['activa']),
+            lambda resultado: {
+                'valido': True,
+                'creadas': len(datos['crear']),
+                'actualizadas': len(datos['actualizar']),
+                'activa_modificadas': len(datos['activa']),
+                'resultados': resultado['resultados'],
+            }
+        )
+
+    def _aplicar_movimiento(self, operacion):
+        return self._aplicar_cambios(
+            operacion,
+            lambda asignaciones: {'asignaciones': AsignacionSerializer(asignaciones, many=True).data}
+        )
+
+    def _aplicar_cambios(self, operacion, respuesta):
+        """409 si otra edición se adelantó, 400 con los veredictos si hay cambios inválidos"""
+        try:
+            resultado = operacion()
+        except ConflictoVersion as conflicto:
+            return Response(
+                {'error': str(conflicto), 'conflictos': conflicto.conflictos},
+                status=status.HTTP_409_CONFLICT
+            )
+        except CambiosInvalidos as invalidos:
+            return Response(invalidos.resultado, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(respuesta(resultado))
+
     @action(detail=True, methods=['post'])
     def toggle_activa(self, request, pk=None):
         """
@@ -259,18 +542,41 @@ class ConflictoHorarioViewSet(viewsets.ModelViewSet):
         """
         Estadísticas globales de conflictos
         """
-        total_conflictos = ConflictoHorario.objects.count()
-        conflictos_resueltos = ConflictoHorario.objects.filter(resuelto=True).count()
-        conflictos_por_tipo = ConflictoHorario.objects.values('tipo_conflicto').annotate(
-            total=Count('id')
-        )
+        return Response(estadisticas_conflictos())
 
-        return Response({
-            'total_conflictos': total_conflictos,
-            'conflictos_resueltos': conflictos_resueltos,
-            'conflictos_pendientes': total_conflictos - conflictos_resueltos,
-            'por_tipo': list(conflictos_por_tipo)
-        })
+class EstadisticasView(APIView):
+    """
+    Indicadores de catálogos y conflictos para la portada de administración,
+    en una sola respuesta (ver schedule/estadisticas.py)
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(resumen_general())
+
+class EjecucionGeneracionViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Consulta de las métricas persistidas de cada ejecución del motor
+    """
+    queryset = EjecucionGeneracion.objects.all()
+    serializer_class = EjecucionGeneracionSerializer
+
+    def get_queryset(self):
+        queryset = EjecucionGeneracion.objects.all()
+
+        # Filtros
+        horario = self.request.query_params.get('horario', None)
+        tipo = self.request.query_params.get('tipo', None)
+        estado = self.request.query_params.get('estado', None)
+
+        if horario:
+            queryset = queryset.filter(horario_id=horario)
+        if tipo:
+            queryset = queryset.filter(tipo=tipo)
+        if estado:
+            queryset = queryset.filter(estado=estado)
+
+        return queryset
 
 # NUEVO VIEWSET AGREGADO
 class DisponibilidadDocenteViewSet(viewsets.ModelViewSet):
@@ -362,4 +668,86 @@ class DisponibilidadDocenteViewSet(viewsets.ModelViewSet):
             bloques_no_disponibles=Count('id', filter=Q(disponible=False))
         )
         
-        return Response(list(resumen))
\ No newline at end of file
+        return Response(list(resumen))
+
+# --- FEEDS iCALENDAR ---
+
+async def _respuesta_calendario(request, tipo, objeto_id):
+    """
+    Sirve el feed desde la caché. Si el cliente ya tiene la versión actual
+    (If-None-Match) responde 304 sin consultar la base de datos.
+    """
+    horario_id = request.GET.get('horario')
+    etag = await calendario.aetag_feed(tipo, objeto_id, horario_id)
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(
+            await calendario.afeed_cacheado(tipo, objeto_id, horario_id),
+            content_type='text/calendar; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'inline; filename="{tipo}_{objeto_id}.ics"'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, max-age=300'
+    return response
+
+@require_GET
+async def calendario_docente(request, docente_id):
+    """Feed iCalendar con las clases de un docente (horarios aprobados/activos)"""
+    return await _respuesta_calendario(request, 'docente', docente_id)
+
+@require_GET
+async def calendario_aula(request, aula_id):
+    """Feed iCalendar con la ocupación de un aula (horarios aprobados/activos)"""
+    return await _respuesta_calendario(request, 'aula', aula_id)
+
+# --- PROGRESO EN VIVO (SSE) ---
+
+def _evento_sse(datos, evento='progreso'):
+    return f"id: {datos['ejecucion']}:{datos['secuencia']}\nevent: {evento}\ndata: {json.dumps(datos)}\n\n"
+
+async def _eventos_progreso(horario_id, desde):
+    """
+    Reenvía la instantánea de progreso cada vez que cambia. Las ejecuciones
+    ya terminadas antes de conectarse se omiten (su resultado lo devolvió el
+    POST); el flujo se cierra al terminar la ejecución seguida o al vencer
+    el bloqueo de generación.
+    """
+    intervalo = intervalo_progreso()
+    limite = time.monotonic() + getattr(settings, 'HORUNAP_BLOQUEO_GENERACION_SEGUNDOS', 15 * 60)
+    proximo_latido = time.monotonic() + 15
+    ultima = None
+    while time.monotonic() < limite:
+        datos = await aleer_progreso(horario_id)
+        marca = (datos['ejecucion'], datos['secuencia']) if datos else None
+        vigente = datos and not (datos['estado'] in ESTADOS_FINALES and datos['actualizado'] < desde)
+        if vigente and marca != ultima:
+            ultima = marca
+            yield _evento_sse(datos)
+            if datos['estado'] in ESTADOS_FINALES:
+                return
+        elif time.monotonic() >= proximo_latido:
+            # Comentario SSE para que proxies y navegador no corten la conexión
+            yield ": latido\n\n"
+            proximo_latido = time.monotonic() + 15
+        await asyncio.sleep(intervalo)
+
+@require_GET
+async def progreso_horario(request, horario_id):
+    """
+    Flujo Server-Sent Events con el avance de la generación o resolución del
+    horario. Vista asíncrona: bajo ASGI cada cliente conectado no ocupa un
+    hilo del servidor mientras espera.
+    """
+    usuario = await request.auser()
+    if not usuario.is_authenticated:
+        return JsonResponse({'error': 'Autenticación requerida'}, status=401)
+    if not await Horario.objects.filter(pk=horario_id).aexists():
+        return JsonResponse({'error': 'Horario no encontrado'}, status=404)
+
+    response = StreamingHttpResponse(
+        _eventos_progreso(horario_id, desde=time.time()), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
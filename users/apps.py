@@ -3,4 +3,7 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
-    verbose_name = 'Gestión de Usuarios'  # Nombre más legible
\ No newline at end of file
+    verbose_name = 'Gestión de Usuarios'  # Nombre más legible
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -1,6 +1,8 @@
 # users/backends.py
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from horunap_api.versiones import obtener_version, incrementar_version
 
 UserModel = get_user_model()
 
@@ -35,4 +37,62 @@ class DebugModelBackend(ModelBackend):
 
         print(f"Authentication FAILED for '{username}'.")
         print(f"---------------------------\n")
-        return None # Explicitly return None on failure
\ No newline at end of file
+        return None # Explicitly return None on failure
+
+class RolModelBackend(ModelBackend):
+    """
+    Backend de autenticación para producción.
+
+    - No imprime nada: una autenticación cuesta una lectura del usuario
+      (y Django hace una escritura pequeña de `last_login`).
+    - Los permisos de grupo/usuario se guardan en la caché de Django, por lo
+      que las comprobaciones `has_perm` no consultan la base de datos en cada
+      petición. La caché se invalida con `invalidar_cache_permisos()`
+      (ver users/signals.py).
+    """
+
+    CACHE_PREFIJO = 'auth:permisos'
+    CACHE_TIMEOUT = 60 * 15
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Igual que ModelBackend: se calcula un hash para mitigar ataques de tiempo
+            UserModel().set_password(password)
+            return None
+
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+    def _get_permissions(self, user_obj, obj, from_name):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+
+        perm_cache_name = '_%s_perm_cache' % from_name
+        if not hasattr(user_obj, perm_cache_name):
+            if user_obj.is_superuser:
+                permisos = super()._get_permissions(user_obj, obj, from_name)
+            else:
+                clave = self._clave_cache(user_obj, from_name)
+                permisos = cache.get(clave)
+                if permisos is None:
+                    permisos = super()._get_permissions(user_obj, obj, from_name)
+                    cache.set(clave, permisos, self.CACHE_TIMEOUT)
+            setattr(user_obj, perm_cache_name, permisos)
+        return getattr(user_obj, perm_cache_name)
+
+    @classmethod
+    def _clave_cache(cls, user_obj, from_name):
+        version = obtener_version(cls.CACHE_PREFIJO)
+        return f'{cls.CACHE_PREFIJO}:{version}:{from_name}:{user_obj.pk}:{user_obj.rol}'
+
+
+def invalidar_cache_permisos():
+    """Invalida los permisos cacheados de todos los usuarios."""
+    incrementar_version(RolModelBackend.CACHE_PREFIJO)
@@ -1,6 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser, Group # <-- 1. Importa Group
 from django.core.validators import RegexValidator
+import logging
+
+logger = logging.getLogger(__name__)
 
 class User(AbstractUser):
     ROL_CHOICES = [
@@ -33,37 +36,71 @@ class User(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.get_rol_display()})"
 
+    # Nombre del grupo de Django asociado a cada rol
+    GRUPOS_POR_ROL = {
+        'ADMIN': 'Administradores',
+        'DOCENTE': 'Docentes',
+    }
+
+    # Rol tal como se leyó de la base de datos; sirve para saber si cambió
+    _rol_original = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._rol_original = instancia.__dict__.get('rol')
+        return instancia
+
     # --- INICIO DE LA OPTIMIZACIÓN ---
-    # Este método se ejecutará automáticamente CADA VEZ que
-    # un usuario se cree o se actualice (guarde).
+    # La sincronización rol -> grupo solo se ejecuta cuando el usuario se crea
+    # o cuando su ROL cambia. Django guarda el usuario en cada login para
+    # actualizar `last_login` (update_fields=['last_login']), y ese guardado
+    # ya no genera consultas extra sobre los grupos.
     def save(self, *args, **kwargs):
-        # Primero, guarda el objeto de usuario
-        super().save(*args, **kwargs) 
+        update_fields = kwargs.get('update_fields')
+        # Se lee __dict__ para no forzar la carga de `rol` si vino diferido
+        rol_actual = self.__dict__.get('rol', self._rol_original)
+        rol_modificado = self._state.adding or rol_actual != self._rol_original
+        if update_fields is not None and 'rol' not in update_fields:
+            rol_modificado = False
+
+        super().save(*args, **kwargs)
+
+        if rol_modificado:
+            self.sincronizar_grupos_por_rol([self])
+        self._rol_original = self.__dict__.get('rol', self._rol_original)
+
+    @classmethod
+    def sincronizar_grupos_por_rol(cls, usuarios):
+        """
+        Asigna en bloque a cada usuario el grupo de su rol y lo retira del
+        grupo del otro rol. Usa una consulta por tabla, sin importar cuántos
+        usuarios se sincronicen (útil para importaciones masivas).
+        """
+        usuarios = [u for u in usuarios if u.pk is not None]
+        if not usuarios:
+            return
 
         try:
-            # 2. Asigna automáticamente al grupo correcto basado en el ROL
-            # NOTA: Los nombres 'Administradores' y 'Docentes' deben
-            # existir en tu panel de admin de Django.
-            
-            if self.rol == 'ADMIN':
-                grupo_admin, _ = Group.objects.get_or_create(name='Administradores')
-                grupo_docente = Group.objects.filter(name='Docentes').first()
-                
-                self.groups.add(grupo_admin)
-                if grupo_docente:
-                    self.groups.remove(grupo_docente)
+            grupos = {}
+            for rol, nombre in cls.GRUPOS_POR_ROL.items():
+                grupos[rol], _ = Group.objects.get_or_create(name=nombre)
+
+            Membresia = cls.groups.through
+            Membresia.objects.filter(
+                user_id__in=[u.pk for u in usuarios],
+                group_id__in=[g.pk for g in grupos.values()],
+            ).delete()
+            Membresia.objects.bulk_create([
+                Membresia(user_id=u.pk, group_id=grupos[u.rol].pk)
+                for u in usuarios if u.rol in grupos
+            ], ignore_conflicts=True)
 
-            elif self.rol == 'DOCENTE':
-                grupo_docente, _ = Group.objects.get_or_create(name='Docentes')
-                grupo_admin = Group.objects.filter(name='Administradores').first()
-                
-                self.groups.add(grupo_docente)
-                if grupo_admin:
-                    self.groups.remove(grupo_admin)
+            # Las operaciones directas sobre la tabla intermedia no emiten m2m_changed
+            from .backends import invalidar_cache_permisos
+            invalidar_cache_permisos()
 
-        except Exception as e:
-            # Es bueno dejar un print en caso de que algo falle,
-            # como que los grupos no estén creados.
-            print(f"Error al asignar grupo automático: {e}")
-            pass
-    # --- FIN DE LA OPTIMIZACIÓN ---
\ No newline at end of file
+        except Exception:
+            # Como antes, un fallo en los grupos no debe impedir guardar el usuario
+            logger.exception("Error al asignar grupo automático")
+    # --- FIN DE LA OPTIMIZACIÓN ---
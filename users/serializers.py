@@ -0,0 +1,14 @@
+from rest_framework import serializers
+from .models import User
+
+class UserSerializer(serializers.ModelSerializer):
+    nombre_completo = serializers.CharField(source='get_full_name', read_only=True)
+    rol_display = serializers.CharField(source='get_rol_display', read_only=True)
+
+    class Meta:
+        model = User
+        fields = [
+            'id', 'username', 'first_name', 'last_name', 'nombre_completo',
+            'email', 'rol', 'rol_display', 'is_active'
+        ]
+        read_only_fields = fields
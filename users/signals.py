@@ -0,0 +1,32 @@
+# users/signals.py
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from horunap_api.catalogos import invalidar_catalogos
+from .backends import invalidar_cache_permisos
+from .models import User
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def permisos_modificados(sender, action, **kwargs):
+    """Cualquier cambio de grupos o permisos invalida la caché del backend"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidar_cache_permisos()
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Group)
+def grupo_modificado(sender, **kwargs):
+    invalidar_cache_permisos()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def usuario_modificado(sender, instance, update_fields=None, **kwargs):
+    """Invalida el catálogo de docentes (el login solo actualiza last_login y no cuenta)"""
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidar_catalogos('docentes')
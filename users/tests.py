@@ -1,3 +1,111 @@
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import Group, Permission
 from django.test import TestCase
+from django.urls import reverse
+from .models import User
 
-# Create your tests here.
+class UserGrupoRolTest(TestCase):
+    def setUp(self):
+        self.docente = User.objects.create_user(
+            username='docente_grupo',
+            password='password123',
+            rol='DOCENTE'
+        )
+
+    def test_grupo_asignado_al_crear(self):
+        self.assertEqual(list(self.docente.groups.values_list('name', flat=True)), ['Docentes'])
+
+    def test_cambio_de_rol_sincroniza_grupos(self):
+        self.docente.rol = 'ADMIN'
+        self.docente.save()
+        self.assertEqual(list(self.docente.groups.values_list('name', flat=True)), ['Administradores'])
+
+    def test_guardar_sin_cambiar_rol_no_consulta_grupos(self):
+        usuario = User.objects.get(pk=self.docente.pk)
+        usuario.first_name = 'Ana'
+        with self.assertNumQueries(1):
+            usuario.save()
+
+    def test_sincronizacion_masiva(self):
+        otros = [
+            User.objects.create_user(username=f'u{i}', password='password123', rol='DOCENTE')
+            for i in range(3)
+        ]
+        User.objects.filter(pk__in=[u.pk for u in otros]).update(rol='ADMIN')
+        otros = list(User.objects.filter(pk__in=[u.pk for u in otros]))
+        User.sincronizar_grupos_por_rol(otros)
+        for usuario in otros:
+            self.assertEqual(list(usuario.groups.values_list('name', flat=True)), ['Administradores'])
+
+class RolModelBackendTest(TestCase):
+    def setUp(self):
+        self.docente = User.objects.create_user(
+            username='docente_login',
+            password='password123',
+            rol='DOCENTE'
+        )
+
+    def test_authenticate(self):
+        self.assertEqual(authenticate(username='docente_login', password='password123'), self.docente)
+        self.assertIsNone(authenticate(username='docente_login', password='incorrecta'))
+        self.assertIsNone(authenticate(username='no_existe', password='password123'))
+
+    def test_login_una_lectura_y_una_escritura(self):
+        # Lectura del usuario + UPDATE de last_login
+        with self.assertNumQueries(2):
+            self.client.post(reverse('login'), {
+                'username': 'docente_login',
+                'password': 'password123',
+            })
+
+    def test_permisos_cacheados_e_invalidados(self):
+        grupo = Group.objects.get(name='Docentes')
+        permiso = Permission.objects.get(codename='view_user')
+
+        usuario = User.objects.get(pk=self.docente.pk)
+        self.assertFalse(usuario.has_perm('users.view_user'))
+
+        grupo.permissions.add(permiso)
+        usuario = User.objects.get(pk=self.docente.pk)
+        self.assertTrue(usuario.has_perm('users.view_user'))
+
+        usuario = User.objects.get(pk=self.docente.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(usuario.has_perm('users.view_user'))
+
+class PanelDocenteTest(TestCase):
+    def setUp(self):
+        from academic.models import Curso, Aula
+        from schedule.models import Horario, Asignacion
+
+        self.docente = User.objects.create_user(username='docente_panel', password='password123', rol='DOCENTE')
+        horario = Horario.objects.create(nombre="Panel", semestre="2025-I", creado_por=self.docente)
+        aula = Aula.objects.create(nombre="Aula P", capacidad=40)
+        for i, dia in enumerate(['LUNES', 'MARTES', 'MIERCOLES']):
+            curso = Curso.objects.create(nombre=f"Curso {i}", codigo=f"P{i}", creditos=3, capacidad_estimada=30)
+            Asignacion.objects.create(horario=horario, curso=curso, docente=self.docente, aula=aula,
+                                      dia_semana=dia, bloque_horario='08:00-10:00')
+        self.client.force_login(self.docente)
+
+    def test_mi_horario_sin_consultas_por_bloque(self):
+        # Usuario y asignaciones (con curso y aula): no depende del tamaño de la grilla
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('mi_horario'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'P2')
+        self.assertEqual(response.context['horas_semanales'], 6)
+        lunes = response.context['horario_estructura'][0]['bloques'][0]['asignacion']
+        self.assertEqual(lunes.curso.codigo, 'P0')
+
+    def test_dashboard(self):
+        response = self.client.get(reverse('dashboard_docente'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['cursos']), 3)
+        self.assertEqual([a.curso.codigo for a in response.context['horario_por_dia']['MARTES']], ['P1'])
+
+    def test_solo_docentes(self):
+        admin = User.objects.create_user(username='admin_panel', password='password123', rol='ADMIN')
+        self.client.force_login(admin)
+        self.assertEqual(self.client.get(reverse('mi_horario')).status_code, 403)
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('mi_horario')).status_code, 302)
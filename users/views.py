@@ -27,71 +27,86 @@ def redireccion_por_rol(request):
         # Por defecto, ir al admin
         return HttpResponseRedirect(reverse('admin:index'))
 
+DIAS_SEMANA = ['LUNES', 'MARTES', 'MIERCOLES', 'JUEVES', 'VIERNES', 'SABADO']
+BLOQUES_HORARIOS = ['08:00-10:00', '10:00-12:00', '12:00-14:00',
+                    '14:00-16:00', '16:00-18:00', '18:00-20:00']
+
+async def _asignaciones_docente(docente):
+    """Asignaciones activas del docente con curso y aula, en una sola consulta"""
+    return [
+        asignacion async for asignacion in Asignacion.objects.filter(docente=docente, activa=True)
+        .select_related('curso', 'aula')
+    ]
+
+# Las vistas del panel docente son asíncronas (ORM asíncrono): bajo ASGI un
+# proceso atiende muchas a la vez sin un hilo por petición esperando la base
+# de datos. Los datos se cargan completos antes de renderizar, ya que el
+# template no puede consultar desde un contexto asíncrono.
+
 @login_required
-def dashboard_docente(request):
+async def dashboard_docente(request):
     """Panel principal EXCLUSIVO para docentes"""
+    user = await request.auser()
     # Validación estricta - SOLO docentes pueden acceder
-    if request.user.rol != 'DOCENTE':
+    if user.rol != 'DOCENTE':
         messages.warning(request, 'No tienes permisos para acceder al panel docente')
         return HttpResponseRedirect(reverse('admin:index'))
 
     # Obtener datos del docente
     hoy = datetime.date.today()
-    asignaciones = Asignacion.objects.filter(docente=request.user, activa=True)
-    disponibilidades = DisponibilidadDocente.objects.filter(docente=request.user)
-    cursos = Curso.objects.filter(asignacion__docente=request.user).distinct()
-
-    # Organizar asignaciones por día
-    dias_semana = ['LUNES', 'MARTES', 'MIERCOLES', 'JUEVES', 'VIERNES', 'SABADO']
-    horario_por_dia = {}
+    asignaciones = await _asignaciones_docente(user)
+    total_disponibilidades = await DisponibilidadDocente.objects.filter(docente=user).acount()
+    cursos = [curso async for curso in Curso.objects.filter(asignacion__docente=user).distinct()]
 
-    for dia in dias_semana:
-        horario_por_dia[dia] = asignaciones.filter(dia_semana=dia).order_by('bloque_horario')
+    # Organizar asignaciones por día (ya vienen ordenadas por día y bloque)
+    horario_por_dia = {dia: [] for dia in DIAS_SEMANA}
+    for asignacion in asignaciones:
+        horario_por_dia.setdefault(asignacion.dia_semana, []).append(asignacion)
 
     context = {
+        'user': user,
         'asignaciones': asignaciones,
-        'disponibilidades': disponibilidades,
+        'total_disponibilidades': total_disponibilidades,
         'cursos': cursos,
         'horario_por_dia': horario_por_dia,
-        'dias_semana': dias_semana,
+        'dias_semana': DIAS_SEMANA,
         'hoy': hoy,
         'es_docente': True
     }
     return render(request, 'docente/dashboard.html', context)
 
 @login_required
-def mi_horario(request):
+async def mi_horario(request):
     """Vista detallada del horario del docente - SOLO para docentes"""
-    if request.user.rol != 'DOCENTE':
+    user = await request.auser()
+    if user.rol != 'DOCENTE':
         return HttpResponseForbidden("No tienes permisos para acceder a esta página")
 
-    asignaciones = Asignacion.objects.filter(docente=request.user, activa=True)
-    
-    # Definir días y bloques horarios
-    dias_semana = ['LUNES', 'MARTES', 'MIERCOLES', 'JUEVES', 'VIERNES', 'SABADO']
-    bloques_horarios = ['08:00-10:00', '10:00-12:00', '12:00-14:00', 
-                       '14:00-16:00', '16:00-18:00', '18:00-20:00']
-    
+    asignaciones = await _asignaciones_docente(user)
+    por_franja = {}
+    for asignacion in asignaciones:
+        por_franja.setdefault((asignacion.dia_semana, asignacion.bloque_horario), asignacion)
+
     # Crear estructura de horario sin filtros complejos
-    horario_estructura = []
-    for dia in dias_semana:
-        dia_data = {
+    horario_estructura = [
+        {
             'nombre': dia,
-            'bloques': []
+            'bloques': [
+                {'horario': bloque, 'asignacion': por_franja.get((dia, bloque))}
+                for bloque in BLOQUES_HORARIOS
+            ]
         }
-        for bloque in bloques_horarios:
-            asignacion = asignaciones.filter(dia_semana=dia, bloque_horario=bloque).first()
-            dia_data['bloques'].append({
-                'horario': bloque,
-                'asignacion': asignacion
-            })
-        horario_estructura.append(dia_data)
+        for dia in DIAS_SEMANA
+    ]
 
     context = {
+        'user': user,
         'horario_estructura': horario_estructura,
-        'dias_semana': dias_semana,
-        'bloques_horarios': bloques_horarios,
+        'dias_semana': DIAS_SEMANA,
+        'bloques_horarios': BLOQUES_HORARIOS,
         'asignaciones': asignaciones,
+        # Cada bloque dura dos horas
+        'horas_semanales': 2 * len(asignaciones),
         'es_docente': True
     }
     return render(request, 'docente/mi_horario.html', context)